@@ -0,0 +1,89 @@
+"""Full-text article search: websearch_to_tsquery over articles.search_vector (GIN), ranked, keyset-paginated.
+
+Pages are ordered by (rank DESC, id DESC); the cursor carries the last (rank, id) so the next page
+is a plain tuple comparison instead of an OFFSET. Snippets (ts_headline, the expensive part) are
+built only for the rows of the returned page. The body is markdown that may hold raw HTML, so
+ts_headline marks matches with private-use characters (stripped from the body first), and the
+fragment is HTML-escaped before they become <mark> tags: the snippet is safe to insert as HTML.
+"""
+from __future__ import annotations
+
+import base64
+import html
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+SEARCH_CONFIG = "russian"
+_START, _STOP = "\ue000", "\ue001"  # match delimiters that cannot occur in the (translated) body
+HEADLINE_OPTIONS = (
+    f"MaxFragments=2, MinWords=5, MaxWords=25, FragmentDelimiter=' … ', StartSel='{_START}', StopSel='{_STOP}'"
+)
+
+
+def encode_cursor(rank: float, article_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{rank!r}:{article_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[float, int]:
+    """Raises ValueError on a malformed cursor."""
+    try:
+        rank, article_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        return float(rank), int(article_id)
+    except (UnicodeDecodeError, TypeError, ValueError) as e:
+        raise ValueError("invalid cursor") from e
+
+
+def snippet_html(headline: str | None) -> str:
+    """ts_headline output -> escaped HTML with matches in <mark>."""
+    return html.escape(headline or "").replace(_START, "<mark>").replace(_STOP, "</mark>")
+
+
+def search_articles(
+    session: Session,
+    query: str,
+    limit: int = 20,
+    cursor: str | None = None,
+    status: str | None = None,
+) -> tuple[list[dict[str, Any]], str | None]:
+    """Ranked matches for a web-style query ("кадровый аудит" -увольнение, OR). Returns (items, next_cursor)."""
+    where = ["a.search_vector @@ q.query"]
+    params: dict[str, Any] = {
+        "config": SEARCH_CONFIG, "q": query, "limit": limit + 1, "opts": HEADLINE_OPTIONS, "sel": _START + _STOP,
+    }
+    if status:
+        where.append("a.status = :status")
+        params["status"] = status
+    keyset = ""
+    if cursor:
+        params["after_rank"], params["after_id"] = decode_cursor(cursor)
+        keyset = "WHERE (r.rank, r.id) < (CAST(:after_rank AS real), :after_id)"
+    sql = f"""
+        WITH q AS (SELECT websearch_to_tsquery(CAST(:config AS regconfig), :q) AS query),
+        ranked AS (
+            SELECT a.id, ts_rank_cd(a.search_vector, q.query, 32) AS rank
+            FROM articles a, q
+            WHERE {" AND ".join(where)}
+        ),
+        page AS (
+            SELECT r.id, r.rank FROM ranked r
+            {keyset}
+            ORDER BY r.rank DESC, r.id DESC
+            LIMIT :limit
+        )
+        SELECT a.id, a.title, a.slug, a.status, a.target_keyword, a.tilda_url, a.updated_at, page.rank,
+               ts_headline(CAST(:config AS regconfig),
+                           translate(coalesce(a.final_markdown, a.draft_markdown, ''), :sel, ''),
+                           q.query, :opts) AS snippet
+        FROM page JOIN articles a ON a.id = page.id, q
+        ORDER BY page.rank DESC, page.id DESC
+    """
+    rows = [dict(r) for r in session.execute(text(sql), params).mappings()]
+    for row in rows:
+        row["snippet"] = snippet_html(row["snippet"])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["rank"], rows[-1]["id"])
+    return rows, next_cursor
@@ -0,0 +1,85 @@
+"""Per-block result cache for incremental quality checks.
+
+Articles are split into paragraphs/sections (text.split_blocks); expensive per-block work (normalizing,
+stemming, shingle hashing) is cached by block content hash, so re-checking an edited article only
+analyzes the blocks that changed and merges them with the cached ones.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, TypeVar
+
+from libs.common.text import block_hash
+
+T = TypeVar("T")
+
+
+class BlockCache(Generic[T]):
+    """Thread-safe LRU of compute(block) results keyed by block_hash(block)."""
+
+    def __init__(self, compute: Callable[[str], T], maxsize: int | None = None) -> None:
+        if maxsize is None:
+            from libs.common.config import get_settings
+            maxsize = get_settings().quality_block_cache_size
+        self.compute = compute
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, T] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, blocks: list[str]) -> tuple[list[T], int]:
+        """Results for blocks in order, and how many of them had to be computed."""
+        keys = [block_hash(b) for b in blocks]
+        results: list[T | None] = [None] * len(blocks)
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                value = self._data.get(key)
+                if value is None:
+                    missing.append(i)
+                else:
+                    self._data.move_to_end(key)
+                    results[i] = value
+            self.hits += len(blocks) - len(missing)
+            self.misses += len(missing)
+        if not missing:
+            return results, 0  # type: ignore[return-value]
+        computed = {}
+        for i in missing:
+            key = keys[i]
+            if key not in computed:  # identical blocks inside one text are computed once
+                computed[key] = self.compute(blocks[i])
+            results[i] = computed[key]
+        if self.maxsize:
+            with self._lock:
+                self._data.update(computed)
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+        return results, len(computed)  # type: ignore[return-value]
+
+    def get_or_compute(self, key: str, compute: Callable[[], T]) -> tuple[T, bool]:
+        """Value under a caller-made key (e.g. a hash over several inputs), and whether it was computed."""
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value, False
+            self.misses += 1
+        value = compute()
+        if self.maxsize:
+            with self._lock:
+                self._data[key] = value
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+        return value, True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
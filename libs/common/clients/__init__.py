@@ -1,7 +1,7 @@
 """External service clients (interfaces + stubs)."""
 from libs.common.clients.serp import SerpProviderInterface, SerpResultItem, SerpStubClient
 from libs.common.clients.llm import LLMClientInterface, LLMStubClient
-from libs.common.clients.antiplagiat import AntiPlagiatInterface, AntiPlagiatStubClient
+from libs.common.clients.antiplagiat import AntiPlagiatInterface, AntiPlagiatStubClient, MinHashLSHClient
 from libs.common.clients.tilda import TildaPublisherInterface, TildaStubClient
 from libs.common.clients.indexer import IndexerInterface, IndexerStubClient
 
@@ -13,6 +13,7 @@ __all__ = [
     "LLMStubClient",
     "AntiPlagiatInterface",
     "AntiPlagiatStubClient",
+    "MinHashLSHClient",
     "TildaPublisherInterface",
     "TildaStubClient",
     "IndexerInterface",
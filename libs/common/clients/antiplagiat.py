@@ -2,25 +2,101 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Iterable
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
+
+class UniquenessMatch(BaseModel):
+    article_id: int
+    similarity: float  # estimated Jaccard similarity of shingles, 0..1
+    title: str | None = None
+    slug: str | None = None
 
 
 class UniquenessResult(BaseModel):
     score: float  # 0..1, 1 = unique
     pass_: bool
     details: str | None = None
+    matches: list[UniquenessMatch] = Field(default_factory=list)
 
 
 class AntiPlagiatInterface(ABC):
+    uses_db = False  # check() reads our database: batch callers open one session for all items
+
     @abstractmethod
-    def check(self, text: str) -> UniquenessResult:
-        """Check text uniqueness. No copying from other sources."""
+    def check(
+        self,
+        text: str,
+        exclude_ids: Iterable[int] = (),
+        signature: list[int] | None = None,
+        session: Session | None = None,
+    ) -> UniquenessResult:
+        """Check text uniqueness. No copying from other sources.
+
+        exclude_ids: our own articles not compared with (the article being rechecked). signature: MinHash
+        signature when the caller already computed it; session: an open session to use. Backends ignore
+        what they do not need.
+        """
         ...
 
 
 class AntiPlagiatStubClient(AntiPlagiatInterface):
     """Stub: always returns pass for MVP."""
 
-    def check(self, text: str) -> UniquenessResult:
+    def check(
+        self,
+        text: str,
+        exclude_ids: Iterable[int] = (),
+        signature: list[int] | None = None,
+        session: Session | None = None,
+    ) -> UniquenessResult:
         return UniquenessResult(score=1.0, pass_=True, details="Stub: no real check")
+
+
+class MinHashLSHClient(AntiPlagiatInterface):
+    """Near-duplicates among our own stored articles via the MinHash LSH index (see minhash_index)."""
+
+    uses_db = True
+
+    def __init__(self, max_similarity: float | None = None, limit: int = 5) -> None:
+        from libs.common.config import get_settings
+        self.max_similarity = get_settings().uniqueness_max_similarity if max_similarity is None else max_similarity
+        self.limit = limit
+
+    def check(
+        self,
+        text: str,
+        exclude_ids: Iterable[int] = (),
+        signature: list[int] | None = None,
+        session: Session | None = None,
+    ) -> UniquenessResult:
+        from libs.common.database import session_scope
+        from libs.common.minhash_index import find_similar, find_similar_signature
+
+        if session is None:
+            with session_scope() as db:
+                return self.check(text, exclude_ids, signature, db)
+        if signature is not None:
+            matches = find_similar_signature(session, signature, limit=self.limit, exclude_ids=exclude_ids)
+        else:
+            matches = find_similar(session, text, limit=self.limit, exclude_ids=exclude_ids)
+        return self.result(matches)
+
+    def result(self, matches: list[dict]) -> UniquenessResult:
+        """Verdict from find_similar*() output (best match first)."""
+        items = [UniquenessMatch(**m) for m in matches]
+        top = items[0].similarity if items else 0.0
+        details = f"closest: article {items[0].article_id} ({top:.0%})" if items else "no similar articles"
+        return UniquenessResult(score=round(1.0 - top, 3), pass_=top < self.max_similarity, details=details, matches=items)
+
+
+def get_antiplagiat_client() -> AntiPlagiatInterface:
+    """Backend selected by UNIQUENESS_BACKEND (minhash | stub)."""
+    from libs.common.config import get_settings
+    if get_settings().uniqueness_backend == "minhash":
+        return MinHashLSHClient()
+    return AntiPlagiatStubClient()
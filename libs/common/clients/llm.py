@@ -2,7 +2,8 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
 
 from pydantic import BaseModel
 
@@ -22,6 +23,22 @@ class LLMClientInterface(ABC):
         """Generate original draft markdown from brief. No copying."""
         ...
 
+    def generate_article_drafts(self, briefs: list[GenerationBrief]) -> list[str | Exception]:
+        """Drafts for several briefs, in order; a brief that failed gets its exception instead, so it does not
+        fail the rest. Override with the provider's batch API where it has one; the default makes one call
+        per brief, concurrently, so a batch takes as long as its slowest call."""
+        if len(briefs) <= 1:
+            return [_outcome(self.generate_article_draft, brief) for brief in briefs]
+        with ThreadPoolExecutor(max_workers=len(briefs), thread_name_prefix="llm-batch") as pool:
+            return list(pool.map(lambda brief: _outcome(self.generate_article_draft, brief), briefs))
+
+
+def _outcome(call: Callable[[GenerationBrief], str], brief: GenerationBrief) -> str | Exception:
+    try:
+        return call(brief)
+    except Exception as e:
+        return e
+
 
 class LLMStubClient(LLMClientInterface):
     """Stub: returns placeholder markdown without API key."""
@@ -23,10 +23,21 @@ class SerpAnalysis(BaseModel):
     suggested_structure: dict[str, Any]  # headings, sections suggested by SERP
 
 
+class SerpThrottledError(Exception):
+    """Provider rejected the call for rate/quota reasons (HTTP 429 etc.); retry later."""
+
+    def __init__(self, message: str = "SERP provider throttled the request", retry_after: float | None = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after  # seconds, when the provider says
+
+
 class SerpProviderInterface(ABC):
     @abstractmethod
     def analyze(self, query: str, region: str = "moscow") -> SerpAnalysis:
-        """Analyze SERP for structure and intent only. No content copying."""
+        """Analyze SERP for structure and intent only. No content copying.
+
+        Raises SerpThrottledError when the provider rate-limits the call.
+        """
         ...
 
 
@@ -22,10 +22,22 @@ class TildaPublishResult(BaseModel):
     is_draft: bool
 
 
+class TildaThrottledError(Exception):
+    """Tilda API rejected the call for rate reasons; retry later."""
+
+    def __init__(self, message: str = "Tilda API throttled the request", retry_after: float | None = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after  # seconds, when the API says
+
+
 class TildaPublisherInterface(ABC):
     @abstractmethod
     def publish(self, request: TildaPublishRequest) -> TildaPublishResult:
-        """Create/update page. as_draft=True => draft, False => publish."""
+        """Create/update page. as_draft=True => draft, False => publish.
+
+        Keyed by slug: repeating a call updates the same page, so retries are idempotent.
+        Raises TildaThrottledError when the API rate-limits the call.
+        """
         ...
 
 
@@ -0,0 +1,161 @@
+"""Bulk cluster/keyword import: streamed JSONL/CSV parsing and batched INSERT ... ON CONFLICT upserts."""
+from __future__ import annotations
+
+import csv
+import json
+from typing import IO, Iterable, Iterator
+
+from pydantic import ValidationError
+from sqlalchemy import func, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from libs.common.models.db_models import Cluster, Keyword
+from libs.common.schemas.clusters import ClusterCreate, ClusterImportReport, ImportRowError
+
+CLUSTER_BATCH_SIZE = 500
+KEYWORD_BATCH_SIZE = 5000  # 3 bind params per row, well under the 65535 limit
+MAX_REPORTED_ERRORS = 100
+
+_TRUE = {"1", "true", "yes", "y", "да"}
+
+
+def iter_jsonl(stream: IO[str]) -> Iterator[tuple[int, dict | None, str | None]]:
+    """One cluster object per line: {"name", "region", "slug", "priority", "is_active", "keywords": [...]}."""
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, None, f"invalid JSON: {e.msg}"
+            continue
+        if not isinstance(data, dict):
+            yield line_no, None, "expected a JSON object"
+            continue
+        yield line_no, data, None
+
+
+def iter_csv(stream: IO[str]) -> Iterator[tuple[int, dict | None, str | None]]:
+    """One keyword per row: slug,name,region,priority,is_active,keyword,volume (rows of a cluster share slug)."""
+    reader = csv.DictReader(stream)
+    for row in reader:
+        line_no = reader.line_num
+        row = {k.strip().lower(): (v or "").strip() for k, v in row.items() if k}
+        data: dict = {"name": row.get("name") or None, "region": row.get("region") or None, "slug": row.get("slug") or None}
+        if row.get("priority"):
+            data["priority"] = row["priority"]
+        if row.get("is_active"):
+            data["is_active"] = row["is_active"].lower() in _TRUE
+        if row.get("keyword"):
+            data["keywords"] = [{"keyword": row["keyword"], "volume": row.get("volume") or None}]
+        yield line_no, data, None
+
+
+def _merge_batch(batch: list[ClusterCreate]) -> list[ClusterCreate]:
+    """ON CONFLICT cannot touch the same row twice in one statement: collapse duplicate slugs (last wins)."""
+    by_slug: dict[str, ClusterCreate] = {}
+    for item in batch:
+        prev = by_slug.get(item.slug)
+        if prev is not None:
+            item = item.model_copy(update={"keywords": prev.keywords + item.keywords})
+        by_slug[item.slug] = item
+    return list(by_slug.values())
+
+
+def upsert_clusters(session: Session, clusters: list[ClusterCreate], report: ClusterImportReport) -> dict[str, int]:
+    """Upsert clusters by slug and their keywords by (cluster_id, keyword). Returns slug -> cluster id."""
+    clusters = _merge_batch(clusters)
+    if not clusters:
+        return {}
+    stmt = pg_insert(Cluster).values(
+        [
+            {"name": c.name, "region": c.region, "slug": c.slug, "is_active": c.is_active, "priority": c.priority}
+            for c in clusters
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Cluster.slug],
+        set_={
+            "name": stmt.excluded.name,
+            "region": stmt.excluded.region,
+            "is_active": stmt.excluded.is_active,
+            "priority": stmt.excluded.priority,
+            "updated_at": func.now(),
+        },
+    ).returning(Cluster.id, Cluster.slug, literal_column("xmax = 0").label("inserted"))
+    ids: dict[str, int] = {}
+    for row in session.execute(stmt):
+        ids[row.slug] = row.id
+        if row.inserted:
+            report.clusters_inserted += 1
+        else:
+            report.clusters_updated += 1
+
+    keywords: dict[tuple[int, str], int | None] = {}
+    for c in clusters:
+        for kw in c.keywords:
+            keywords[(ids[c.slug], kw.keyword)] = kw.volume
+    items = list(keywords.items())
+    for start in range(0, len(items), KEYWORD_BATCH_SIZE):
+        chunk = items[start:start + KEYWORD_BATCH_SIZE]
+        kw_stmt = pg_insert(Keyword).values(
+            [{"cluster_id": cid, "keyword": kw, "volume": vol} for (cid, kw), vol in chunk]
+        )
+        kw_stmt = kw_stmt.on_conflict_do_update(
+            index_elements=[Keyword.cluster_id, Keyword.keyword],
+            set_={"volume": func.coalesce(kw_stmt.excluded.volume, Keyword.volume), "updated_at": func.now()},
+        ).returning(literal_column("xmax = 0").label("inserted"))
+        for row in session.execute(kw_stmt):
+            if row.inserted:
+                report.keywords_inserted += 1
+            else:
+                report.keywords_updated += 1
+    return ids
+
+
+def import_clusters(
+    session: Session,
+    rows: Iterable[tuple[int, dict | None, str | None]],
+    batch_size: int = CLUSTER_BATCH_SIZE,
+) -> ClusterImportReport:
+    """Validate parsed rows and upsert them in batches, committing after each batch.
+
+    A file that stops decoding as UTF-8 ends the import: rows before it are kept and the
+    failure is reported as a row error.
+    """
+    report = ClusterImportReport()
+
+    def reject(line: int, error: str) -> None:
+        report.rejected += 1
+        if len(report.errors) < MAX_REPORTED_ERRORS:
+            report.errors.append(ImportRowError(line=line, error=error))
+
+    batch: list[ClusterCreate] = []
+    it, line_no = iter(rows), 0
+    while True:
+        try:
+            line_no, data, error = next(it)
+        except StopIteration:
+            break
+        except UnicodeDecodeError as e:
+            # Decoding runs ahead of the parser by a read chunk, so the bad bytes are at or after this line
+            reject(line_no + 1, f"file is not valid UTF-8 ({e.reason}); rows from here on were not imported")
+            break
+        if error is not None:
+            reject(line_no, error)
+            continue
+        try:
+            batch.append(ClusterCreate.model_validate(data))
+        except ValidationError as e:
+            reject(line_no, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+            continue
+        if len(batch) >= batch_size:
+            upsert_clusters(session, batch, report)
+            session.commit()
+            batch = []
+    if batch:
+        upsert_clusters(session, batch, report)
+        session.commit()
+    return report
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from functools import lru_cache
-from typing import Literal
+from typing import Any, Literal
 
 from pydantic import Field
 from pydantic import AliasChoices
@@ -42,12 +42,123 @@ class Settings(BaseSettings):
         description="PostgreSQL sync URL (alembic, RQ workers)",
     )
 
+    # Connection pool (per-service overrides: DB_POOL_OVERRIDES='{"scheduler-worker": {"pool_size": 2}}')
+    service_name: str = Field(default="default", description="Service name for pool overrides/metrics (env: SERVICE_NAME)")
+    db_pool_size: int = Field(default=5, description="Persistent connections per process (env: DB_POOL_SIZE)")
+    db_max_overflow: int = Field(default=5, description="Extra connections above pool size (env: DB_MAX_OVERFLOW)")
+    db_pool_timeout: float = Field(default=30.0, description="Seconds to wait for a free connection")
+    db_pool_recycle: int = Field(default=1800, description="Recycle connections older than N seconds")
+    db_statement_timeout_ms: int = Field(default=30_000, description="Postgres statement_timeout, 0 = off")
+    db_pgbouncer: bool = Field(default=False, description="PgBouncer (transaction pooling) compatible mode")
+    db_pool_overrides: dict[str, dict[str, Any]] = Field(
+        default_factory=dict, description="Per-service pool settings, JSON keyed by SERVICE_NAME",
+    )
+
     # Redis
     redis_url: str = Field(default="redis://localhost:6379/0", description="Redis URL (env: REDIS_URL)")
 
     # Rate limiting
     daily_token_quota: int = Field(default=100_000, description="Max tokens per day (env or settings)")
 
+    # Performance history (monthly partitions of the performance table)
+    performance_partitions_ahead: int = Field(default=3, description="Future monthly partitions to keep created")
+    performance_retention_months: int = Field(default=25, description="Raw performance months to keep (rollups stay)")
+    performance_retention_mode: Literal["detach", "drop"] = Field(
+        default="detach", description="detach = keep old partitions as performance_archive_* tables",
+    )
+
+    # Jobs retention (finished jobs are moved to jobs_archive)
+    job_retention_days: int = Field(default=30, description="Archive completed/failed jobs older than N days")
+    job_archive_batch_size: int = Field(default=1000, description="Jobs moved per archival transaction")
+
+    # Uniqueness (quality gate): MinHash LSH index over stored articles, or the always-pass stub
+    uniqueness_backend: Literal["minhash", "stub"] = Field(default="minhash", description="minhash | stub")
+    uniqueness_max_similarity: float = Field(
+        default=0.5, ge=0, le=1, description="Fail when estimated Jaccard similarity to a stored article reaches this",
+    )
+
+    # Quality gate text metrics (keyword stuffing thresholds, shares of words)
+    quality_max_keyword_density: float = Field(default=0.03, description="Target keyword words / all words")
+    quality_max_term_density: float = Field(default=0.06, description="Most frequent content stem / all words")
+    quality_max_trigram_repetition: float = Field(default=0.15, description="Repeated trigram occurrences share")
+    quality_workers: int = Field(default=0, ge=0, description="Processes for batch checks (0 = CPU count)")
+    quality_block_cache_size: int = Field(
+        default=20000, ge=0, description="Paragraph/section results kept per process for incremental checks (LRU)"
+    )
+    quality_rules_refresh_seconds: float = Field(
+        default=10.0, ge=0, description="How often the quality gate checks quality_rules for changes"
+    )
+
+    # SEO optimizer: TF-IDF/LSI term suggestions (corpus of SERP snippets + our articles)
+    lsi_terms_limit: int = Field(default=15, description="Missing co-occurring terms suggested per draft")
+    lsi_context_articles: int = Field(default=200, description="Own articles with the keyword used as context")
+    lsi_refresh_seconds: float = Field(default=30.0, ge=0, description="How often the term model pulls df changes")
+
+    # Internal linking (related published articles by TF-IDF cosine)
+    internal_links_max: int = Field(default=3, ge=0, description="Links to related articles per new article")
+    internal_links_min_score: float = Field(default=0.1, description="Min cosine similarity of a related article")
+    internal_links_related_block: bool = Field(
+        default=True, description="List related articles without an anchor under 'Читайте также'"
+    )
+
+    # SERP provider limits (serp-intel batch analysis; per process)
+    serp_qps: float = Field(default=5.0, gt=0, description="Provider calls per second")
+    serp_burst: int = Field(default=0, ge=0, description="Calls allowed at once after idle (0 = one second's worth)")
+    serp_daily_quota: int = Field(default=0, ge=0, description="Provider calls per UTC day (0 = unlimited)")
+    serp_batch_concurrency: int = Field(default=16, ge=1, description="Calls in flight in a batch")
+    serp_max_retries: int = Field(default=4, ge=0, description="Retries of a throttled or failed call")
+    serp_backoff_base_seconds: float = Field(default=1.0, gt=0, description="First retry delay (doubles, with jitter)")
+
+    # Draft buffer: drafts generated off-peak for upcoming clusters
+    draft_buffer_size: int = Field(default=5, ge=0, description="Unexpired drafts kept ready for the clusters the daily run picks")
+    draft_buffer_ttl_hours: float = Field(default=72.0, gt=0, description="A buffered draft is discarded after this")
+    draft_prefetch_hours: str = Field(
+        default="1-6", pattern=r"^\d{1,2}-\d{1,2}$", description="Off-peak local hours 'start-end' for prefetch"
+    )
+    draft_prefetch_timezone: str = Field(default="Europe/Moscow", description="Time zone of draft_prefetch_hours")
+
+    # Content gen: concurrent /generate requests are sent to the LLM in micro-batches
+    content_gen_batch_max_size: int = Field(default=8, ge=1, description="Briefs per LLM batch call")
+    content_gen_batch_wait_ms: float = Field(
+        default=20.0, ge=0, description="How long the first request of a batch waits for others"
+    )
+    content_gen_batch_in_flight: int = Field(default=4, ge=1, description="LLM batch calls running at once")
+
+    # Keyword clustering by SERP overlap
+    cluster_top_n: int = Field(default=10, ge=1, le=100, description="SERP positions compared per keyword")
+    cluster_min_overlap: int = Field(default=4, ge=1, description="Shared top URLs to join a cluster center")
+    cluster_max_url_keywords: int = Field(
+        default=1000, ge=0, description="Ignore URLs ranking for more keywords than this (aggregators; 0 = keep all)"
+    )
+
+    # SERP snapshot history (change-only rows, full state every N changes)
+    serp_snapshot_keyframe_every: int = Field(
+        default=50, ge=1, description="Store the full SERP state every N changes (deltas in between)"
+    )
+
+    # Publisher: markdown -> HTML rendering
+    render_cache_size: int = Field(
+        default=500, ge=0, description="Rendered pages kept per publisher process, keyed by content hash (LRU)"
+    )
+
+    # Static site export (scripts/export_static.py)
+    static_export_dir: str = Field(default="static_site", description="Directory of exported pages and manifest.json")
+
+    # Sitemaps of published Tilda URLs (scripts/generate_sitemaps.py)
+    sitemap_dir: str = Field(default="sitemaps", description="Directory of sitemap.xml and sitemap-N.xml shards")
+    sitemap_base_url: str = Field(default="", description="Public URL of sitemap_dir, used in the sitemap index")
+
+    # Publisher: durable publish queue (Tilda API rate limit, retries, unchanged pages skipped)
+    tilda_qps: float = Field(default=2.0, gt=0, description="Tilda API calls per second (all queue workers together)")
+    tilda_burst: int = Field(default=0, ge=0, description="Tilda API calls allowed back-to-back (0 = qps)")
+    publish_batch_size: int = Field(default=50, ge=1, description="Queue tasks claimed and finished per transaction")
+    publish_max_attempts: int = Field(default=5, ge=1, description="Tilda calls per task before it fails")
+    publish_backoff_base_seconds: float = Field(default=5.0, gt=0, description="Base of the retry backoff")
+    publish_poll_seconds: float = Field(default=2.0, gt=0, description="Queue poll interval when it is empty")
+    publish_stale_seconds: int = Field(
+        default=600, ge=60, description="Processing tasks older than this are reclaimed (worker died mid-batch)"
+    )
+
     # Optional API keys (stubs work without them)
     serp_api_key: str | None = Field(default=None, description="SERP API key (env: SERP_API_KEY)")
     llm_api_key: str | None = Field(default=None, description="LLM API key (env: LLM_API_KEY)")
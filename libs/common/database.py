@@ -4,31 +4,41 @@ from __future__ import annotations
 from contextlib import contextmanager
 from typing import Generator
 
-from sqlalchemy import create_engine
 from sqlalchemy.orm import Session, sessionmaker
 
-from libs.common.config import get_settings
+from libs.common.engine_registry import get_sync_engine
 from libs.common.models.base import Base
 from libs.common.models.db_models import (  # noqa: F401 — for Base.metadata
     Article,
+    ArticleLink,
+    ArticleMinhash,
+    ArticleMinhashBand,
+    ArticleVectorTerm,
+    BufferedDraft,
     Cluster,
+    CorpusDocument,
+    CorpusTerm,
     Job,
+    JobArchive,
+    JobCounter,
     Keyword,
     LinkSite,
     LinkTask,
     CaseTemplate,
     Performance,
+    PerformanceRollup,
+    PublishTask,
+    PublishedPage,
+    QualityRule,
+    SerpSnapshot,
+    SerpSnapshotHead,
     Setting,
 )
 
 
 def get_engine():
-    settings = get_settings()
-    return create_engine(
-        settings.database_url_sync,
-        pool_pre_ping=True,
-        echo=settings.debug,
-    )
+    """Shared engine for this service (pool settings: see engine_registry)."""
+    return get_sync_engine()
 
 
 def get_session_factory():
@@ -3,36 +3,43 @@ from __future__ import annotations
 
 from typing import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 
-from libs.common.config import get_settings
+from libs.common.engine_registry import get_async_engine as _registry_async_engine
 from libs.common.models.base import Base
 from libs.common.models.db_models import (  # noqa: F401
     Article,
+    ArticleLink,
+    ArticleMinhash,
+    ArticleMinhashBand,
+    ArticleVectorTerm,
+    BufferedDraft,
     Cluster,
+    CorpusDocument,
+    CorpusTerm,
     Job,
+    JobArchive,
+    JobCounter,
     Keyword,
     LinkSite,
     LinkTask,
     CaseTemplate,
     Performance,
+    PerformanceRollup,
+    PublishTask,
+    PublishedPage,
+    QualityRule,
+    SerpSnapshot,
+    SerpSnapshotHead,
     Setting,
 )
 
-_async_engine = None
 _async_session_factory = None
 
 
 def get_async_engine():
-    global _async_engine
-    if _async_engine is None:
-        _async_engine = create_async_engine(
-            get_settings().database_url,
-            pool_pre_ping=True,
-            echo=get_settings().debug,
-        )
-    return _async_engine
+    return _registry_async_engine()
 
 
 def get_async_session_factory():
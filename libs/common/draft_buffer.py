@@ -0,0 +1,118 @@
+"""Draft buffer: drafts generated off-peak for upcoming clusters, used by the daily pipeline.
+
+The pipeline picks the top cluster of a region (pipeline_clusters(): active, priority desc, then id),
+Moscow with probability moscow_share. The prefetch task (off-peak hours only) keeps up to
+draft_buffer_size unexpired drafts for exactly those clusters, split between the regions by the same
+share, several per cluster when the buffer covers more than one day. The pipeline takes its cluster's
+oldest unexpired draft (row deleted on take, SKIP LOCKED so concurrent runs never share one) and skips
+the SERP and LLM calls; without one it generates as before. Expired drafts are purged on every
+prefetch run.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from libs.common.models.db_models import BufferedDraft, Cluster, Keyword
+
+PIPELINE_REGIONS = ("moscow", "rf")
+
+
+def in_window(hours: str, tz: str, now: datetime | None = None) -> bool:
+    """Whether the local hour is within "start-end" (end exclusive; "22-6" wraps midnight)."""
+    start, end = (int(h) for h in hours.split("-", 1))
+    hour = (now or datetime.now(timezone.utc)).astimezone(ZoneInfo(tz)).hour
+    return start <= hour < end if start <= end else hour >= start or hour < end
+
+
+def purge_expired(session: Session) -> int:
+    return session.execute(delete(BufferedDraft).where(BufferedDraft.expires_at <= func.now())).rowcount or 0
+
+
+def pipeline_clusters(session: Session) -> dict[str, Cluster]:
+    """region -> the cluster the daily pipeline takes there: active, highest priority, lowest id on ties."""
+    top = {}
+    for region in PIPELINE_REGIONS:
+        cluster = session.execute(
+            select(Cluster)
+            .where(Cluster.region == region, Cluster.is_active.is_(True))
+            .order_by(Cluster.priority.desc(), Cluster.id)
+            .limit(1)
+        ).scalars().first()
+        if cluster is not None:
+            top[region] = cluster
+    return top
+
+
+def cluster_keyword(session: Session, cluster: Cluster) -> str:
+    """The cluster's first keyword, else its name."""
+    keyword = session.execute(
+        select(Keyword.keyword).where(Keyword.cluster_id == cluster.id).order_by(Keyword.id).limit(1)
+    ).scalar_one_or_none()
+    return keyword or cluster.name
+
+
+def clusters_to_prefetch(session: Session, size: int, moscow_share: float) -> list[dict[str, Any]]:
+    """One {id, name, region, keyword} per missing draft of the pipeline's clusters (a cluster may repeat)."""
+    top = pipeline_clusters(session)
+    if not top:
+        return []
+    moscow = round(size * moscow_share) if len(top) > 1 else size
+    wanted = {"moscow": moscow, "rf": size - moscow} if len(top) > 1 else {region: size for region in top}
+    have = dict(session.execute(
+        select(BufferedDraft.cluster_id, func.count())
+        .where(BufferedDraft.cluster_id.in_([c.id for c in top.values()]), BufferedDraft.expires_at > func.now())
+        .group_by(BufferedDraft.cluster_id)
+    ).all())
+    result = []
+    for region, cluster in top.items():
+        missing = wanted[region] - have.get(cluster.id, 0)
+        if missing > 0:
+            keyword = cluster_keyword(session, cluster)
+            result += [{"id": cluster.id, "name": cluster.name, "region": region, "keyword": keyword}] * missing
+    return result
+
+
+def store_draft(
+    session: Session,
+    cluster_id: int,
+    target_keyword: str,
+    region: str,
+    serp_data: dict[str, Any] | None,
+    draft_markdown: str,
+    ttl_hours: float,
+) -> int:
+    row = BufferedDraft(
+        cluster_id=cluster_id,
+        target_keyword=target_keyword,
+        region=region,
+        serp_data=serp_data,
+        draft_markdown=draft_markdown,
+        expires_at=datetime.now(timezone.utc) + timedelta(hours=ttl_hours),
+    )
+    session.add(row)
+    session.flush()
+    return row.id
+
+
+def take_draft(session: Session, cluster_id: int) -> dict[str, Any] | None:
+    """Remove and return the cluster's oldest unexpired draft, if any."""
+    oldest = (
+        select(BufferedDraft.id)
+        .where(BufferedDraft.cluster_id == cluster_id, BufferedDraft.expires_at > func.now())
+        .order_by(BufferedDraft.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    row = session.execute(
+        delete(BufferedDraft)
+        .where(BufferedDraft.id == oldest)
+        .returning(BufferedDraft.target_keyword, BufferedDraft.serp_data, BufferedDraft.draft_markdown,
+                   BufferedDraft.created_at)
+    ).one_or_none()
+    return dict(row._mapping) if row else None
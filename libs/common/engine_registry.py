@@ -0,0 +1,241 @@
+"""Engine registry: one engine per (service, URL) with per-service pool settings and pool metrics.
+
+Pool settings come from env (DB_POOL_SIZE, DB_MAX_OVERFLOW, ...) and can be overridden for a
+single service via DB_POOL_OVERRIDES, e.g. '{"scheduler-worker": {"pool_size": 2, "max_overflow": 0}}'.
+SERVICE_NAME selects the override set. DB_PGBOUNCER=true switches to PgBouncer-compatible mode:
+no client-side pooling, no server-side prepared statements, statement_timeout set per transaction.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+from pydantic import BaseModel, Field
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+from libs.common.config import Settings, get_settings
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class PoolConfig(BaseModel):
+    pool_size: int = Field(default=5, ge=1)
+    max_overflow: int = Field(default=5, ge=0)
+    pool_timeout: float = Field(default=30.0, gt=0, description="Seconds to wait for a free connection")
+    pool_recycle: int = Field(default=1800, description="Recycle connections older than N seconds (-1 = never)")
+    statement_timeout_ms: int = Field(default=30_000, ge=0, description="0 = no timeout")
+    pgbouncer: bool = False
+
+    model_config = {"extra": "forbid"}
+
+
+def resolve_pool_config(settings: Settings | None = None, service: str | None = None) -> PoolConfig:
+    """Base pool settings from env, overridden by DB_POOL_OVERRIDES[service]."""
+    settings = settings or get_settings()
+    service = service or settings.service_name
+    values: dict[str, Any] = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "statement_timeout_ms": settings.db_statement_timeout_ms,
+        "pgbouncer": settings.db_pgbouncer,
+    }
+    values.update(settings.db_pool_overrides.get(service, {}))
+    return PoolConfig.model_validate(values)
+
+
+# --- Metrics ---
+class PoolMetrics:
+    """Checkout wait time, in-use and waiting counters for one engine's pool (thread-safe)."""
+
+    def __init__(self, service: str, kind: str) -> None:
+        self.service = service
+        self.kind = kind
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.in_use = 0
+        self.waiting = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def wait_started(self) -> None:
+        with self._lock:
+            self.waiting += 1
+
+    def wait_finished(self, seconds: float, ok: bool, timed_out: bool = False) -> None:
+        with self._lock:
+            self.waiting -= 1
+            if timed_out:
+                self.timeouts += 1
+            if ok:
+                self.checkouts += 1
+                self.wait_seconds_total += seconds
+                self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def checked_out(self) -> None:
+        with self._lock:
+            self.in_use += 1
+
+    def checked_in(self) -> None:
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    def snapshot(self, pool: Pool) -> dict[str, Any]:
+        with self._lock:
+            data: dict[str, Any] = {
+                "service": self.service,
+                "kind": self.kind,
+                "pool_class": type(pool).__name__,
+                "in_use": self.in_use,
+                "waiting": self.waiting,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": round(1000 * self.wait_seconds_total / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_ms_max": round(1000 * self.wait_seconds_max, 3),
+            }
+        if isinstance(pool, QueuePool):
+            data.update(size=pool.size(), checked_in=pool.checkedin(), overflow=max(0, pool.overflow()))
+        return data
+
+
+class _TimedCheckoutMixin:
+    """Measures time spent in Pool._do_get, i.e. waiting for (or opening) a connection."""
+
+    _metrics: PoolMetrics | None = None
+
+    def _do_get(self):  # type: ignore[no-untyped-def]
+        metrics = self._metrics
+        if metrics is None:
+            return super()._do_get()  # type: ignore[misc]
+        metrics.wait_started()
+        start = time.perf_counter()
+        ok = timed_out = False
+        try:
+            conn = super()._do_get()  # type: ignore[misc]
+            ok = True
+            return conn
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            metrics.wait_finished(time.perf_counter() - start, ok=ok, timed_out=timed_out)
+
+    def recreate(self):  # type: ignore[no-untyped-def]
+        # dispose() builds a fresh pool of the same class; keep counting into the same metrics
+        new_pool = super().recreate()  # type: ignore[misc]
+        new_pool._metrics = self._metrics
+        return new_pool
+
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class InstrumentedNullPool(_TimedCheckoutMixin, NullPool):
+    pass
+
+
+# --- Registry ---
+_lock = threading.Lock()
+_engines: dict[tuple[str, str, bool], Any] = {}
+_metrics: dict[tuple[str, str, bool], PoolMetrics] = {}
+
+
+def _engine_kwargs(config: PoolConfig, is_async: bool) -> dict[str, Any]:
+    kwargs: dict[str, Any] = {"pool_pre_ping": True, "echo": get_settings().debug}
+    if config.pgbouncer:
+        # PgBouncer does the pooling; holding idle server slots per replica defeats it.
+        kwargs["poolclass"] = InstrumentedNullPool
+        if is_async:
+            # asyncpg prepares statements per connection, which breaks under transaction pooling
+            kwargs["connect_args"] = {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+        return kwargs
+    kwargs.update(
+        poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        pool_size=config.pool_size,
+        max_overflow=config.max_overflow,
+        pool_timeout=config.pool_timeout,
+        pool_recycle=config.pool_recycle,
+    )
+    if config.statement_timeout_ms:
+        if is_async:
+            kwargs["connect_args"] = {"server_settings": {"statement_timeout": str(config.statement_timeout_ms)}}
+        else:
+            kwargs["connect_args"] = {"options": f"-c statement_timeout={config.statement_timeout_ms}"}
+    return kwargs
+
+
+def _instrument(sync_engine: Engine, config: PoolConfig, metrics: PoolMetrics) -> None:
+    sync_engine.pool._metrics = metrics  # type: ignore[attr-defined]
+    event.listen(sync_engine, "checkout", lambda *_: metrics.checked_out())
+    event.listen(sync_engine, "checkin", lambda *_: metrics.checked_in())
+    if config.pgbouncer and config.statement_timeout_ms:
+        # Startup "options" are rejected by PgBouncer and SET would leak to other clients
+        # in transaction pooling, so scope the timeout to each transaction.
+        timeout_sql = f"SET LOCAL statement_timeout = {int(config.statement_timeout_ms)}"
+        event.listen(sync_engine, "begin", lambda conn: conn.exec_driver_sql(timeout_sql))
+
+
+def get_sync_engine(service: str | None = None) -> Engine:
+    """Shared sync engine for this process (RQ workers, sync FastAPI handlers)."""
+    settings = get_settings()
+    service = service or settings.service_name
+    key = (service, settings.database_url_sync, False)
+    with _lock:
+        engine = _engines.get(key)
+        if engine is None:
+            config = resolve_pool_config(settings, service)
+            engine = create_engine(settings.database_url_sync, **_engine_kwargs(config, is_async=False))
+            metrics = PoolMetrics(service, "sync")
+            _instrument(engine, config, metrics)
+            _engines[key] = engine
+            _metrics[key] = metrics
+    return engine  # type: ignore[return-value]
+
+
+def get_async_engine(service: str | None = None) -> AsyncEngine:
+    """Shared async engine for this process."""
+    from sqlalchemy.ext.asyncio import create_async_engine  # needs greenlet; sync services skip it
+
+    settings = get_settings()
+    service = service or settings.service_name
+    key = (service, settings.database_url, True)
+    with _lock:
+        engine = _engines.get(key)
+        if engine is None:
+            config = resolve_pool_config(settings, service)
+            engine = create_async_engine(settings.database_url, **_engine_kwargs(config, is_async=True))
+            metrics = PoolMetrics(service, "async")
+            _instrument(engine.sync_engine, config, metrics)
+            _engines[key] = engine
+            _metrics[key] = metrics
+    return engine  # type: ignore[return-value]
+
+
+def pool_metrics() -> list[dict[str, Any]]:
+    """Snapshot of all engines created in this process."""
+    with _lock:
+        items = list(_engines.items())
+    result = []
+    for key, engine in items:
+        pool = engine.sync_engine.pool if key[2] else engine.pool
+        result.append(_metrics[key].snapshot(pool))
+    return result
+
+
+def dispose_engines() -> None:
+    """Close pooled connections (e.g. after fork in a worker process)."""
+    with _lock:
+        items = list(_engines.items())
+    for key, engine in items:
+        (engine.sync_engine if key[2] else engine).dispose(close=False)
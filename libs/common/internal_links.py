@@ -0,0 +1,251 @@
+"""Internal linking: related published articles by TF-IDF cosine, anchors inserted into markdown.
+
+Each published article is stored as a pruned sparse vector: its VECTOR_TERMS highest TF-IDF terms
+(lsi vocabulary and IDF), L2-normalized, one article_vector_terms row per term keyed by a 64-bit
+term hash. That table is an inverted index: a query joins only the posting lists of its own
+QUERY_TERMS strongest terms and sums weight products per article, so top-k cosine runs in Postgres
+with cost bound by those lists, not by the number of pages, and nothing is held in process memory.
+Publishing an article replaces just its rows; nothing moves an article out of published, and
+reindex_published() drops the rows of articles unpublished by hand.
+
+Anchors are found by stems (an inflected mention of the related article's keyword or title in the
+text), outside headings, code, HTML and existing links; related articles without a mention go to a
+"Читайте также" list at the end.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import Any, Iterable
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.orm import Session
+
+from libs.common.logging import get_logger
+from libs.common.lsi import TermModel, document_terms, get_term_model
+from libs.common.models.db_models import Article, ArticleLink, ArticleStatus, ArticleVectorTerm
+from libs.common.text import stem
+from libs.common.text_metrics import STOPWORDS
+
+logger = get_logger(__name__)
+
+VECTOR_TERMS = 64
+QUERY_TERMS = 24
+RELATED_HEADING = "Читайте также"
+
+_WORD = re.compile(r"[а-яёa-z]+(?:-[а-яёa-z]+)*", re.IGNORECASE)
+_PROTECTED = re.compile(
+    r"```[\s\S]*?```|~~~[\s\S]*?~~~|`[^`\n]*`|!?\[[^\]]*\]\([^)]*\)|<[^>]+>|^[ \t]{0,3}#{1,6}[ \t][^\n]*",
+    re.MULTILINE,
+)
+
+
+def term_id(term: str) -> int:
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little", signed=True)
+
+
+def article_vector(model: TermModel, content: str, size: int = VECTOR_TERMS) -> dict[int, float]:
+    """Strongest `size` TF-IDF terms of content, renormalized, keyed by term_id."""
+    counts, _ = document_terms(content)
+    if not counts:
+        return {}
+    top = sorted(model.vector(counts).items(), key=lambda kv: (-kv[1], kv[0]))[:size]
+    norm = sum(w * w for _, w in top) ** 0.5 or 1.0
+    return {term_id(t): w / norm for t, w in top}
+
+
+def index_article_vector(session: Session, article_id: int, content: str | None, model: TermModel | None = None) -> int:
+    """Replace one article's postings (call on publish). Returns the number of stored terms."""
+    session.execute(delete(ArticleVectorTerm).where(ArticleVectorTerm.article_id == article_id))
+    vector = article_vector(model or get_term_model(session), content or "")
+    if vector:
+        session.execute(
+            ArticleVectorTerm.__table__.insert(),
+            [{"term": t, "article_id": article_id, "weight": w} for t, w in sorted(vector.items())],
+        )
+    return len(vector)
+
+
+def related_articles(
+    session: Session,
+    content: str,
+    limit: int = 5,
+    min_score: float = 0.1,
+    exclude_ids: Iterable[int] = (),
+    model: TermModel | None = None,
+) -> list[dict[str, Any]]:
+    """Published articles most similar to content (cosine over pruned vectors), best first."""
+    vector = article_vector(model or get_term_model(session), content)
+    query = sorted(vector.items(), key=lambda kv: -kv[1])[:QUERY_TERMS]
+    if not query:
+        return []
+    rows = session.execute(
+        text(
+            """
+            SELECT p.article_id, sum(p.weight * q.weight) AS score
+            FROM article_vector_terms p
+            JOIN unnest(CAST(:terms AS bigint[]), CAST(:weights AS float8[])) AS q(term, weight) ON p.term = q.term
+            WHERE NOT (p.article_id = ANY(CAST(:exclude AS int[])))
+            GROUP BY p.article_id
+            HAVING sum(p.weight * q.weight) >= :min_score
+            ORDER BY score DESC
+            LIMIT :limit
+            """
+        ),
+        {
+            "terms": [t for t, _ in query],
+            "weights": [w for _, w in query],
+            "exclude": list(exclude_ids),
+            "min_score": min_score,
+            "limit": limit * 2,  # some hits may no longer be published
+        },
+    ).all()
+    if not rows:
+        return []
+    scores = {r.article_id: float(r.score) for r in rows}
+    articles = session.execute(
+        select(Article.id, Article.title, Article.slug, Article.tilda_url, Article.target_keyword)
+        .where(Article.id.in_(list(scores)), Article.status == ArticleStatus.PUBLISHED.value)
+    ).all()
+    related = [
+        {
+            "article_id": a.id,
+            "title": a.title,
+            "url": a.tilda_url or f"/{a.slug}",
+            "target_keyword": a.target_keyword,
+            "score": round(scores[a.id], 4),
+        }
+        for a in articles
+    ]
+    related.sort(key=lambda r: (-r["score"], r["article_id"]))
+    return related[:limit]
+
+
+def _content_words(markdown: str) -> list[tuple[str, int, int]]:
+    """(stem, start, end) of content words outside protected regions; a protected region breaks phrases."""
+    result: list[tuple[str, int, int]] = []
+    last = 0
+    for region in [*_PROTECTED.finditer(markdown), None]:
+        end = region.start() if region else len(markdown)
+        for m in _WORD.finditer(markdown, last, end):
+            word = m.group().lower().replace("ё", "е")
+            if word not in STOPWORDS:
+                result.append((stem(word), m.start(), m.end()))
+        if region:
+            result.append(("", region.start(), region.end()))  # barrier: never part of a match
+            last = region.end()
+    return result
+
+
+def _find_anchor(
+    tokens: list[tuple[str, int, int]], markdown: str, phrase: str, taken: list[tuple[int, int]]
+) -> tuple[int, int] | None:
+    """First span whose content-word stems equal the phrase's, on one line and not overlapping taken spans."""
+    phrase_words = [w.lower().replace("ё", "е") for w in _WORD.findall(phrase)]
+    target = [stem(w) for w in phrase_words if w not in STOPWORDS]
+    n = len(target)
+    if not n:
+        return None
+    for i in range(len(tokens) - n + 1):
+        if tokens[i][0] != target[0] or [t[0] for t in tokens[i:i + n]] != target:
+            continue
+        start, end = tokens[i][1], tokens[i + n - 1][2]
+        if "\n" in markdown[start:end] or any(start < e and s < end for s, e in taken):
+            continue
+        return start, end
+    return None
+
+
+def insert_links(
+    markdown: str, related: list[dict[str, Any]], related_block: bool = True
+) -> tuple[str, list[dict[str, Any]]]:
+    """Link the first stem-level mention of each related article; the rest go to a "Читайте также" list."""
+    tokens = _content_words(markdown)
+    spans: list[tuple[int, int, dict[str, Any]]] = []
+    unanchored = []
+    for item in related:
+        span = None
+        for phrase in (item.get("target_keyword"), item.get("title")):
+            if phrase:
+                span = _find_anchor(tokens, markdown, phrase, [(s, e) for s, e, _ in spans])
+                if span:
+                    break
+        if span:
+            spans.append((span[0], span[1], item))
+        else:
+            unanchored.append(item)
+    links = []
+    for start, end, item in sorted(spans, key=lambda s: s[0], reverse=True):
+        anchor = markdown[start:end]
+        markdown = f"{markdown[:start]}[{anchor}]({item['url']}){markdown[end:]}"
+        links.append({**item, "anchor": anchor})
+    links.reverse()
+    if related_block and unanchored:
+        lines = "\n".join(f"- [{item['title'] or item['url']}]({item['url']})" for item in unanchored)
+        markdown = f"{markdown.rstrip()}\n\n## {RELATED_HEADING}\n\n{lines}\n"
+        links.extend({**item, "anchor": None} for item in unanchored)
+    return markdown, links
+
+
+def link_article(
+    session: Session,
+    markdown: str,
+    exclude_ids: Iterable[int] = (),
+    limit: int | None = None,
+    min_score: float | None = None,
+) -> tuple[str, list[dict[str, Any]]]:
+    """Markdown with links to related published articles, and the links made."""
+    from libs.common.config import get_settings
+
+    settings = get_settings()
+    related = related_articles(
+        session,
+        markdown,
+        limit=settings.internal_links_max if limit is None else limit,
+        min_score=settings.internal_links_min_score if min_score is None else min_score,
+        exclude_ids=exclude_ids,
+    )
+    if not related:
+        return markdown, []
+    return insert_links(markdown, related, related_block=settings.internal_links_related_block)
+
+
+def save_links(session: Session, article_id: int, links: list[dict[str, Any]]) -> None:
+    session.execute(delete(ArticleLink).where(ArticleLink.source_article_id == article_id))
+    if links:
+        session.execute(
+            ArticleLink.__table__.insert(),
+            [
+                {
+                    "source_article_id": article_id,
+                    "target_article_id": link["article_id"],
+                    "anchor": link["anchor"][:256] if link["anchor"] else None,
+                    "score": link["score"],
+                }
+                for link in links
+            ],
+        )
+
+
+def reindex_published(session: Session, batch_size: int = 200) -> int:
+    """Rebuild postings of all published articles, committing per batch; drops those of unpublished ones."""
+    model = get_term_model(session, force=True)
+    published = select(Article.id).where(Article.status == ArticleStatus.PUBLISHED.value)
+    session.execute(delete(ArticleVectorTerm).where(ArticleVectorTerm.article_id.not_in(published)))
+    session.commit()
+    last_id, total = 0, 0
+    while True:
+        rows = session.execute(
+            select(Article.id, Article.final_markdown, Article.draft_markdown)
+            .where(Article.id > last_id, Article.status == ArticleStatus.PUBLISHED.value)
+            .order_by(Article.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            total += bool(index_article_vector(session, row.id, row.final_markdown or row.draft_markdown, model))
+        last_id = rows[-1].id
+        session.commit()
+    logger.info("internal_links_reindexed", articles=total)
+    return total
@@ -0,0 +1,186 @@
+"""Jobs retention: move finished jobs into jobs_archive in batches and keep per-type counters.
+
+Each archived job is stored as zlib-compressed JSON of the full row, keyed by the original id, so
+GET /jobs/{id} still works after archival. job_counters keeps totals for archived jobs, which lets
+stats be computed from the (small) live table plus one tiny table.
+"""
+from __future__ import annotations
+
+import json
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from libs.common.config import get_settings
+from libs.common.logging import get_logger
+from libs.common.models.db_models import Job, JobArchive, JobCounter, JobStatus
+
+logger = get_logger(__name__)
+
+ARCHIVABLE_STATUSES = (JobStatus.COMPLETED.value, JobStatus.FAILED.value)
+
+_jobs = Job.__table__
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"not JSON serializable: {type(value).__name__}")
+
+
+def pack_job(row: dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(row, default=_json_default, ensure_ascii=False).encode("utf-8"), 6)
+
+
+def unpack_job(data: bytes) -> dict[str, Any]:
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+def _add_to_counters(counters: dict[tuple[str, str], dict[str, Any]], row: dict[str, Any]) -> None:
+    c = counters.setdefault(
+        (row["job_type"], row["status"]),
+        {"job_type": row["job_type"], "status": row["status"], "archived": 0, "timed": 0,
+         "duration_seconds_total": 0.0, "last_finished_at": None},
+    )
+    c["archived"] += 1
+    started, finished = row["started_at"], row["finished_at"]
+    if started and finished:
+        c["timed"] += 1
+        c["duration_seconds_total"] += (finished - started).total_seconds()
+    if finished and (c["last_finished_at"] is None or finished > c["last_finished_at"]):
+        c["last_finished_at"] = finished
+
+
+def _archive_batch(session: Session, cutoff: datetime, batch_size: int) -> int:
+    rows = [
+        dict(r)
+        for r in session.execute(
+            select(_jobs)
+            .where(_jobs.c.status.in_(ARCHIVABLE_STATUSES), _jobs.c.created_at < cutoff)
+            .order_by(_jobs.c.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).mappings()
+    ]
+    if not rows:
+        return 0
+
+    archive = [
+        {
+            "id": row["id"],
+            "job_type": row["job_type"],
+            "status": row["status"],
+            "created_at": row["created_at"],
+            "finished_at": row["finished_at"],
+            "data": pack_job(row),
+        }
+        for row in rows
+    ]
+    # An id already in the archive (re-run after a crash between insert and delete) is not counted twice
+    inserted = set(
+        session.execute(
+            pg_insert(JobArchive).values(archive)
+            .on_conflict_do_nothing(index_elements=[JobArchive.id])
+            .returning(JobArchive.id)
+        ).scalars()
+    )
+    counters: dict[tuple[str, str], dict[str, Any]] = {}
+    for row in rows:
+        if row["id"] in inserted:
+            _add_to_counters(counters, row)
+    if counters:
+        stmt = pg_insert(JobCounter).values(list(counters.values()))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[JobCounter.job_type, JobCounter.status],
+            set_={
+                "archived": JobCounter.archived + stmt.excluded.archived,
+                "timed": JobCounter.timed + stmt.excluded.timed,
+                "duration_seconds_total": JobCounter.duration_seconds_total + stmt.excluded.duration_seconds_total,
+                "last_finished_at": func.greatest(JobCounter.last_finished_at, stmt.excluded.last_finished_at),
+            },
+        )
+        session.execute(stmt)
+    session.execute(
+        delete(Job).where(Job.id.in_([r["id"] for r in rows])).execution_options(synchronize_session=False)
+    )
+    return len(rows)
+
+
+def archive_jobs(
+    session: Session,
+    older_than_days: int | None = None,
+    batch_size: int | None = None,
+    max_batches: int | None = None,
+) -> dict[str, Any]:
+    """Move completed/failed jobs created more than `older_than_days` ago, committing after each batch."""
+    if older_than_days is None:
+        from libs.common.runtime_settings import get_job_retention_days
+        older_than_days = get_job_retention_days()
+    batch_size = batch_size or get_settings().job_archive_batch_size
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    archived = batches = 0
+    while max_batches is None or batches < max_batches:
+        moved = _archive_batch(session, cutoff, batch_size)
+        session.commit()
+        if not moved:
+            break
+        archived += moved
+        batches += 1
+    logger.info("jobs_archived", archived=archived, batches=batches, cutoff=cutoff.isoformat())
+    return {"archived": archived, "batches": batches, "cutoff": cutoff}
+
+
+def get_archived_job(session: Session, job_id: int) -> dict[str, Any] | None:
+    """Job row as it was when archived, plus archived_at; None if the id is not in the archive."""
+    row = session.execute(
+        select(JobArchive.data, JobArchive.archived_at).where(JobArchive.id == job_id)
+    ).one_or_none()
+    if row is None:
+        return None
+    return {**unpack_job(row.data), "archived_at": row.archived_at}
+
+
+def job_stats(session: Session) -> list[dict[str, Any]]:
+    """Per (job_type, status): live count from jobs plus archived totals from job_counters."""
+    stats: dict[tuple[str, str], dict[str, Any]] = {}
+    durations: dict[tuple[str, str], list[float]] = {}
+
+    def entry(job_type: str, status: str) -> dict[str, Any]:
+        durations.setdefault((job_type, status), [0.0, 0])
+        return stats.setdefault(
+            (job_type, status),
+            {"job_type": job_type, "status": status, "live": 0, "archived": 0,
+             "avg_duration_seconds": None, "last_finished_at": None},
+        )
+
+    duration = Job.finished_at - Job.started_at
+    live = session.execute(
+        select(
+            Job.job_type,
+            Job.status,
+            func.count(),
+            func.count(duration),
+            func.sum(func.extract("epoch", duration)),
+            func.max(Job.finished_at),
+        ).group_by(Job.job_type, Job.status)
+    ).all()
+    for job_type, status, count, timed, seconds, last in live:
+        e = entry(job_type, status)
+        e["live"] = count
+        e["last_finished_at"] = last
+        durations[(job_type, status)] = [float(seconds or 0), timed]
+    for c in session.execute(select(JobCounter)).scalars():
+        e = entry(c.job_type, c.status)
+        e["archived"] = c.archived
+        if c.last_finished_at and (e["last_finished_at"] is None or c.last_finished_at > e["last_finished_at"]):
+            e["last_finished_at"] = c.last_finished_at
+        durations[(c.job_type, c.status)][0] += float(c.duration_seconds_total)
+        durations[(c.job_type, c.status)][1] += c.timed
+    for key, (seconds, timed) in durations.items():
+        if timed:
+            stats[key]["avg_duration_seconds"] = round(seconds / timed, 3)
+    return sorted(stats.values(), key=lambda e: (e["job_type"], e["status"]))
@@ -0,0 +1,273 @@
+"""Keyword clustering by SERP overlap: keywords whose top-N result URLs share at least min_overlap URLs.
+
+SERPs come from serp_snapshot_heads (the latest stored state per query/region, see serp_history).
+Instead of comparing all keyword pairs, an inverted index URL -> keywords is built and a keyword is
+compared only with keywords found in the posting lists of its own URLs. URLs present in the SERPs of
+very many keywords (aggregators, marketplaces) say nothing about intent and make postings huge: they
+are skipped above max_url_keywords.
+
+Clustering is center-based ("hard"): keywords are taken by volume, the highest unassigned keyword
+becomes a center and takes every unassigned keyword sharing >= min_overlap URLs with it. Members are
+compared with the center, not with each other, so clusters do not chain into topic soups.
+
+Incremental: new keywords are first matched against the centers (highest-volume keyword) of existing
+clusters of the region; only those matching none are clustered among themselves into new clusters.
+"""
+from __future__ import annotations
+
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from libs.common.logging import get_logger
+from libs.common.markdown_render import heading_slug
+from libs.common.models.db_models import Cluster, Keyword, SerpSnapshotHead
+
+logger = get_logger(__name__)
+
+_URL_PREFIX = re.compile(r"^(?:https?://)?(?:www\.)?", re.IGNORECASE)
+_SPACES = re.compile(r"\s+")
+_LOOKUP_CHUNK = 1000
+
+
+def normalize_keyword(keyword: str) -> str:
+    return _SPACES.sub(" ", keyword.strip().lower().replace("ё", "е"))
+
+
+def normalize_url(url: str) -> str:
+    """Same page under http/https, www and trailing slash variants; fragment dropped."""
+    return _URL_PREFIX.sub("", url.split("#", 1)[0]).rstrip("/").lower()
+
+
+@dataclass
+class SerpIndex:
+    """Interned top-N URL sets and the inverted index over them."""
+
+    urls: dict[str, int]
+    keywords: list[str]
+    serps: list[frozenset[int]]
+    postings: dict[int, list[int]]
+
+    @classmethod
+    def build(cls, serps: dict[str, Iterable[str]], max_url_keywords: int) -> "SerpIndex":
+        index = cls(urls={}, keywords=[], serps=[], postings={})
+        for keyword, urls in serps.items():
+            ids = frozenset(index.urls.setdefault(u, len(index.urls)) for u in urls)
+            kid = len(index.keywords)
+            index.keywords.append(keyword)
+            index.serps.append(ids)
+            for url_id in ids:
+                index.postings.setdefault(url_id, []).append(kid)
+        if max_url_keywords:
+            common = [u for u, kws in index.postings.items() if len(kws) > max_url_keywords]
+            for url_id in common:
+                del index.postings[url_id]
+        return index
+
+    def overlaps(self, urls: Iterable[int]) -> Counter:
+        """Shared-URL counts with every indexed keyword that shares at least one URL."""
+        counts: Counter = Counter()
+        for url_id in urls:
+            posting = self.postings.get(url_id)
+            if posting:
+                counts.update(posting)
+        return counts
+
+
+def top_urls(state: dict[str, Any], top_n: int) -> list[str]:
+    items = sorted(state.get("items") or [], key=lambda i: i.get("position") or 0)
+    return [normalize_url(i["url"]) for i in items[:top_n] if i.get("url")]
+
+
+def load_serps(session: Session, keywords: Iterable[str], region: str, top_n: int) -> dict[str, list[str]]:
+    """keyword -> its top_n normalized URLs, for keywords that have a stored SERP."""
+    keywords = list(keywords)
+    result: dict[str, list[str]] = {}
+    for start in range(0, len(keywords), _LOOKUP_CHUNK):
+        chunk = keywords[start:start + _LOOKUP_CHUNK]
+        rows = session.execute(
+            select(SerpSnapshotHead.query, SerpSnapshotHead.state)
+            .where(SerpSnapshotHead.region == region, SerpSnapshotHead.query.in_(chunk))
+        ).all()
+        for row in rows:
+            urls = top_urls(row.state, top_n)
+            if urls:
+                result[row.query] = urls
+    return result
+
+
+def keywords_without_serp(session: Session, keywords: Iterable[str], region: str) -> list[str]:
+    keywords = list(dict.fromkeys(keywords))
+    found: set[str] = set()
+    for start in range(0, len(keywords), _LOOKUP_CHUNK):
+        chunk = keywords[start:start + _LOOKUP_CHUNK]
+        found.update(session.execute(
+            select(SerpSnapshotHead.query).where(SerpSnapshotHead.region == region, SerpSnapshotHead.query.in_(chunk))
+        ).scalars())
+    return [kw for kw in keywords if kw not in found]
+
+
+def cluster_serps(
+    serps: dict[str, list[str]],
+    volumes: dict[str, int],
+    min_overlap: int,
+    max_url_keywords: int,
+) -> list[dict[str, Any]]:
+    """Center-based clusters [{center, keywords: [(keyword, overlap)]}], biggest total volume first."""
+    index = SerpIndex.build(serps, max_url_keywords)
+    order = sorted(range(len(index.keywords)), key=lambda k: (-(volumes.get(index.keywords[k]) or 0), index.keywords[k]))
+    assigned = [False] * len(index.keywords)
+    clusters = []
+    for center in order:
+        if assigned[center]:
+            continue
+        assigned[center] = True
+        members = [(index.keywords[center], len(index.serps[center]))]
+        counts: Counter = Counter()
+        for url_id in index.serps[center]:
+            posting = index.postings.get(url_id)
+            if posting:
+                live = [k for k in posting if not assigned[k]]
+                index.postings[url_id] = live  # assigned keywords leave the postings once
+                counts.update(live)
+        for kid, shared in sorted(counts.items(), key=lambda kv: (-kv[1], index.keywords[kv[0]])):
+            if shared >= min_overlap:
+                assigned[kid] = True
+                members.append((index.keywords[kid], shared))
+        clusters.append({"center": index.keywords[center], "keywords": members})
+    clusters.sort(key=lambda c: (-sum(volumes.get(k) or 0 for k, _ in c["keywords"]), c["center"]))
+    return clusters
+
+
+def _existing_centers(session: Session, region: str) -> tuple[dict[str, int], dict[int, str]]:
+    """(normalized keyword -> cluster_id for all keywords of the region, cluster_id -> center keyword)."""
+    rows = session.execute(
+        select(Keyword.cluster_id, Keyword.keyword, Keyword.volume, Keyword.id)
+        .join(Cluster, Cluster.id == Keyword.cluster_id)
+        .where(Cluster.region == region)
+    ).all()
+    known: dict[str, int] = {}
+    centers: dict[int, tuple[int, int, str]] = {}
+    for row in rows:
+        known[normalize_keyword(row.keyword)] = row.cluster_id
+        rank = (-(row.volume or 0), row.id, row.keyword)
+        if row.cluster_id not in centers or rank < centers[row.cluster_id]:
+            centers[row.cluster_id] = rank
+    return known, {cid: rank[2] for cid, rank in centers.items()}
+
+
+def center_keywords(session: Session, region: str) -> list[str]:
+    """Normalized center keywords of the region's existing clusters (the SERPs new keywords are compared with)."""
+    return sorted({normalize_keyword(kw) for kw in _existing_centers(session, region)[1].values()})
+
+
+def _unique_slugs(session: Session, names: list[str], region: str) -> list[str]:
+    bases = [f"{heading_slug(name)[:200]}-{region}" for name in names]
+    taken = set()
+    for start in range(0, len(bases), _LOOKUP_CHUNK):
+        chunk = bases[start:start + _LOOKUP_CHUNK]
+        taken.update(session.execute(
+            select(Cluster.slug).where(func.regexp_replace(Cluster.slug, r"-\d+$", "").in_(chunk))
+        ).scalars())
+    slugs = []
+    for base in bases:
+        slug, n = base, 1
+        while slug in taken:
+            n += 1
+            slug = f"{base}-{n}"
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def cluster_keywords(
+    session: Session,
+    keywords: list[dict[str, Any]],
+    region: str,
+    top_n: int = 10,
+    min_overlap: int = 4,
+    max_url_keywords: int = 1000,
+    apply: bool = False,
+) -> dict[str, Any]:
+    """Assign raw keywords ({keyword, volume}) to existing clusters or propose new ones; write them if apply."""
+    started = time.perf_counter()
+    volumes: dict[str, int] = {}
+    for item in keywords:
+        kw = normalize_keyword(item["keyword"])
+        if kw and len(kw) <= 256:  # keywords.keyword
+            volumes[kw] = max(volumes.get(kw) or 0, item.get("volume") or 0)
+    known, centers = _existing_centers(session, region)
+    new = [kw for kw in volumes if kw not in known]
+    serps = load_serps(session, new, region, top_n)
+    unresolved = sorted(kw for kw in new if kw not in serps)
+
+    # 1) New keywords vs existing cluster centers
+    assigned: list[dict[str, Any]] = []
+    center_serps = load_serps(session, [normalize_keyword(c) for c in centers.values()], region, top_n)
+    center_ids = {normalize_keyword(kw): cid for cid, kw in centers.items()}
+    center_index = SerpIndex.build({kw: urls for kw, urls in center_serps.items() if kw in center_ids}, max_url_keywords)
+    rest: dict[str, list[str]] = {}
+    for kw, urls in serps.items():
+        counts = center_index.overlaps(center_index.urls[u] for u in urls if u in center_index.urls)
+        best = max(counts.items(), key=lambda kv: (kv[1], -center_ids[center_index.keywords[kv[0]]]), default=None)
+        if best and best[1] >= min_overlap:
+            assigned.append({"cluster_id": center_ids[center_index.keywords[best[0]]], "keyword": kw,
+                             "volume": volumes[kw] or None, "overlap": best[1]})
+        else:
+            rest[kw] = urls
+
+    # 2) The rest among themselves
+    proposals = cluster_serps(rest, volumes, min_overlap, max_url_keywords)
+    slugs = _unique_slugs(session, [c["center"] for c in proposals], region)
+    new_clusters = [
+        {
+            "name": c["center"][:1].upper() + c["center"][1:],
+            "slug": slug,
+            "region": region,
+            "center": c["center"],
+            "keywords": [{"keyword": kw, "volume": volumes[kw] or None, "overlap": shared} for kw, shared in c["keywords"]],
+        }
+        for c, slug in zip(proposals, slugs)
+    ]
+    if apply:
+        _apply(session, assigned, new_clusters)
+    report = {
+        "region": region,
+        "keywords": len(volumes),
+        "existing": len(volumes) - len(new),
+        "assigned": assigned,
+        "new_clusters": new_clusters,
+        "unresolved": unresolved,
+        "applied": apply,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+    logger.info(
+        "keywords_clustered", region=region, keywords=len(volumes), assigned=len(assigned),
+        new_clusters=len(new_clusters), unresolved=len(unresolved), seconds=report["seconds"],
+    )
+    return report
+
+
+def _apply(session: Session, assigned: list[dict[str, Any]], new_clusters: list[dict[str, Any]]) -> None:
+    """New clusters are created inactive: they enter the daily pipeline once someone activates them."""
+    rows = [{"cluster_id": a["cluster_id"], "keyword": a["keyword"], "volume": a["volume"]} for a in assigned]
+    for start in range(0, len(new_clusters), 500):
+        chunk = new_clusters[start:start + 500]
+        ids = session.execute(
+            pg_insert(Cluster)
+            .values([{"name": c["name"][:256], "slug": c["slug"], "region": c["region"], "is_active": False,
+                      "priority": 0} for c in chunk])
+            .returning(Cluster.id, Cluster.slug)
+        ).all()
+        by_slug = {slug: cid for cid, slug in ids}
+        for c in chunk:
+            c["cluster_id"] = by_slug[c["slug"]]
+            rows.extend({"cluster_id": c["cluster_id"], "keyword": k["keyword"], "volume": k["volume"]} for k in c["keywords"])
+    for start in range(0, len(rows), 5000):
+        session.execute(pg_insert(Keyword).values(rows[start:start + 5000]).on_conflict_do_nothing())
@@ -0,0 +1,304 @@
+"""TF-IDF/LSI term suggestions for the SEO optimizer.
+
+Terms are content-word stems and stem bigrams. Document frequencies live in corpus_terms and are
+maintained incrementally: add_documents() diffs a document's term set against the stored one
+(corpus_documents) and applies +1/-1 per changed term, so the corpus is never refit. Each process
+keeps the vocabulary (df, labels) in memory and pulls only rows changed since its last sync.
+
+An optimize call then works on sparse dict vectors: the SERP titles/snippets for the keyword and our
+own articles containing the keyword's stems (GIN lookup on corpus_documents.terms) form the context;
+their L2-normalized TF-IDF centroid ranks co-occurring terms, the ones missing from the draft are
+suggested, each with the draft section whose vector best overlaps the term's context.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Iterable
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from libs.common.logging import get_logger
+from libs.common.models.db_models import Article, CorpusDocument, CorpusTerm
+from libs.common.text import normalize_text, stems, tokenize
+from libs.common.text_metrics import STOPWORDS
+
+logger = get_logger(__name__)
+
+MAX_DOC_TERMS = 400  # most frequent terms kept per document
+MIN_WORD_LENGTH = 3
+_SYNC_OVERLAP = timedelta(minutes=1)  # re-read recent rows: commits may land out of updated_at order
+_HEADING = re.compile(r"^\s{0,3}#{1,6}\s+(.+?)\s*#*\s*$", re.MULTILINE)
+_PHRASE_BREAK = re.compile(r"[.,;:!?()\[\]\"«»—–\n]+")
+
+Vector = dict[str, float]
+
+
+def document_terms(text: str) -> tuple[Counter, dict[str, str]]:
+    """Term counts (stems and stem bigrams of content words) and a readable form of each term.
+
+    Bigrams are taken inside punctuation-delimited phrases only, so "агентство, поиск" is not one.
+    """
+    counts: Counter = Counter()
+    labels: dict[str, str] = {}
+    for phrase in _PHRASE_BREAK.split(normalize_text(text)):
+        kept = [w for w in tokenize(phrase) if len(w) >= MIN_WORD_LENGTH and w not in STOPWORDS]
+        if not kept:
+            continue
+        stemmed = stems(kept)
+        bigrams = [f"{a} {b}" for a, b in zip(stemmed, stemmed[1:])]
+        counts.update(stemmed)
+        counts.update(bigrams)
+        for term, word in zip(stemmed, kept):
+            labels.setdefault(term, word)
+        for term, a, b in zip(bigrams, kept, kept[1:]):
+            labels.setdefault(term, f"{a} {b}")
+    return counts, labels
+
+
+def _top_terms(counts: Counter) -> list[str]:
+    return [t for t, _ in counts.most_common(MAX_DOC_TERMS) if len(t) <= 128]
+
+
+def add_documents(session: Session, documents: Iterable[tuple[str, str, str]]) -> int:
+    """Add or replace (key, source, text) documents; df of changed terms is adjusted in place."""
+    docs: dict[str, tuple[str, list[str], dict[str, str]]] = {}
+    for key, source, text in documents:
+        counts, labels = document_terms(text)
+        docs[key] = (source, _top_terms(counts), labels)
+    if not docs:
+        return 0
+    keys = sorted(docs)  # one lock order for concurrent writers
+    # Concurrent calls for the same key must see each other's terms, or both count the document as new:
+    # missing rows are created empty first (a second inserter waits for the first to commit), then all
+    # rows are read under FOR UPDATE, so each writer's delta starts from the last committed terms.
+    session.execute(
+        pg_insert(CorpusDocument)
+        .values([{"key": key, "source": docs[key][0], "terms": []} for key in keys])
+        .on_conflict_do_nothing(index_elements=[CorpusDocument.key])
+    )
+    previous = dict(
+        session.execute(
+            select(CorpusDocument.key, CorpusDocument.terms)
+            .where(CorpusDocument.key.in_(keys))
+            .order_by(CorpusDocument.key)
+            .with_for_update()
+        ).all()
+    )
+    delta: Counter = Counter()
+    labels: dict[str, str] = {}
+    for key, (_source, terms, doc_labels) in docs.items():
+        new, old = set(terms), set(previous.get(key) or ())
+        delta.update(dict.fromkeys(new - old, 1))
+        delta.subtract(dict.fromkeys(old - new, 1))
+        for term in new - old:
+            labels.setdefault(term, doc_labels.get(term, term)[:128])
+    stmt = pg_insert(CorpusDocument).values(
+        [{"key": key, "source": source, "terms": terms} for key, (source, terms, _) in docs.items()]
+    )
+    session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[CorpusDocument.key],
+            set_={"terms": stmt.excluded.terms, "source": stmt.excluded.source, "updated_at": func.now()},
+        )
+    )
+    changed = sorted((t, d) for t, d in delta.items() if d)  # sorted: concurrent writers lock rows in one order
+    for start in range(0, len(changed), 1000):
+        chunk = changed[start:start + 1000]
+        stmt = pg_insert(CorpusTerm).values([{"term": t, "df": d, "label": labels.get(t)} for t, d in chunk])
+        session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[CorpusTerm.term],
+                set_={
+                    "df": func.greatest(CorpusTerm.df + stmt.excluded.df, 0),
+                    "label": func.coalesce(CorpusTerm.label, stmt.excluded.label),
+                    "updated_at": func.now(),
+                },
+            )
+        )
+    return len(docs)
+
+
+def serp_document_key(url: str, title: str) -> str:
+    return "serp:" + hashlib.blake2b(f"{url}|{title}".encode("utf-8"), digest_size=12).hexdigest()
+
+
+def rebuild_article_corpus(session: Session, batch_size: int = 200) -> int:
+    """Backfill article documents (final_markdown, else draft), committing per batch."""
+    last_id, total = 0, 0
+    while True:
+        rows = session.execute(
+            select(Article.id, Article.final_markdown, Article.draft_markdown)
+            .where(Article.id > last_id)
+            .order_by(Article.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        total += add_documents(
+            session, [(f"article:{r.id}", "article", r.final_markdown or r.draft_markdown or "") for r in rows]
+        )
+        last_id = rows[-1].id
+        session.commit()
+    logger.info("lsi_corpus_rebuilt", articles=total)
+    return total
+
+
+@dataclass
+class TermModel:
+    """In-memory vocabulary: df and labels per term, synced incrementally from corpus_terms."""
+
+    df: dict[str, int] = field(default_factory=dict)
+    labels: dict[str, str] = field(default_factory=dict)
+    documents: int = 0
+    synced_at: datetime | None = None
+
+    def sync(self, session: Session) -> int:
+        q = select(CorpusTerm.term, CorpusTerm.df, CorpusTerm.label, CorpusTerm.updated_at)
+        if self.synced_at is not None:
+            q = q.where(CorpusTerm.updated_at >= self.synced_at - _SYNC_OVERLAP)
+        rows = session.execute(q).all()
+        for row in rows:
+            if row.df > 0:
+                self.df[row.term] = row.df
+                if row.label:
+                    self.labels[row.term] = row.label
+            else:
+                self.df.pop(row.term, None)
+                self.labels.pop(row.term, None)
+            if self.synced_at is None or row.updated_at > self.synced_at:
+                self.synced_at = row.updated_at
+        self.documents = session.execute(select(func.count()).select_from(CorpusDocument)).scalar_one()
+        return len(rows)
+
+    def idf(self, term: str) -> float:
+        return math.log((self.documents + 1) / (self.df.get(term, 0) + 1)) + 1.0
+
+    def vector(self, counts: Counter | Iterable[str]) -> Vector:
+        """L2-normalized TF-IDF vector (sublinear tf); a plain term list counts each term once."""
+        if not isinstance(counts, Counter):
+            counts = Counter(set(counts))
+        vec = {t: (1.0 + math.log(c)) * self.idf(t) for t, c in counts.items()}
+        norm = math.sqrt(sum(w * w for w in vec.values())) or 1.0
+        return {t: w / norm for t, w in vec.items()}
+
+
+_model = TermModel()
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def get_term_model(session: Session, force: bool = False) -> TermModel:
+    """Process-wide model; pulls changed corpus_terms at most every lsi_refresh_seconds (or when forced)."""
+    global _checked_at
+    from libs.common.config import get_settings
+
+    with _lock:
+        now = time.monotonic()
+        if force or _model.synced_at is None or now - _checked_at >= get_settings().lsi_refresh_seconds:
+            changed = _model.sync(session)
+            _checked_at = now
+            if changed:
+                logger.info("lsi_model_synced", changed=changed, terms=len(_model.df), documents=_model.documents)
+        return _model
+
+
+def split_sections(markdown: str) -> list[tuple[str | None, str]]:
+    """(heading, body) per markdown section; text before the first heading has heading None."""
+    sections: list[tuple[str | None, str]] = []
+    heading, start = None, 0
+    for m in _HEADING.finditer(markdown):
+        if markdown[start:m.start()].strip() or heading is not None:
+            sections.append((heading, markdown[start:m.start()]))
+        heading, start = m.group(1), m.end()
+    sections.append((heading, markdown[start:]))
+    return sections
+
+
+def _dot(a: Vector, b: Vector) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(w * b.get(t, 0.0) for t, w in a.items())
+
+
+def suggest_terms(
+    model: TermModel,
+    target_keyword: str,
+    draft_markdown: str,
+    serp_texts: list[str],
+    session: Session | None = None,
+    limit: int = 15,
+    context_articles: int = 200,
+) -> dict[str, Any]:
+    """Co-occurring terms of the keyword's context missing from the draft, with a suggested section."""
+    keyword_counts, _ = document_terms(target_keyword)
+    keyword_terms = set(keyword_counts)
+    contexts: list[Vector] = []
+    labels: dict[str, str] = {}
+    for text in serp_texts:
+        counts, doc_labels = document_terms(text)
+        if counts:
+            contexts.append(model.vector(counts))
+            for term, label in doc_labels.items():
+                labels.setdefault(term, label)
+    keyword_stems = [t for t in keyword_terms if " " not in t]
+    if session is not None and keyword_stems:
+        rows = session.execute(
+            select(CorpusDocument.terms)
+            .where(CorpusDocument.source == "article", CorpusDocument.terms.contains(keyword_stems))
+            .limit(context_articles)
+        ).scalars().all()
+        contexts.extend(model.vector(terms) for terms in rows)
+
+    draft_counts, _ = document_terms(draft_markdown)
+    if not contexts:
+        return {"terms": [], "coverage": None, "context_documents": 0}
+
+    centroid: Counter = Counter()
+    support: Counter = Counter()
+    for vec in contexts:
+        centroid.update(vec)
+        support.update(vec.keys())
+    # A co-occurring term shows up in more than one context document (when there are several)
+    min_support = 2 if len(contexts) >= 3 else 1
+    ranked = [
+        (t, w / len(contexts)) for t, w in centroid.most_common()
+        if support[t] >= min_support and t not in keyword_terms
+    ]
+    top = ranked[: limit * 2]
+    coverage = round(sum(1 for t, _ in top if t in draft_counts) / len(top), 3) if top else None
+    missing = [(t, w) for t, w in top if t not in draft_counts][:limit]
+
+    sections = [(h, model.vector(document_terms(body)[0])) for h, body in split_sections(draft_markdown)]
+    suggestions = []
+    for term, weight in missing:
+        context = Counter()
+        for vec in contexts:
+            if term in vec:
+                context.update(vec)
+        for common in keyword_terms:  # present in every context: would pull each term to the keyword's section
+            context.pop(common, None)
+        best, best_score = None, 0.0
+        for index, (_heading, vec) in enumerate(sections):
+            score = _dot(vec, context)
+            if score > best_score:
+                best, best_score = index, score
+        suggestions.append({
+            "term": labels.get(term) or model.labels.get(term) or term,
+            "stem": term,
+            "weight": round(weight, 4),
+            "documents": support[term],
+            # Index into the draft's sections (0 may be the text before the first heading); None = no overlap
+            "section_index": best,
+            "section": sections[best][0] if best is not None else None,
+            "section_score": round(best_score, 4),
+        })
+    return {"terms": suggestions, "coverage": coverage, "context_documents": len(contexts)}
@@ -0,0 +1,317 @@
+"""Markdown -> sanitized, minified HTML for publishing (headings with anchors, schema.org JSON-LD).
+
+Covers the markdown our generators produce: ATX headings, paragraphs, nested lists, blockquotes,
+fenced code, GFM tables, rules, emphasis, code spans, links, images and autolinks. Sanitizing is by
+construction: all source text (raw HTML included) is escaped and only tags emitted by the renderer
+appear in the output; link/image URLs are limited to http(s), mailto, tel and relative targets.
+Blocks are joined without whitespace (minified); text inside <pre> is kept verbatim.
+
+render_cached() keys results by a hash of the input and RENDER_VERSION, so republishing, previews
+and resyncs of unchanged articles return the stored HTML without rendering.
+"""
+from __future__ import annotations
+
+import hashlib
+import html
+import json
+import re
+from typing import Any
+
+from libs.common.block_cache import BlockCache
+
+RENDER_VERSION = "1"  # bump when output changes: invalidates cached renders
+
+_FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})\s*([\w+-]*)")
+_HEADING = re.compile(r"^ {0,3}(#{1,6})[ \t]+(.*?)(?:[ \t]+#+)?[ \t]*$")
+_HR = re.compile(r"^ {0,3}([-*_])(?:[ \t]*\1){2,}[ \t]*$")
+_QUOTE = re.compile(r"^ {0,3}> ?")
+_LIST_ITEM = re.compile(r"^( *)([-*+]|\d{1,9}[.)])[ \t]+(.*)$")
+_TABLE_SEP = re.compile(r"^\s*\|?\s*:?-+:?\s*(?:\|\s*:?-+:?\s*)*\|?\s*$")
+
+_CODE_SPAN = re.compile(r"(`+)(.+?)\1", re.DOTALL)
+_LINK = re.compile(r"(!?)\[((?:[^\[\]]|\[[^\[\]]*\])*)\]\(\s*<?([^\s<>()]*(?:\([^\s()]*\)[^\s<>()]*)*)>?(?:\s+\"([^\"]*)\")?\s*\)")
+_AUTOLINK = re.compile(r"<((?:https?://|mailto:)[^\s<>]+)>")
+# Emphasis bodies are bounded: with unbalanced markers an unbounded lazy body rescans the rest of the
+# line from every opener (quadratic); a longer span stays literal
+_SPAN = 500
+_STRONG = re.compile(rf"\*\*(?=\S)(.{{1,{_SPAN}}}?)(?<=\S)\*\*|__(?=\S)(.{{1,{_SPAN}}}?)(?<=\S)__(?!\w)")
+_EM = re.compile(
+    rf"\*(?=[^\s*])(.{{1,{_SPAN}}}?)(?<=[^\s*])\*|(?<!\w)_(?=[^\s_])(.{{1,{_SPAN}}}?)(?<=[^\s_])_(?!\w)"
+)
+_DEL = re.compile(rf"~~(?=\S)(.{{1,{_SPAN}}}?)(?<=\S)~~")
+_HARD_BREAK = re.compile(r"(?: {2,}|\\)\n")
+_PLACEHOLDER = re.compile("\x00(\\d+)\x00")
+_MAX_DEPTH = 32  # nested blockquotes/lists; deeper markers are rendered as text (no recursion limit)
+_SAFE_URL = re.compile(r"^(?:https?://|mailto:|tel:|/|#|\./|\.\./|[\w.-]+(?:/|$|#|\?))", re.IGNORECASE)
+_TAGS = re.compile(r"<[^>]+>")
+
+_TRANSLIT = str.maketrans({
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e", "ж": "zh", "з": "z", "и": "i",
+    "й": "y", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t",
+    "у": "u", "ф": "f", "х": "h", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "sch", "ъ": "", "ы": "y", "ь": "",
+    "э": "e", "ю": "yu", "я": "ya",
+})
+_SLUG_JUNK = re.compile(r"[^a-z0-9]+")
+
+
+def heading_slug(text: str) -> str:
+    """Latin anchor id for a heading: transliterated, lowercase, dash-separated."""
+    return _SLUG_JUNK.sub("-", text.lower().translate(_TRANSLIT)).strip("-") or "section"
+
+
+def safe_url(url: str) -> str | None:
+    url = url.strip()
+    return url if url and _SAFE_URL.match(url) else None
+
+
+class _Renderer:
+    def __init__(self) -> None:
+        self.slugs: dict[str, int] = {}
+        self.depth = 0
+        # Rendered fragments hidden from later inline passes; shared by nested inline() calls (link
+        # labels), so a placeholder always points at its own fragment. Input has no NUL (render_markdown).
+        self.stash: list[str] = []
+
+    # --- inline ---
+    def _resolve(self, text: str) -> str:
+        # A fragment only holds placeholders kept before it, so the recursion ends
+        return _PLACEHOLDER.sub(lambda m: self._resolve(self.stash[int(m.group(1))]), text)
+
+    def inline(self, text: str) -> str:
+        def keep(fragment: str) -> str:
+            self.stash.append(fragment)
+            return f"\x00{len(self.stash) - 1}\x00"
+
+        text = _CODE_SPAN.sub(lambda m: keep(f"<code>{html.escape(m.group(2).strip())}</code>"), text)
+        text = _LINK.sub(lambda m: keep(self._link(m)), text)
+        text = _AUTOLINK.sub(lambda m: keep(self._anchor(m.group(1), html.escape(m.group(1)))), text)
+        text = html.escape(text, quote=False)
+        text = _STRONG.sub(lambda m: f"<strong>{m.group(1) or m.group(2)}</strong>", text)
+        text = _EM.sub(lambda m: f"<em>{m.group(1) or m.group(2)}</em>", text)
+        text = _DEL.sub(r"<del>\1</del>", text)
+        text = _HARD_BREAK.sub("<br>", text).replace("\n", " ")
+        return self._resolve(text)
+
+    def _anchor(self, url: str, label: str, title: str | None = None) -> str:
+        href = safe_url(url)
+        if href is None:
+            return label
+        title_attr = f' title="{html.escape(title)}"' if title else ""
+        rel = ' rel="noopener"' if href.lower().startswith(("http://", "https://")) else ""
+        return f'<a href="{html.escape(href)}"{title_attr}{rel}>{label}</a>'
+
+    def _link(self, m: re.Match) -> str:
+        is_image, label, url, title = m.group(1), m.group(2), m.group(3), m.group(4)
+        if is_image:
+            src = safe_url(url)
+            if src is None:
+                return html.escape(label)
+            title_attr = f' title="{html.escape(title)}"' if title else ""
+            return f'<img src="{html.escape(src)}" alt="{html.escape(label)}"{title_attr} loading="lazy">'
+        return self._anchor(url, self.inline(label), title)
+
+    # --- blocks ---
+    def blocks(self, lines: list[str]) -> str:
+        out: list[str] = []
+        i, n = 0, len(lines)
+        nest = self.depth < _MAX_DEPTH
+        while i < n:
+            line = lines[i]
+            if not line.strip():
+                i += 1
+                continue
+            if m := _FENCE.match(line):
+                i = self._code(lines, i, m, out)
+            elif m := _HEADING.match(line):
+                out.append(self._heading(len(m.group(1)), m.group(2)))
+                i += 1
+            elif _HR.match(line):
+                out.append("<hr>")
+                i += 1
+            elif nest and _QUOTE.match(line):
+                start = i
+                while i < n and lines[i].strip() and _QUOTE.match(lines[i]):
+                    i += 1
+                out.append(f"<blockquote>{self._nested([_QUOTE.sub('', l, 1) for l in lines[start:i]])}</blockquote>")
+            elif nest and _LIST_ITEM.match(line):
+                i = self._list(lines, i, out)
+            elif "|" in line and i + 1 < n and _TABLE_SEP.match(lines[i + 1]) and "-" in lines[i + 1]:
+                i = self._table(lines, i, out)
+            else:
+                start = i
+                i += 1
+                while i < n and lines[i].strip() and not (nest and self._starts_block(lines[i])):
+                    i += 1
+                out.append(f"<p>{self.inline(chr(10).join(l.lstrip() for l in lines[start:i]).rstrip())}</p>")
+        return "".join(out)
+
+    def _nested(self, lines: list[str]) -> str:
+        self.depth += 1
+        try:
+            return self.blocks(lines)
+        finally:
+            self.depth -= 1
+
+    @staticmethod
+    def _starts_block(line: str) -> bool:
+        return bool(_FENCE.match(line) or _HEADING.match(line) or _HR.match(line) or _QUOTE.match(line) or _LIST_ITEM.match(line))
+
+    def _heading(self, level: int, text: str) -> str:
+        content = self.inline(text)
+        slug = heading_slug(html.unescape(_TAGS.sub("", content)))
+        count = self.slugs.get(slug, 0)
+        self.slugs[slug] = count + 1
+        if count:
+            slug = f"{slug}-{count + 1}"
+        return f'<h{level} id="{slug}">{content}</h{level}>'
+
+    def _code(self, lines: list[str], i: int, m: re.Match, out: list[str]) -> int:
+        fence, lang = m.group(1), m.group(2)
+        body = []
+        i += 1
+        while i < len(lines) and not lines[i].strip().startswith(fence):
+            body.append(lines[i])
+            i += 1
+        cls = f' class="language-{html.escape(lang)}"' if lang else ""
+        out.append(f"<pre><code{cls}>{html.escape(chr(10).join(body))}</code></pre>")
+        return i + 1
+
+    def _list(self, lines: list[str], i: int, out: list[str]) -> int:
+        first = _LIST_ITEM.match(lines[i])
+        indent, marker = len(first.group(1)), first.group(2)
+        ordered = marker[-1] in ".)"
+        items: list[list[str]] = []
+        loose = False
+        n = len(lines)
+        while i < n:
+            line = lines[i]
+            m = _LIST_ITEM.match(line)
+            if m and len(m.group(1)) == indent and m.group(2)[-1] == marker[-1]:  # same bullet / delimiter
+                items.append([m.group(3)])
+                content_indent = len(m.group(1)) + len(m.group(2)) + 1
+                i += 1
+                continue
+            if not line.strip():
+                # A blank line continues the list only if the next line is indented or another item
+                j = i + 1
+                while j < n and not lines[j].strip():
+                    j += 1
+                nxt = lines[j] if j < n else ""
+                nm = _LIST_ITEM.match(nxt)
+                if j < n and (len(nxt) - len(nxt.lstrip()) > indent or (nm and len(nm.group(1)) == indent and nm.group(2)[-1] == marker[-1])):
+                    loose = loose or not (nm and len(nm.group(1)) > indent)
+                    items[-1].append("")
+                    i += 1
+                    continue
+                break
+            if len(line) - len(line.lstrip()) > indent:
+                items[-1].append(line[min(content_indent, len(line) - len(line.lstrip())):])
+                i += 1
+                continue
+            if self._starts_block(line):
+                break
+            items[-1].append(line.lstrip())  # lazy continuation of the item's paragraph
+            i += 1
+        rendered = []
+        for item in items:
+            body = self._nested(item)
+            if not loose and body.startswith("<p>"):
+                end = body.index("</p>")
+                body = body[3:end] + body[end + 4:]
+            rendered.append(f"<li>{body}</li>")
+        start = int(marker[:-1]) if ordered else 1
+        tag = "ol" if ordered else "ul"
+        start_attr = f' start="{start}"' if ordered and start != 1 else ""
+        out.append(f"<{tag}{start_attr}>{''.join(rendered)}</{tag}>")
+        return i
+
+    def _table(self, lines: list[str], i: int, out: list[str]) -> int:
+        def cells(row: str) -> list[str]:
+            row = row.strip()
+            if row.startswith("|"):
+                row = row[1:]
+            if row.endswith("|") and not row.endswith("\\|"):
+                row = row[:-1]
+            return [c.strip() for c in re.split(r"(?<!\\)\|", row)]
+
+        header = cells(lines[i])
+        aligns = []
+        for spec in cells(lines[i + 1]):
+            left, right = spec.startswith(":"), spec.endswith(":")
+            aligns.append("center" if left and right else "right" if right else "left" if left else None)
+        i += 2
+        rows = []
+        while i < len(lines) and lines[i].strip() and "|" in lines[i]:
+            rows.append(cells(lines[i]))
+            i += 1
+
+        def row_html(row: list[str], tag: str) -> str:
+            parts = []
+            for k in range(len(header)):
+                align = aligns[k] if k < len(aligns) else None
+                style = f' style="text-align:{align}"' if align else ""
+                parts.append(f"<{tag}{style}>{self.inline(row[k].replace(chr(92) + '|', '|')) if k < len(row) else ''}</{tag}>")
+            return f"<tr>{''.join(parts)}</tr>"
+
+        body = "".join(row_html(r, "td") for r in rows)
+        out.append(f"<table><thead>{row_html(header, 'th')}</thead>{f'<tbody>{body}</tbody>' if body else ''}</table>")
+        return i
+
+
+def render_markdown(markdown: str) -> str:
+    """Sanitized, minified HTML body for markdown."""
+    # NUL is reserved for placeholders; replaced like CommonMark does
+    markdown = markdown.replace("\x00", "\ufffd").replace("\r\n", "\n").replace("\t", "    ")
+    return _Renderer().blocks(markdown.split("\n"))
+
+
+def json_ld(schema: dict[str, Any] | None, title: str | None = None, description: str | None = None) -> str:
+    """<script type="application/ld+json"> for schema_json (context/headline filled in); "" without schema."""
+    if not schema:
+        return ""
+    data = {"@context": "https://schema.org", **schema}
+    if title and data.get("@type") in ("Article", "BlogPosting", "NewsArticle"):
+        data.setdefault("headline", title[:110])
+        if description:
+            data.setdefault("description", description)
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+    # "</" cannot close the script element; <!-- cannot open a comment state
+    payload = payload.replace("</", "<\\/").replace("<!--", "<\\!--")
+    return f'<script type="application/ld+json">{payload}</script>'
+
+
+def render_page(
+    markdown: str, schema: dict[str, Any] | None = None, title: str | None = None, description: str | None = None
+) -> str:
+    return render_markdown(markdown) + json_ld(schema, title, description)
+
+
+def content_hash(
+    markdown: str, schema: dict[str, Any] | None = None, title: str | None = None, description: str | None = None
+) -> str:
+    """Identity of a render: same hash = same HTML."""
+    h = hashlib.blake2b(digest_size=16)
+    for part in (RENDER_VERSION, markdown, json.dumps(schema, sort_keys=True, ensure_ascii=False), title or "", description or ""):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+_cache: BlockCache[str] | None = None
+
+
+def get_render_cache() -> BlockCache[str]:
+    global _cache
+    if _cache is None:
+        from libs.common.config import get_settings
+        _cache = BlockCache(render_markdown, maxsize=get_settings().render_cache_size)
+    return _cache
+
+
+def render_cached(
+    markdown: str, schema: dict[str, Any] | None = None, title: str | None = None, description: str | None = None
+) -> tuple[str, str, bool]:
+    """(html, content hash, served from cache)."""
+    key = content_hash(markdown, schema, title, description)
+    html_out, computed = get_render_cache().get_or_compute(key, lambda: render_page(markdown, schema, title, description))
+    return html_out, key, not computed
@@ -0,0 +1,93 @@
+"""Asyncio micro-batcher: concurrent submit() calls are grouped and handled by one batch call.
+
+The first item of a batch opens a window of max_wait seconds; the batch is dispatched when the window
+closes or max_size items are collected, whichever comes first. At low load a request waits at most
+max_wait; at high load batches fill before the window ends and add no wait at all. Results are fanned
+back to each caller's future in submit order; an exception returned in an item's place fails only that
+caller, while an exception raised by the handler fails the whole batch.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    def __init__(
+        self,
+        handler: Callable[[list[T]], Awaitable[list[R | Exception]]],
+        max_size: int = 8,
+        max_wait: float = 0.01,
+        max_in_flight: int = 4,
+    ) -> None:
+        self.handler = handler
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._pending: list[tuple[T, asyncio.Future[R]]] = []
+        self._timer: asyncio.Handle | None = None
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: T) -> R:
+        future: asyncio.Future[R] = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending[: self.max_size], self._pending[self.max_size:]
+        if self._pending:  # more than max_size arrived in one loop tick
+            self._timer = asyncio.get_running_loop().call_soon(self._flush)
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[T, asyncio.Future[R]]]) -> None:
+        live = [(item, f) for item, f in batch if not f.done()]  # the caller may have gone (cancelled)
+        if not live:
+            return
+        async with self._slots:
+            self.batches += 1
+            self.items += len(live)
+            try:
+                results = await self.handler([item for item, _ in live])
+                if len(results) != len(live):
+                    raise RuntimeError(f"batch handler returned {len(results)} results for {len(live)} items")
+            except Exception as e:
+                for _, future in live:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+        for (_, future), result in zip(live, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def close(self) -> None:
+        """Dispatch what is pending and wait for running batches."""
+        self._flush()
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "pending": len(self._pending),
+        }
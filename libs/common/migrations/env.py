@@ -10,13 +10,28 @@ from libs.common.config import get_settings
 from libs.common.models.base import Base
 from libs.common.models.db_models import (  # noqa: F401
     Article,
+    ArticleLink,
+    ArticleMinhash,
+    ArticleMinhashBand,
+    ArticleVectorTerm,
+    BufferedDraft,
     Cluster,
+    CorpusDocument,
+    CorpusTerm,
     Job,
+    JobArchive,
+    JobCounter,
     Keyword,
     LinkSite,
     LinkTask,
     CaseTemplate,
     Performance,
+    PerformanceRollup,
+    PublishTask,
+    PublishedPage,
+    QualityRule,
+    SerpSnapshot,
+    SerpSnapshotHead,
     Setting,
 )
 
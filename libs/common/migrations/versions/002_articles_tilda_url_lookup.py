@@ -0,0 +1,29 @@
+"""Lookup index for mapping search-console URLs to articles.
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "002"
+down_revision: Union[str, None] = "001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_articles_tilda_url_norm",
+        "articles",
+        [sa.text("rtrim(lower(tilda_url), '/')")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_articles_tilda_url_norm", table_name="articles")
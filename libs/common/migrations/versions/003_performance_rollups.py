@@ -0,0 +1,46 @@
+"""Performance rollups: impressions/clicks/position per article and cluster by day, week, month.
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "003"
+down_revision: Union[str, None] = "002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "performance_rollups",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("scope", sa.String(16), nullable=False),
+        sa.Column("grain", sa.String(8), nullable=False),
+        sa.Column("scope_id", sa.Integer(), nullable=False),
+        sa.Column("period_start", sa.Date(), nullable=False),
+        sa.Column("source", sa.String(32), nullable=False),
+        sa.Column("impressions", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("clicks", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("position_sum", sa.Numeric(20, 2), nullable=False, server_default="0"),
+        sa.Column("position_weight", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_performance_rollups_key",
+        "performance_rollups",
+        ["scope", "grain", "scope_id", "period_start", "source"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_performance_rollups_key", table_name="performance_rollups")
+    op.drop_table("performance_rollups")
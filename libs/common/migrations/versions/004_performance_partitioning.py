@@ -0,0 +1,103 @@
+"""Performance: declarative monthly range partitions on date.
+
+Existing rows are copied into the partitioned table; partitions are created from the first month
+with data through three months ahead (later ones via performance_partitions.ensure_future_partitions).
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_COLUMNS = "id, article_id, date, impressions, clicks, position_avg, source, created_at, updated_at"
+
+
+def _rename_plain_table(old: str, new: str) -> None:
+    op.execute(f"ALTER TABLE {old} RENAME TO {new}")
+    op.execute(f"ALTER INDEX {old}_pkey RENAME TO {new}_pkey")
+    op.execute(f"ALTER INDEX ix_{old}_article_date_source RENAME TO ix_{new}_article_date_source")
+    op.execute(f"ALTER INDEX ix_{old}_article_id RENAME TO ix_{new}_article_id")
+    op.execute(f"ALTER SEQUENCE {old}_id_seq RENAME TO {new}_id_seq")
+
+
+def _performance_columns() -> list[sa.Column]:
+    return [
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("article_id", sa.Integer(), nullable=True),
+        sa.Column("date", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("impressions", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("clicks", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("position_avg", sa.Numeric(10, 2), nullable=True),
+        sa.Column("source", sa.String(32), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.ForeignKeyConstraint(["article_id"], ["articles.id"], ondelete="SET NULL"),
+    ]
+
+
+def upgrade() -> None:
+    _rename_plain_table("performance", "performance_legacy")
+    op.create_table(
+        "performance",
+        *_performance_columns(),
+        sa.PrimaryKeyConstraint("id", "date"),
+        postgresql_partition_by="RANGE (date)",
+    )
+    op.create_index("ix_performance_article_date_source", "performance", ["article_id", "date", "source"], unique=True)
+    op.create_index(op.f("ix_performance_article_id"), "performance", ["article_id"], unique=False)
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            m date;
+            last_month date;
+        BEGIN
+            SELECT date_trunc('month', coalesce(min(date), now()) AT TIME ZONE 'UTC')::date,
+                   greatest(
+                       date_trunc('month', coalesce(max(date), now()) AT TIME ZONE 'UTC'),
+                       date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months'
+                   )::date
+              INTO m, last_month
+              FROM performance_legacy;
+            WHILE m <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF performance FOR VALUES FROM (%L) TO (%L)',
+                    'performance_y' || to_char(m, 'YYYY') || 'm' || to_char(m, 'MM'),
+                    m::timestamp AT TIME ZONE 'UTC',
+                    (m + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+                );
+                m := (m + interval '1 month')::date;
+            END LOOP;
+        END $$;
+        """
+    )
+    op.execute(f"INSERT INTO performance ({_COLUMNS}) SELECT {_COLUMNS} FROM performance_legacy")
+    op.execute(
+        "SELECT setval(pg_get_serial_sequence('performance', 'id'), coalesce(max(id), 0) + 1, false) FROM performance"
+    )
+    op.drop_table("performance_legacy")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE performance RENAME TO performance_partitioned")
+    op.execute("ALTER INDEX performance_pkey RENAME TO performance_partitioned_pkey")
+    op.execute("ALTER INDEX ix_performance_article_date_source RENAME TO ix_performance_partitioned_article_date_source")
+    op.execute("ALTER INDEX ix_performance_article_id RENAME TO ix_performance_partitioned_article_id")
+    op.execute("ALTER SEQUENCE performance_id_seq RENAME TO performance_partitioned_id_seq")
+    op.create_table("performance", *_performance_columns(), sa.PrimaryKeyConstraint("id"))
+    op.create_index("ix_performance_article_date_source", "performance", ["article_id", "date", "source"], unique=True)
+    op.create_index(op.f("ix_performance_article_id"), "performance", ["article_id"], unique=False)
+    op.execute(f"INSERT INTO performance ({_COLUMNS}) SELECT {_COLUMNS} FROM performance_partitioned")
+    op.execute(
+        "SELECT setval(pg_get_serial_sequence('performance', 'id'), coalesce(max(id), 0) + 1, false) FROM performance"
+    )
+    op.execute("DROP TABLE performance_partitioned CASCADE")
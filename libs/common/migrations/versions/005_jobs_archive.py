@@ -0,0 +1,51 @@
+"""Jobs retention: jobs_archive (compressed rows), job_counters, articles.job_id without FK.
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Archived jobs leave `jobs`; articles must keep their job_id instead of SET NULL
+    op.drop_constraint("articles_job_id_fkey", "articles", type_="foreignkey")
+    op.create_index("ix_jobs_status_created_at", "jobs", ["status", "created_at"], unique=False)
+    op.create_table(
+        "jobs_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("job_type", sa.String(32), nullable=False),
+        sa.Column("status", sa.String(32), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("archived_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "job_counters",
+        sa.Column("job_type", sa.String(32), nullable=False),
+        sa.Column("status", sa.String(32), nullable=False),
+        sa.Column("archived", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("timed", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("duration_seconds_total", sa.Numeric(20, 3), nullable=False, server_default="0"),
+        sa.Column("last_finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("job_type", "status"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("job_counters")
+    op.drop_table("jobs_archive")
+    op.drop_index("ix_jobs_status_created_at", table_name="jobs")
+    op.execute("UPDATE articles SET job_id = NULL WHERE job_id IS NOT NULL AND job_id NOT IN (SELECT id FROM jobs)")
+    op.create_foreign_key("articles_job_id_fkey", "articles", "jobs", ["job_id"], ["id"], ondelete="SET NULL")
@@ -0,0 +1,43 @@
+"""Articles: generated tsvector (Russian) over title, target keyword and body, with a GIN index.
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same expression as db_models.ARTICLE_SEARCH_VECTOR_SQL at this revision
+_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(target_keyword, '')), 'B') || "
+    "setweight(to_tsvector('russian', coalesce(final_markdown, draft_markdown, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    # STORED generated column: computed for existing rows here and on every INSERT/UPDATE afterwards
+    op.add_column(
+        "articles",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(_SEARCH_VECTOR_SQL, persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index("ix_articles_search_vector", "articles", ["search_vector"], postgresql_using="gin")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_articles_search_vector", table_name="articles")
+    op.drop_column("articles", "search_vector")
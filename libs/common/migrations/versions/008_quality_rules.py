@@ -0,0 +1,40 @@
+"""Quality rules: stop phrases, spam markers and legal-claim patterns for the quality gate.
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "quality_rules",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("kind", sa.String(16), nullable=False, server_default="phrase"),
+        sa.Column("pattern", sa.Text(), nullable=False),
+        sa.Column("category", sa.String(64), nullable=False, server_default="spam"),
+        sa.Column("severity", sa.String(16), nullable=False, server_default="block"),
+        sa.Column("is_active", sa.Boolean(), nullable=False, server_default="true"),
+        sa.Column("description", sa.String(512), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_quality_rules_kind_pattern", "quality_rules", ["kind", "pattern"], unique=True)
+    op.create_index("ix_quality_rules_category", "quality_rules", ["category"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_quality_rules_category", table_name="quality_rules")
+    op.drop_index("ix_quality_rules_kind_pattern", table_name="quality_rules")
+    op.drop_table("quality_rules")
@@ -0,0 +1,47 @@
+"""Term corpus for TF-IDF/LSI: per-term document frequencies and per-document term sets.
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "corpus_terms",
+        sa.Column("term", sa.String(128), nullable=False),
+        sa.Column("df", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("label", sa.String(128), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("term"),
+    )
+    op.create_index("ix_corpus_terms_updated_at", "corpus_terms", ["updated_at"])
+    op.create_table(
+        "corpus_documents",
+        sa.Column("key", sa.String(256), nullable=False),
+        sa.Column("source", sa.String(16), nullable=False),
+        sa.Column("terms", postgresql.ARRAY(sa.String(128)), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("key"),
+    )
+    op.create_index("ix_corpus_documents_source", "corpus_documents", ["source"])
+    op.create_index("ix_corpus_documents_terms", "corpus_documents", ["terms"], postgresql_using="gin")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_corpus_documents_terms", table_name="corpus_documents")
+    op.drop_index("ix_corpus_documents_source", table_name="corpus_documents")
+    op.drop_table("corpus_documents")
+    op.drop_index("ix_corpus_terms_updated_at", table_name="corpus_terms")
+    op.drop_table("corpus_terms")
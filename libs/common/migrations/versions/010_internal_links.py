@@ -0,0 +1,47 @@
+"""Internal linking: sparse TF-IDF postings of published articles and the links inserted between them.
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "article_vector_terms",
+        sa.Column("term", sa.BigInteger(), nullable=False),
+        sa.Column("article_id", sa.Integer(), nullable=False),
+        sa.Column("weight", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["article_id"], ["articles.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("term", "article_id"),
+    )
+    op.create_index("ix_article_vector_terms_article_id", "article_vector_terms", ["article_id"])
+    op.create_table(
+        "article_links",
+        sa.Column("source_article_id", sa.Integer(), nullable=False),
+        sa.Column("target_article_id", sa.Integer(), nullable=False),
+        sa.Column("anchor", sa.String(256), nullable=True),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["source_article_id"], ["articles.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["target_article_id"], ["articles.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("source_article_id", "target_article_id"),
+    )
+    op.create_index("ix_article_links_target_article_id", "article_links", ["target_article_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_article_links_target_article_id", table_name="article_links")
+    op.drop_table("article_links")
+    op.drop_index("ix_article_vector_terms_article_id", table_name="article_vector_terms")
+    op.drop_table("article_vector_terms")
@@ -0,0 +1,54 @@
+"""SERP snapshot history: change-only rows (deltas between periodic keyframes) and the latest state per keyword.
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "011"
+down_revision: Union[str, None] = "010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "serp_snapshots",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("query", sa.String(512), nullable=False),
+        sa.Column("region", sa.String(64), nullable=False),
+        sa.Column("fetched_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_seen_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("fetches", sa.Integer(), server_default="1", nullable=False),
+        sa.Column("state", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("delta", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("changes", sa.Integer(), server_default="0", nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_serp_snapshots_query_region_fetched_at", "serp_snapshots", ["query", "region", "fetched_at"])
+    op.create_index("ix_serp_snapshots_fetched_at", "serp_snapshots", ["fetched_at"])
+    op.create_table(
+        "serp_snapshot_heads",
+        sa.Column("query", sa.String(512), nullable=False),
+        sa.Column("region", sa.String(64), nullable=False),
+        sa.Column("snapshot_id", sa.BigInteger(), nullable=False),
+        sa.Column("state", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("state_hash", sa.String(32), nullable=False),
+        sa.Column("deltas_since_keyframe", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("last_fetched_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["snapshot_id"], ["serp_snapshots.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("query", "region"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("serp_snapshot_heads")
+    op.drop_index("ix_serp_snapshots_fetched_at", table_name="serp_snapshots")
+    op.drop_index("ix_serp_snapshots_query_region_fetched_at", table_name="serp_snapshots")
+    op.drop_table("serp_snapshots")
@@ -0,0 +1,41 @@
+"""Draft buffer: drafts prefetched off-peak for upcoming clusters, with expiry.
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "012"
+down_revision: Union[str, None] = "011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "draft_buffer",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("cluster_id", sa.Integer(), nullable=False),
+        sa.Column("target_keyword", sa.String(256), nullable=False),
+        sa.Column("region", sa.String(64), nullable=False),
+        sa.Column("serp_data", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("draft_markdown", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["cluster_id"], ["clusters.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_draft_buffer_cluster_id", "draft_buffer", ["cluster_id"])
+    op.create_index("ix_draft_buffer_expires_at", "draft_buffer", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_draft_buffer_expires_at", table_name="draft_buffer")
+    op.drop_index("ix_draft_buffer_cluster_id", table_name="draft_buffer")
+    op.drop_table("draft_buffer")
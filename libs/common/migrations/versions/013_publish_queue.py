@@ -0,0 +1,57 @@
+"""Publish queue of publisher-tilda and the last published content hash per page.
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "013"
+down_revision: Union[str, None] = "012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "publish_queue",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("slug", sa.String(512), nullable=False),
+        sa.Column("payload", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("status", sa.String(16), server_default="pending", nullable=False),
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("result", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_publish_queue_pending_slug", "publish_queue", ["slug"], unique=True,
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+    op.create_index("ix_publish_queue_status_next_attempt_at", "publish_queue", ["status", "next_attempt_at"])
+
+    op.create_table(
+        "published_pages",
+        sa.Column("slug", sa.String(512), nullable=False),
+        sa.Column("page_id", sa.String(128), nullable=True),
+        sa.Column("url", sa.String(1024), nullable=True),
+        sa.Column("is_draft", sa.Boolean(), nullable=False),
+        sa.Column("content_hash", sa.String(32), nullable=False),
+        sa.Column("published_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("slug"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("published_pages")
+    op.drop_index("ix_publish_queue_status_next_attempt_at", table_name="publish_queue")
+    op.drop_index("ix_publish_queue_pending_slug", table_name="publish_queue")
+    op.drop_table("publish_queue")
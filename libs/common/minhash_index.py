@@ -0,0 +1,237 @@
+"""Persistent MinHash LSH index over stored articles (near-duplicate detection for the quality gate).
+
+Text -> normalized words -> 4-word shingles -> 128-slot MinHash signature (one-permutation hashing
+with rotation densification: one 64-bit hash per shingle instead of 128). The signature is cut into
+32 bands of 4 slots; each band is hashed into a bucket stored in article_minhash_bands. A query
+probes its 32 (band, bucket) pairs through the primary key, so candidate lookup does not scan the
+corpus; candidates are then ranked by signature agreement (estimated Jaccard similarity).
+
+Shingle hashes are computed per block (paragraph/section) and cached by block hash; shingles that
+span a block boundary are added from the neighbouring blocks' edge words, so the signature equals the
+whole-text one while an edited article only re-hashes its changed blocks.
+
+NUM_PERM/BANDS/SHINGLE_SIZE are baked into stored rows: changing them requires reindex_articles().
+"""
+from __future__ import annotations
+
+import hashlib
+import struct
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from libs.common.block_cache import BlockCache
+from libs.common.logging import get_logger
+from libs.common.models.db_models import Article, ArticleMinhash, ArticleMinhashBand
+from libs.common.text import split_blocks, words
+
+logger = get_logger(__name__)
+
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 4
+CANDIDATES = 50
+
+_MASK32 = 0xFFFFFFFF
+_EMPTY = _MASK32 + 1
+_ROTATION = 0x9E3779B1  # added per hop when a slot borrows from a neighbour (densification)
+_PACK = struct.Struct(f"<{NUM_PERM}I")
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+@dataclass(frozen=True, slots=True)
+class BlockShingles:
+    size: int  # words in the block
+    head: tuple[str, ...]  # first SHINGLE_SIZE words
+    tail: tuple[str, ...]  # last SHINGLE_SIZE - 1 words
+    hashes: frozenset[int]  # shingles fully inside the block
+
+
+def block_shingles(block: str) -> BlockShingles:
+    tokens = words(block)
+    return BlockShingles(
+        size=len(tokens),
+        head=tuple(tokens[:SHINGLE_SIZE]),
+        tail=tuple(tokens[-(SHINGLE_SIZE - 1):]),
+        hashes=frozenset(
+            _hash64(" ".join(tokens[i:i + SHINGLE_SIZE])) for i in range(len(tokens) - SHINGLE_SIZE + 1)
+        ),
+    )
+
+
+_block_cache: BlockCache[BlockShingles] | None = None
+
+
+def get_block_cache() -> BlockCache[BlockShingles]:
+    global _block_cache
+    if _block_cache is None:
+        _block_cache = BlockCache(block_shingles)
+    return _block_cache
+
+
+def shingle_hashes(content: str) -> set[int]:
+    """Hashes of the distinct SHINGLE_SIZE-word windows; a short text yields one shingle of all its words."""
+    blocks, _ = get_block_cache().get_many(split_blocks(content))
+    total = sum(b.size for b in blocks)
+    if total == 0:
+        return set()
+    if total <= SHINGLE_SIZE:
+        return {_hash64(" ".join(word for b in blocks for word in b.head))}
+    hashes: set[int] = set().union(*(b.hashes for b in blocks))
+    # Windows starting in the previous blocks' last words and ending in this block
+    carry: tuple[str, ...] = ()
+    for b in blocks:
+        seq = carry + b.head[:SHINGLE_SIZE - 1]
+        for i in range(min(len(carry), len(seq) - SHINGLE_SIZE + 1)):
+            hashes.add(_hash64(" ".join(seq[i:i + SHINGLE_SIZE])))
+        carry = (carry + b.tail)[-(SHINGLE_SIZE - 1):]
+    return hashes
+
+
+def signature(content: str) -> tuple[list[int], int] | None:
+    """MinHash signature and shingle count, or None when the text has no words."""
+    shingles = shingle_hashes(content)
+    if not shingles:
+        return None
+    slots = [_EMPTY] * NUM_PERM
+    for h in shingles:
+        slot = (h >> 32) % NUM_PERM
+        value = h & _MASK32
+        if value < slots[slot]:
+            slots[slot] = value
+    # Short texts leave slots empty: fill each from the next non-empty slot (circularly), shifted by
+    # the distance so two documents agree on a filled slot only if they agree on the source slot.
+    if _EMPTY in slots:
+        filled = list(slots)
+        for i in range(NUM_PERM):
+            if slots[i] != _EMPTY:
+                continue
+            for hop in range(1, NUM_PERM):
+                source = slots[(i + hop) % NUM_PERM]
+                if source != _EMPTY:
+                    filled[i] = (source + hop * _ROTATION) & _MASK32
+                    break
+        slots = filled
+    return slots, len(shingles)
+
+
+def band_buckets(sig: list[int]) -> list[tuple[int, int]]:
+    """(band, signed 64-bit bucket) for each band of ROWS consecutive slots."""
+    result = []
+    for band in range(BANDS):
+        chunk = struct.pack(f"<{ROWS}I", *sig[band * ROWS:(band + 1) * ROWS])
+        digest = hashlib.blake2b(chunk, digest_size=8, person=band.to_bytes(2, "little")).digest()
+        result.append((band, int.from_bytes(digest, "little", signed=True)))
+    return result
+
+
+def similarity(a: list[int], b: list[int]) -> float:
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERM
+
+
+def index_article(session: Session, article_id: int, content: str | None) -> bool:
+    """Insert or replace one article's signature and buckets. Returns False when the text is empty."""
+    session.execute(delete(ArticleMinhashBand).where(ArticleMinhashBand.article_id == article_id))
+    computed = signature(content or "")
+    if computed is None:
+        session.execute(delete(ArticleMinhash).where(ArticleMinhash.article_id == article_id))
+        return False
+    sig, count = computed
+    stmt = pg_insert(ArticleMinhash).values(article_id=article_id, signature=_PACK.pack(*sig), shingles=count)
+    session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[ArticleMinhash.article_id],
+            set_={"signature": stmt.excluded.signature, "shingles": stmt.excluded.shingles, "updated_at": text("now()")},
+        )
+    )
+    session.execute(
+        pg_insert(ArticleMinhashBand)
+        .values([{"band": band, "bucket": bucket, "article_id": article_id} for band, bucket in band_buckets(sig)])
+        .on_conflict_do_nothing()
+    )
+    return True
+
+
+def find_similar(
+    session: Session,
+    content: str,
+    limit: int = 5,
+    min_similarity: float = 0.2,
+    exclude_ids: Iterable[int] = (),
+) -> list[dict[str, Any]]:
+    """Nearest stored articles by estimated Jaccard similarity, best first."""
+    computed = signature(content)
+    if computed is None:
+        return []
+    return find_similar_signature(session, computed[0], limit, min_similarity, exclude_ids)
+
+
+def find_similar_signature(
+    session: Session,
+    sig: list[int],
+    limit: int = 5,
+    min_similarity: float = 0.2,
+    exclude_ids: Iterable[int] = (),
+) -> list[dict[str, Any]]:
+    """Same as find_similar for a precomputed signature (e.g. computed in a worker process)."""
+    buckets = band_buckets(sig)
+    exclude = list(exclude_ids)
+    candidates = session.execute(
+        text(
+            """
+            SELECT b.article_id, count(*) AS hits
+            FROM article_minhash_bands b
+            JOIN unnest(CAST(:bands AS int[]), CAST(:buckets AS bigint[])) AS q(band, bucket)
+              ON b.band = q.band AND b.bucket = q.bucket
+            WHERE NOT (b.article_id = ANY(CAST(:exclude AS int[])))
+            GROUP BY b.article_id
+            ORDER BY hits DESC
+            LIMIT :limit
+            """
+        ),
+        {"bands": [b for b, _ in buckets], "buckets": [k for _, k in buckets], "exclude": exclude, "limit": CANDIDATES},
+    ).all()
+    if not candidates:
+        return []
+    rows = session.execute(
+        select(ArticleMinhash.article_id, ArticleMinhash.signature, Article.title, Article.slug)
+        .join(Article, Article.id == ArticleMinhash.article_id)
+        .where(ArticleMinhash.article_id.in_([c.article_id for c in candidates]))
+    ).all()
+    matches = []
+    for row in rows:
+        score = similarity(sig, list(_PACK.unpack(row.signature)))
+        if score >= min_similarity:
+            matches.append({"article_id": row.article_id, "similarity": round(score, 3), "title": row.title, "slug": row.slug})
+    matches.sort(key=lambda m: (-m["similarity"], m["article_id"]))
+    return matches[:limit]
+
+
+def reindex_articles(session: Session, batch_size: int = 500, only_missing: bool = True) -> int:
+    """Backfill the index from articles (final_markdown, else draft), committing per batch."""
+    last_id, total = 0, 0
+    while True:
+        q = (
+            select(Article.id, Article.final_markdown, Article.draft_markdown)
+            .where(Article.id > last_id)
+            .order_by(Article.id)
+            .limit(batch_size)
+        )
+        if only_missing:
+            q = q.where(~select(ArticleMinhash.article_id).where(ArticleMinhash.article_id == Article.id).exists())
+        rows = session.execute(q).all()
+        if not rows:
+            break
+        for row in rows:
+            total += index_article(session, row.id, row.final_markdown or row.draft_markdown)
+        last_id = rows[-1].id
+        session.commit()
+    logger.info("minhash_reindexed", articles=total)
+    return total
@@ -2,25 +2,55 @@
 from libs.common.models.base import Base
 from libs.common.models.db_models import (
     Article,
+    ArticleLink,
+    ArticleMinhash,
+    ArticleMinhashBand,
+    ArticleVectorTerm,
+    BufferedDraft,
     Cluster,
+    CorpusDocument,
+    CorpusTerm,
     Job,
+    JobArchive,
+    JobCounter,
     Keyword,
     LinkSite,
     LinkTask,
     CaseTemplate,
     Performance,
+    PerformanceRollup,
+    PublishTask,
+    PublishedPage,
+    QualityRule,
+    SerpSnapshot,
+    SerpSnapshotHead,
     Setting,
 )
 
 __all__ = [
     "Base",
     "Article",
+    "ArticleLink",
+    "ArticleMinhash",
+    "ArticleMinhashBand",
+    "ArticleVectorTerm",
+    "BufferedDraft",
     "Cluster",
+    "CorpusDocument",
+    "CorpusTerm",
     "Job",
+    "JobArchive",
+    "JobCounter",
     "Keyword",
     "LinkSite",
     "LinkTask",
     "CaseTemplate",
     "Performance",
+    "PerformanceRollup",
+    "PublishTask",
+    "PublishedPage",
+    "QualityRule",
+    "SerpSnapshot",
+    "SerpSnapshotHead",
     "Setting",
 ]
@@ -1,24 +1,30 @@
 """SQLAlchemy ORM models for SEO Agent."""
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 from typing import TYPE_CHECKING, Optional
 import enum
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
+    Computed,
+    Date,
     DateTime,
     Enum,
+    Float,
     ForeignKey,
     Index,
     Integer,
+    LargeBinary,
     Numeric,
     String,
     Text,
     func,
+    text,
 )
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from libs.common.models.base import Base, TimestampMixin
@@ -45,10 +51,40 @@ class JobStatus(str, enum.Enum):
     CANCELLED = "cancelled"   # отменён
 
 
+class RollupGrain(str, enum.Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+class RollupScope(str, enum.Enum):
+    ARTICLE = "article"
+    CLUSTER = "cluster"
+
+
+class QualityRuleKind(str, enum.Enum):
+    PHRASE = "phrase"  # literal phrase, case- and ё-insensitive, whole words
+    REGEX = "regex"
+
+
+class QualityRuleSeverity(str, enum.Enum):
+    BLOCK = "block"  # fails the quality check
+    WARN = "warn"    # reported only
+
+
+class PublishTaskStatus(str, enum.Enum):
+    PENDING = "pending"        # ждёт отправки (или повтора после ошибки)
+    PROCESSING = "processing"  # взят воркером publisher-tilda
+    DONE = "done"              # опубликован
+    SKIPPED = "skipped"        # содержимое не изменилось с последней публикации
+    FAILED = "failed"          # исчерпаны попытки
+
+
 class JobType(str, enum.Enum):
     DAILY_RUN = "daily_run"   # ежедневный пайплайн
     SINGLE_ARTICLE = "single_article"
     UPDATE_ARTICLE = "update_article"  # для Update Engine (зарезервировано)
+    KEYWORD_CLUSTERING = "keyword_clustering"  # кластеризация ключей по пересечению выдачи
 
 
 # --- Settings (key-value from DB) ---
@@ -84,11 +120,20 @@ class Keyword(Base, TimestampMixin):
 
 
 # --- Articles ---
+# Full-text search (see article_search): title > target keyword > body, Russian stemming
+ARTICLE_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(target_keyword, '')), 'B') || "
+    "setweight(to_tsvector('russian', coalesce(final_markdown, draft_markdown, '')), 'C')"
+)
+
+
 class Article(Base, TimestampMixin):
     __tablename__ = "articles"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     cluster_id: Mapped[int] = mapped_column(ForeignKey("clusters.id", ondelete="SET NULL"), nullable=True, index=True)
-    job_id: Mapped[Optional[int]] = mapped_column(ForeignKey("jobs.id", ondelete="SET NULL"), nullable=True, index=True)
+    # No FK: finished jobs are moved to jobs_archive and articles keep pointing at them
+    job_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, index=True)
     title: Mapped[Optional[str]] = mapped_column(String(512), nullable=True)
     slug: Mapped[Optional[str]] = mapped_column(String(512), nullable=True, index=True)
     status: Mapped[str] = mapped_column(
@@ -106,7 +151,156 @@ class Article(Base, TimestampMixin):
     index_requested_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     quality_scores: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)  # pass/fail + scores
     cluster: Mapped[Optional["Cluster"]] = relationship("Cluster", back_populates="articles")
-    job: Mapped[Optional["Job"]] = relationship("Job", back_populates="articles")
+    job: Mapped[Optional["Job"]] = relationship(
+        "Job", primaryjoin="foreign(Article.job_id) == Job.id", back_populates="articles"
+    )
+    # Maintained by Postgres on every write; deferred so regular loads do not fetch it
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR, Computed(ARTICLE_SEARCH_VECTOR_SQL, persisted=True), deferred=True, nullable=True
+    )
+    __table_args__ = (Index("ix_articles_search_vector", "search_vector", postgresql_using="gin"),)
+
+
+# URL lookup for analytics ingestion (same normalization as performance_ingest.normalize_url)
+Index("ix_articles_tilda_url_norm", func.rtrim(func.lower(Article.tilda_url), "/"))
+
+
+# --- Uniqueness index (MinHash signatures + LSH band buckets, see minhash_index) ---
+class ArticleMinhash(Base):
+    __tablename__ = "article_minhash"
+    article_id: Mapped[int] = mapped_column(ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    signature: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)  # NUM_PERM little-endian uint32
+    shingles: Mapped[int] = mapped_column(Integer, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class ArticleMinhashBand(Base):
+    __tablename__ = "article_minhash_bands"
+    band: Mapped[int] = mapped_column(Integer, primary_key=True)
+    bucket: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    article_id: Mapped[int] = mapped_column(ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True, index=True)
+
+
+# --- Quality rules (stop phrases, spam markers, legal claims; compiled by quality_rules) ---
+class QualityRule(Base, TimestampMixin):
+    __tablename__ = "quality_rules"
+    __table_args__ = (Index("ix_quality_rules_kind_pattern", "kind", "pattern", unique=True),)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    kind: Mapped[str] = mapped_column(String(16), default=QualityRuleKind.PHRASE.value, nullable=False)
+    pattern: Mapped[str] = mapped_column(Text, nullable=False)
+    category: Mapped[str] = mapped_column(String(64), default="spam", nullable=False, index=True)
+    severity: Mapped[str] = mapped_column(String(16), default=QualityRuleSeverity.BLOCK.value, nullable=False)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    description: Mapped[Optional[str]] = mapped_column(String(512), nullable=True)
+
+
+# --- Term corpus for TF-IDF/LSI (SERP snippets + our articles; document frequencies kept incrementally, see lsi) ---
+class CorpusTerm(Base):
+    __tablename__ = "corpus_terms"
+    term: Mapped[str] = mapped_column(String(128), primary_key=True)  # stem or "stem stem" bigram
+    df: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    label: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)  # readable surface form
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False, index=True
+    )
+
+
+class CorpusDocument(Base):
+    __tablename__ = "corpus_documents"
+    __table_args__ = (Index("ix_corpus_documents_terms", "terms", postgresql_using="gin"),)
+    key: Mapped[str] = mapped_column(String(256), primary_key=True)  # "article:<id>" | "serp:<url hash>"
+    source: Mapped[str] = mapped_column(String(16), nullable=False, index=True)  # article | serp
+    terms: Mapped[list[str]] = mapped_column(ARRAY(String(128)), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+
+# --- Internal linking: sparse TF-IDF postings of published articles + inserted links (see internal_links) ---
+class ArticleVectorTerm(Base):
+    __tablename__ = "article_vector_terms"
+    term: Mapped[int] = mapped_column(BigInteger, primary_key=True)  # 64-bit hash of the term
+    article_id: Mapped[int] = mapped_column(ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True, index=True)
+    weight: Mapped[float] = mapped_column(Float, nullable=False)  # L2-normalized over the article's kept terms
+
+
+class ArticleLink(Base):
+    __tablename__ = "article_links"
+    source_article_id: Mapped[int] = mapped_column(ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    target_article_id: Mapped[int] = mapped_column(
+        ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    anchor: Mapped[Optional[str]] = mapped_column(String(256), nullable=True)  # None: listed in "Читайте также"
+    score: Mapped[float] = mapped_column(Float, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+# --- SERP history per (query, region): current state + change-only rows, deltas between keyframes (see serp_history) ---
+class SerpSnapshot(Base):
+    __tablename__ = "serp_snapshots"
+    __table_args__ = (Index("ix_serp_snapshots_query_region_fetched_at", "query", "region", "fetched_at"),)
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    query: Mapped[str] = mapped_column(String(512), nullable=False)
+    region: Mapped[str] = mapped_column(String(64), nullable=False)
+    fetched_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)  # state first seen
+    last_seen_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)  # last fetch with this state
+    fetches: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+    state: Mapped[Optional[dict]] = mapped_column(JSONB(none_as_null=True), nullable=True)  # full snapshot: keyframes only
+    delta: Mapped[Optional[dict]] = mapped_column(JSONB(none_as_null=True), nullable=True)  # vs previous row; None: first
+    changes: Mapped[int] = mapped_column(Integer, default=0, nullable=False)  # volatility: changed items + hints
+
+
+class SerpSnapshotHead(Base):
+    """Latest state per (query, region), so recording a fetch never replays history."""
+    __tablename__ = "serp_snapshot_heads"
+    query: Mapped[str] = mapped_column(String(512), primary_key=True)
+    region: Mapped[str] = mapped_column(String(64), primary_key=True)
+    snapshot_id: Mapped[int] = mapped_column(ForeignKey("serp_snapshots.id", ondelete="CASCADE"), nullable=False)
+    state: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    state_hash: Mapped[str] = mapped_column(String(32), nullable=False)
+    deltas_since_keyframe: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    last_fetched_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+# --- Drafts generated off-peak for upcoming clusters, consumed by the daily pipeline (see draft_buffer) ---
+class BufferedDraft(Base):
+    __tablename__ = "draft_buffer"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    cluster_id: Mapped[int] = mapped_column(ForeignKey("clusters.id", ondelete="CASCADE"), nullable=False, index=True)
+    target_keyword: Mapped[str] = mapped_column(String(256), nullable=False)
+    region: Mapped[str] = mapped_column(String(64), nullable=False)
+    serp_data: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)  # serp-intel response the draft used
+    draft_markdown: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+
+
+# --- Publish queue of publisher-tilda and the last published version of each page (see publish_queue) ---
+class PublishTask(Base, TimestampMixin):
+    __tablename__ = "publish_queue"
+    __table_args__ = (
+        # At most one pending operation per page: re-enqueueing a slug replaces its payload
+        Index("ix_publish_queue_pending_slug", "slug", unique=True, postgresql_where=text("status = 'pending'")),
+        Index("ix_publish_queue_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    slug: Mapped[str] = mapped_column(String(512), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)  # publisher PublishRequest
+    status: Mapped[str] = mapped_column(String(16), default=PublishTaskStatus.PENDING.value, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    result: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
+
+
+class PublishedPage(Base):
+    __tablename__ = "published_pages"
+    slug: Mapped[str] = mapped_column(String(512), primary_key=True)
+    page_id: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
+    url: Mapped[Optional[str]] = mapped_column(String(1024), nullable=True)
+    is_draft: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    content_hash: Mapped[str] = mapped_column(String(32), nullable=False)  # of everything sent to Tilda
+    published_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
 
 # --- Jobs (queue / pipeline) ---
@@ -121,20 +315,68 @@ class Job(Base, TimestampMixin):
     started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     rq_job_id: Mapped[Optional[str]] = mapped_column(String(128), nullable=True, index=True)
-    articles: Mapped[list["Article"]] = relationship("Article", back_populates="job")
+    articles: Mapped[list["Article"]] = relationship(
+        "Article", primaryjoin="Job.id == foreign(Article.job_id)", back_populates="job"
+    )
+    __table_args__ = (Index("ix_jobs_status_created_at", "status", "created_at"),)
 
 
-# --- Performance (analytics placeholder) ---
+class JobArchive(Base):
+    """Finished jobs moved out of `jobs` (see job_archive); the full row is zlib-compressed JSON."""
+    __tablename__ = "jobs_archive"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)  # original jobs.id
+    job_type: Mapped[str] = mapped_column(String(32), nullable=False)
+    status: Mapped[str] = mapped_column(String(32), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+
+class JobCounter(Base):
+    """Totals of archived jobs per (job_type, status), so stats do not need the archive rows."""
+    __tablename__ = "job_counters"
+    job_type: Mapped[str] = mapped_column(String(32), primary_key=True)
+    status: Mapped[str] = mapped_column(String(32), primary_key=True)
+    archived: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    timed: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)  # jobs with started_at and finished_at
+    duration_seconds_total: Mapped[Decimal] = mapped_column(Numeric(20, 3), default=0, nullable=False)
+    last_finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+# --- Performance (monthly range partitions on date, see performance_partitions) ---
 class Performance(Base, TimestampMixin):
     __tablename__ = "performance"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     article_id: Mapped[Optional[int]] = mapped_column(ForeignKey("articles.id", ondelete="SET NULL"), nullable=True, index=True)
-    date: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    date: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True, nullable=False)
     impressions: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     clicks: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     position_avg: Mapped[Optional[Decimal]] = mapped_column(Numeric(10, 2), nullable=True)
     source: Mapped[str] = mapped_column(String(32), nullable=False)  # gsc | yandex
-    __table_args__ = (Index("ix_performance_article_date_source", "article_id", "date", "source", unique=True),)
+    __table_args__ = (
+        Index("ix_performance_article_date_source", "article_id", "date", "source", unique=True),
+        {"postgresql_partition_by": "RANGE (date)"},
+    )
+
+
+class PerformanceRollup(Base, TimestampMixin):
+    """Pre-aggregated performance per article/cluster and day/week/month (see performance_rollups)."""
+    __tablename__ = "performance_rollups"
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    scope: Mapped[str] = mapped_column(String(16), nullable=False)  # article | cluster
+    grain: Mapped[str] = mapped_column(String(8), nullable=False)  # day | week | month
+    scope_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    period_start: Mapped[date] = mapped_column(Date, nullable=False)
+    source: Mapped[str] = mapped_column(String(32), nullable=False)
+    impressions: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    clicks: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    # avg position = position_sum / position_weight (impression-weighted, additive across periods)
+    position_sum: Mapped[Decimal] = mapped_column(Numeric(20, 2), default=0, nullable=False)
+    position_weight: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    __table_args__ = (
+        Index("ix_performance_rollups_key", "scope", "grain", "scope_id", "period_start", "source", unique=True),
+    )
 
 
 # --- Linkbuilding ---
@@ -0,0 +1,242 @@
+"""Search performance ingestion: streamed GSC/Yandex exports -> COPY into a staging table -> one set-based merge.
+
+Rows are matched to articles by normalized URL through ix_articles_tilda_url_norm; several export rows
+for the same (page, date) — e.g. one per query — are aggregated (sums, impression-weighted position).
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+import time
+from datetime import date, datetime
+from typing import IO, Iterable, Iterator, NamedTuple
+from urllib.parse import urlsplit, urlunsplit
+
+from sqlalchemy.orm import Session
+
+from libs.common.performance_partitions import ensure_partitions
+from libs.common.schemas.performance import PerformanceIngestReport
+
+COPY_BATCH_ROWS = 50_000
+MAX_REPORTED_ERRORS = 100
+UNMATCHED_SAMPLE = 20
+
+# Header names seen in GSC / Yandex Webmaster exports (lowercased)
+COLUMN_ALIASES: dict[str, tuple[str, ...]] = {
+    "url": ("url", "page", "pages", "top pages", "landing page", "страница", "адрес", "url страницы"),
+    "date": ("date", "day", "дата"),
+    "clicks": ("clicks", "клики"),
+    "impressions": ("impressions", "показы"),
+    "position": ("position", "avg_position", "average position", "средняя позиция", "позиция"),
+}
+
+
+class PerformanceRow(NamedTuple):
+    url: str
+    date: date
+    impressions: int
+    clicks: int
+    position: float | None
+
+
+def normalize_url(url: str) -> str:
+    """Must match the ix_articles_tilda_url_norm expression: rtrim(lower(tilda_url), '/')."""
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, parts.query, "")).lower().rstrip("/")
+
+
+def _parse_date(value: str) -> date:
+    value = value.strip()
+    if "." in value:  # Yandex: 31.01.2025
+        return datetime.strptime(value, "%d.%m.%Y").date()
+    return date.fromisoformat(value[:10])
+
+
+def _clean_number(value: object) -> str:
+    """'1 234,5' (thin/nbsp thousands separators, decimal comma) -> '1234.5'."""
+    return str(value).replace(" ", "").replace("\u00a0", "").replace("\u202f", "").replace(",", ".")
+
+
+def _parse_int(value: object) -> int:
+    if value is None or value == "":
+        return 0
+    if isinstance(value, (int, float)):
+        return int(value)
+    return int(float(_clean_number(value)))
+
+
+def _parse_float(value: object) -> float | None:
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    return float(_clean_number(value))
+
+
+def _row_from_mapping(data: dict) -> PerformanceRow:
+    def pick(field: str) -> object:
+        for alias in COLUMN_ALIASES[field]:
+            if alias in data:
+                return data[alias]
+        return None
+
+    url, day = pick("url"), pick("date")
+    if not url or not day:
+        raise ValueError("url and date are required")
+    return PerformanceRow(
+        url=normalize_url(str(url)),
+        date=_parse_date(str(day)),
+        impressions=_parse_int(pick("impressions")),
+        clicks=_parse_int(pick("clicks")),
+        position=_parse_float(pick("position")),
+    )
+
+
+def iter_csv_rows(stream: IO[str]) -> Iterator[tuple[int, PerformanceRow | None, str | None]]:
+    """CSV export with a header row; delimiter (comma/semicolon/tab) is sniffed from the header."""
+    header = stream.readline()
+    delimiter = max((",", ";", "\t"), key=header.count)
+    reader = csv.reader(stream, delimiter=delimiter)
+    columns = [c.strip().lower() for c in next(csv.reader([header], delimiter=delimiter), [])]
+    for values in reader:
+        line_no = reader.line_num + 1
+        if not values:
+            continue
+        try:
+            yield line_no, _row_from_mapping(dict(zip(columns, values))), None
+        except (ValueError, TypeError) as e:
+            yield line_no, None, f"line {line_no}: {e}"
+
+
+def iter_jsonl_rows(
+    stream: IO[str], dimensions: tuple[str, ...] = ("date", "page")
+) -> Iterator[tuple[int, PerformanceRow | None, str | None]]:
+    """JSON lines: flat objects, or GSC API rows {"keys": [...], "clicks", ...} with keys in `dimensions` order."""
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+            if not isinstance(data, dict):
+                raise ValueError("expected a JSON object")
+            data = {str(k).lower(): v for k, v in data.items()}
+            if isinstance(data.get("keys"), list):
+                data.update(zip(dimensions, data["keys"]))
+            yield line_no, _row_from_mapping(data), None
+        except (ValueError, TypeError) as e:
+            yield line_no, None, f"line {line_no}: {e}"
+
+
+_STAGING_DDL = """
+CREATE TEMP TABLE perf_staging (
+    url text NOT NULL,
+    date date NOT NULL,
+    impressions bigint NOT NULL,
+    clicks bigint NOT NULL,
+    position numeric
+) ON COMMIT DROP
+"""
+
+_MERGE_SQL = """
+WITH agg AS (
+    SELECT a.id AS article_id,
+           (s.date::timestamp AT TIME ZONE 'UTC') AS date,
+           sum(s.impressions) AS impressions,
+           sum(s.clicks) AS clicks,
+           round(coalesce(
+               sum(s.position * s.impressions) / nullif(sum(s.impressions) FILTER (WHERE s.position IS NOT NULL), 0),
+               avg(s.position)
+           ), 2) AS position_avg
+    FROM perf_staging s
+    JOIN articles a ON rtrim(lower(a.tilda_url), '/') = s.url
+    GROUP BY a.id, s.date
+), upserted AS (
+    INSERT INTO performance (article_id, date, source, impressions, clicks, position_avg)
+    SELECT article_id, date, %(source)s, impressions, clicks, position_avg FROM agg
+    ON CONFLICT (article_id, date, source) DO UPDATE SET
+        impressions = EXCLUDED.impressions,
+        clicks = EXCLUDED.clicks,
+        position_avg = EXCLUDED.position_avg,
+        updated_at = now()
+    RETURNING (xmax = 0) AS inserted
+)
+SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM upserted
+"""
+
+_UNMATCHED_SQL = """
+SELECT s.url
+FROM (SELECT url, count(*) AS n FROM perf_staging GROUP BY url) s
+WHERE NOT EXISTS (SELECT 1 FROM articles a WHERE rtrim(lower(a.tilda_url), '/') = s.url)
+ORDER BY s.n DESC
+LIMIT %(limit)s
+"""
+
+
+def ingest_performance(
+    session: Session,
+    rows: Iterable[tuple[int, PerformanceRow | None, str | None]],
+    source: str,
+    batch_rows: int = COPY_BATCH_ROWS,
+) -> PerformanceIngestReport:
+    """COPY rows into a temp staging table in batches, then upsert into performance with one statement."""
+    started = time.perf_counter()
+    report = PerformanceIngestReport(source=source)
+    cursor = session.connection().connection.cursor()
+    try:
+        _copy_and_merge(session, cursor, rows, source, batch_rows, report)
+    finally:
+        cursor.close()
+    report.seconds = round(time.perf_counter() - started, 3)
+    return report
+
+
+def _copy_and_merge(  # type: ignore[no-untyped-def]
+    session: Session, cursor, rows, source: str, batch_rows: int, report: PerformanceIngestReport
+) -> None:
+    cursor.execute(_STAGING_DDL)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    pending = 0
+
+    def flush() -> None:
+        nonlocal buffer, writer, pending
+        if not pending:
+            return
+        buffer.seek(0)
+        cursor.copy_expert("COPY perf_staging (url, date, impressions, clicks, position) FROM STDIN WITH (FORMAT csv)", buffer)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        pending = 0
+
+    for _line, row, error in rows:
+        if error is not None:
+            report.rows_rejected += 1
+            if len(report.errors) < MAX_REPORTED_ERRORS:
+                report.errors.append(error)
+            continue
+        report.rows_read += 1
+        writer.writerow((row.url, row.date.isoformat(), row.impressions, row.clicks, "" if row.position is None else row.position))
+        pending += 1
+        if pending >= batch_rows:
+            flush()
+    flush()
+
+    cursor.execute("ANALYZE perf_staging")
+    cursor.execute("SELECT min(date), max(date) FROM perf_staging")
+    report.date_from, report.date_to = cursor.fetchone()
+    if report.date_from is not None:
+        ensure_partitions(session, report.date_from, report.date_to)
+    cursor.execute(_UNMATCHED_SQL, {"limit": UNMATCHED_SAMPLE})
+    unmatched = cursor.fetchall()
+    report.unmatched_urls = [r[0] for r in unmatched]
+    if unmatched:
+        cursor.execute(
+            "SELECT count(*) FROM perf_staging s WHERE NOT EXISTS "
+            "(SELECT 1 FROM articles a WHERE rtrim(lower(a.tilda_url), '/') = s.url)"
+        )
+        report.rows_unmatched = cursor.fetchone()[0]
+    cursor.execute(_MERGE_SQL, {"source": source})
+    report.upserted_inserted, report.upserted_updated = cursor.fetchone()
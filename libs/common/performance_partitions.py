@@ -0,0 +1,115 @@
+"""Monthly partitions of the performance table: creation ahead of time and retention.
+
+Partitions are named performance_yYYYYmMM and cover [month start, next month start) in UTC.
+Retention detaches whole partitions (a metadata operation) and either keeps them as
+performance_archive_yYYYYmMM tables or drops them. Rollups are not touched, so aggregated
+history outlives the raw rows.
+"""
+from __future__ import annotations
+
+import re
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from libs.common.config import get_settings
+from libs.common.logging import get_logger
+
+logger = get_logger(__name__)
+
+_PARTITION_RE = re.compile(r"^performance_y(\d{4})m(\d{2})$")
+_LOCK_KEY = "performance_partitions"
+
+
+def month_start(d: date) -> date:
+    return date(d.year, d.month, 1)
+
+
+def add_months(d: date, months: int) -> date:
+    index = d.year * 12 + d.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"performance_y{month.year:04d}m{month.month:02d}"
+
+
+def _lock(session: Session) -> None:
+    # Concurrent ingests may try to create the same partition
+    session.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": _LOCK_KEY})
+
+
+def ensure_partitions(session: Session, date_from: date, date_to: date) -> list[str]:
+    """Create missing monthly partitions covering [date_from, date_to]. Returns created names."""
+    existing = set(list_partitions(session))
+    months = []
+    month = month_start(date_from)
+    while month <= date_to:
+        if month not in existing:
+            months.append(month)
+        month = add_months(month, 1)
+    if not months:
+        return []
+    _lock(session)
+    created = []
+    for month in months:
+        name = partition_name(month)
+        lower, upper = month.isoformat(), add_months(month, 1).isoformat()
+        session.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF performance "
+                f"FOR VALUES FROM ('{lower} 00:00:00+00') TO ('{upper} 00:00:00+00')"
+            )
+        )
+        created.append(name)
+    logger.info("performance_partitions_created", partitions=created)
+    return created
+
+
+def ensure_future_partitions(session: Session, months_ahead: int | None = None) -> list[str]:
+    """Keep partitions from the current month through `months_ahead` months ahead."""
+    if months_ahead is None:
+        months_ahead = get_settings().performance_partitions_ahead
+    today = datetime.now(timezone.utc).date()
+    return ensure_partitions(session, month_start(today), add_months(month_start(today), months_ahead))
+
+
+def list_partitions(session: Session) -> dict[date, str]:
+    """Attached partitions of performance: month -> table name."""
+    rows = session.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'performance'::regclass"
+        )
+    ).scalars()
+    result = {}
+    for name in rows:
+        m = _PARTITION_RE.match(name)
+        if m:
+            result[date(int(m.group(1)), int(m.group(2)), 1)] = name
+    return result
+
+
+def apply_retention(session: Session, keep_months: int | None = None, mode: str | None = None) -> list[str]:
+    """Detach (and archive or drop) partitions older than `keep_months` full months before the current one."""
+    settings = get_settings()
+    keep_months = settings.performance_retention_months if keep_months is None else keep_months
+    mode = mode or settings.performance_retention_mode
+    cutoff = add_months(month_start(datetime.now(timezone.utc).date()), -keep_months)
+    old = sorted((m, name) for m, name in list_partitions(session).items() if m < cutoff)
+    if not old:
+        return []
+    _lock(session)
+    handled = []
+    for month, name in old:
+        session.execute(text(f"ALTER TABLE performance DETACH PARTITION {name}"))
+        if mode == "drop":
+            session.execute(text(f"DROP TABLE {name}"))
+        else:
+            archive = f"performance_archive_y{month.year:04d}m{month.month:02d}"
+            session.execute(text(f"ALTER TABLE {name} RENAME TO {archive}"))
+        handled.append(name)
+    logger.info("performance_partitions_retired", partitions=handled, mode=mode, cutoff=cutoff.isoformat())
+    return handled
@@ -0,0 +1,122 @@
+"""Incrementally maintained performance rollups and the time-series queries that read them.
+
+Only periods touched by new raw data are recomputed: article/day from raw `performance` rows,
+article/week and article/month from article/day, cluster/* from article/* of the same grain.
+Position is stored as an impression-weighted sum so every level stays additive.
+"""
+from __future__ import annotations
+
+from datetime import date
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from libs.common.models.db_models import RollupGrain, RollupScope
+
+_UPSERT_TAIL = """
+ON CONFLICT (scope, grain, scope_id, period_start, source) DO UPDATE SET
+    impressions = EXCLUDED.impressions,
+    clicks = EXCLUDED.clicks,
+    position_sum = EXCLUDED.position_sum,
+    position_weight = EXCLUDED.position_weight,
+    updated_at = now()
+"""
+
+_ARTICLE_DAY_SQL = """
+INSERT INTO performance_rollups
+    (scope, grain, scope_id, period_start, source, impressions, clicks, position_sum, position_weight)
+SELECT 'article', 'day', p.article_id, (p.date AT TIME ZONE 'UTC')::date, p.source,
+       sum(p.impressions), sum(p.clicks),
+       coalesce(sum(p.position_avg * p.impressions), 0),
+       coalesce(sum(p.impressions) FILTER (WHERE p.position_avg IS NOT NULL), 0)
+FROM performance p
+WHERE p.article_id IS NOT NULL
+  AND p.date >= (CAST(:date_from AS date)::timestamp AT TIME ZONE 'UTC')
+  AND p.date < ((CAST(:date_to AS date) + 1)::timestamp AT TIME ZONE 'UTC')
+GROUP BY p.article_id, (p.date AT TIME ZONE 'UTC')::date, p.source
+""" + _UPSERT_TAIL
+
+_ARTICLE_COARSE_SQL = """
+INSERT INTO performance_rollups
+    (scope, grain, scope_id, period_start, source, impressions, clicks, position_sum, position_weight)
+SELECT 'article', :grain, r.scope_id, date_trunc(:grain, r.period_start::timestamp)::date, r.source,
+       sum(r.impressions), sum(r.clicks), sum(r.position_sum), sum(r.position_weight)
+FROM performance_rollups r
+WHERE r.scope = 'article' AND r.grain = 'day'
+  AND r.period_start >= date_trunc(:grain, CAST(:date_from AS date)::timestamp)::date
+  AND r.period_start < (date_trunc(:grain, CAST(:date_to AS date)::timestamp) + CAST(:step AS interval))::date
+GROUP BY r.scope_id, date_trunc(:grain, r.period_start::timestamp)::date, r.source
+""" + _UPSERT_TAIL
+
+_CLUSTER_SQL = """
+INSERT INTO performance_rollups
+    (scope, grain, scope_id, period_start, source, impressions, clicks, position_sum, position_weight)
+SELECT 'cluster', :grain, a.cluster_id, r.period_start, r.source,
+       sum(r.impressions), sum(r.clicks), sum(r.position_sum), sum(r.position_weight)
+FROM performance_rollups r
+JOIN articles a ON a.id = r.scope_id
+WHERE r.scope = 'article' AND r.grain = :grain AND a.cluster_id IS NOT NULL
+  AND r.period_start >= date_trunc(:grain, CAST(:date_from AS date)::timestamp)::date
+  AND r.period_start < (date_trunc(:grain, CAST(:date_to AS date)::timestamp) + CAST(:step AS interval))::date
+GROUP BY a.cluster_id, r.period_start, r.source
+""" + _UPSERT_TAIL
+
+_STEP = {RollupGrain.DAY: "1 day", RollupGrain.WEEK: "1 week", RollupGrain.MONTH: "1 month"}
+
+
+def refresh_rollups(session: Session, date_from: date, date_to: date) -> None:
+    """Recompute every rollup period overlapping [date_from, date_to] (inclusive, UTC days)."""
+    params: dict[str, Any] = {"date_from": date_from, "date_to": date_to}
+    session.execute(text(_ARTICLE_DAY_SQL), params)
+    for grain in (RollupGrain.WEEK, RollupGrain.MONTH):
+        session.execute(text(_ARTICLE_COARSE_SQL), {**params, "grain": grain.value, "step": _STEP[grain]})
+    for grain in RollupGrain:
+        session.execute(text(_CLUSTER_SQL), {**params, "grain": grain.value, "step": _STEP[grain]})
+
+
+def query_timeseries(
+    session: Session,
+    scope: RollupScope,
+    grain: RollupGrain,
+    date_from: date,
+    date_to: date,
+    scope_id: int | None = None,
+    source: str | None = None,
+) -> list[dict[str, Any]]:
+    """Series from rollups only (index range scan on ix_performance_rollups_key); sources are summed."""
+    where = [
+        "scope = :scope",
+        "grain = :grain",
+        "period_start >= date_trunc(:grain, CAST(:date_from AS date)::timestamp)::date",
+        "period_start <= :date_to",
+    ]
+    params: dict[str, Any] = {
+        "scope": scope.value, "grain": grain.value, "date_from": date_from, "date_to": date_to,
+    }
+    if scope_id is not None:
+        where.append("scope_id = :scope_id")
+        params["scope_id"] = scope_id
+    if source:
+        where.append("source = :source")
+        params["source"] = source
+    sql = f"""
+        SELECT scope_id, period_start, sum(impressions) AS impressions, sum(clicks) AS clicks,
+               round(sum(position_sum) / nullif(sum(position_weight), 0), 2) AS position_avg
+        FROM performance_rollups
+        WHERE {" AND ".join(where)}
+        GROUP BY scope_id, period_start
+        ORDER BY scope_id, period_start
+    """
+    rows = session.execute(text(sql), params).mappings().all()
+    return [
+        {
+            "scope_id": r["scope_id"],
+            "period_start": r["period_start"],
+            "impressions": int(r["impressions"]),
+            "clicks": int(r["clicks"]),
+            "ctr": round(r["clicks"] / r["impressions"], 4) if r["impressions"] else 0.0,
+            "position_avg": float(r["position_avg"]) if r["position_avg"] is not None else None,
+        }
+        for r in rows
+    ]
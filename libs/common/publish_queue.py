@@ -0,0 +1,178 @@
+"""Durable publish queue of publisher-tilda: Postgres-backed, rate-limited, retried, unchanged pages skipped.
+
+Tasks carry the full /publish request. Enqueueing a slug that already has a pending task replaces
+that task's payload (partial unique index on slug where pending), so a bulk republish queued twice
+sends each page once. Workers claim batches with FOR UPDATE SKIP LOCKED (several publisher replicas
+never take the same task) and write outcomes back in one transaction per batch; tasks left in
+processing by a dead worker are reclaimed after publish_stale_seconds.
+
+Each page's last published version is kept in published_pages as publish_hash() of its request. A
+task whose hash matches is marked skipped without a Tilda call. Tilda updates a page by slug, so a
+retried call (after a timeout, say) never creates a second page.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import and_, func, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, aliased
+
+from libs.common.markdown_render import RENDER_VERSION
+from libs.common.models.db_models import PublishedPage, PublishTask, PublishTaskStatus
+
+_CHUNK = 1000
+_PENDING = text("status = 'pending'")
+
+
+def publish_hash(payload: dict[str, Any]) -> str:
+    """Identity of what a /publish request sends to Tilda: rendering is deterministic for a given RENDER_VERSION."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(RENDER_VERSION.encode("utf-8"))
+    h.update(b"\x00")
+    fields = {k: v for k, v in payload.items() if k != "force"}
+    h.update(json.dumps(fields, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    return h.hexdigest()
+
+
+def enqueue(session: Session, payloads: list[dict[str, Any]]) -> list[int]:
+    """Queue publish requests (the last one wins per slug); returns task ids in input order."""
+    latest = {p["slug"]: p for p in payloads}  # ON CONFLICT cannot touch one row twice per statement
+    ids: dict[str, int] = {}
+    items = list(latest.items())
+    for start in range(0, len(items), _CHUNK):
+        chunk = items[start:start + _CHUNK]
+        stmt = pg_insert(PublishTask).values([{"slug": slug, "payload": payload} for slug, payload in chunk])
+        rows = session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[PublishTask.slug],
+                index_where=_PENDING,
+                set_={
+                    "payload": stmt.excluded.payload,
+                    "attempts": 0,
+                    "next_attempt_at": func.now(),
+                    "last_error": None,
+                    "updated_at": func.now(),
+                },
+            ).returning(PublishTask.id, PublishTask.slug)
+        ).all()
+        ids.update({slug: task_id for task_id, slug in rows})
+    return [ids[p["slug"]] for p in payloads]
+
+
+def claim_batch(session: Session, limit: int, stale_seconds: int) -> list[dict[str, Any]]:
+    """Take up to `limit` due tasks (oldest first) into processing: [{id, slug, payload, attempts}]."""
+    stale = datetime.now(timezone.utc) - timedelta(seconds=stale_seconds)
+    due = (
+        select(PublishTask.id)
+        .where(or_(
+            and_(PublishTask.status == PublishTaskStatus.PENDING.value, PublishTask.next_attempt_at <= func.now()),
+            and_(PublishTask.status == PublishTaskStatus.PROCESSING.value, PublishTask.updated_at < stale),
+        ))
+        .order_by(PublishTask.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    rows = session.execute(
+        update(PublishTask)
+        .where(PublishTask.id.in_(due.scalar_subquery()))
+        .values(status=PublishTaskStatus.PROCESSING.value, attempts=PublishTask.attempts + 1, updated_at=func.now())
+        .returning(PublishTask.id, PublishTask.slug, PublishTask.payload, PublishTask.attempts)
+    ).all()
+    return sorted((dict(r._mapping) for r in rows), key=lambda t: t["id"])
+
+
+def last_published(session: Session, slugs: list[str]) -> dict[str, dict[str, Any]]:
+    """slug -> {content_hash, page_id, url, is_draft} of the last published version."""
+    result: dict[str, dict[str, Any]] = {}
+    for start in range(0, len(slugs), _CHUNK):
+        rows = session.execute(
+            select(PublishedPage.slug, PublishedPage.content_hash, PublishedPage.page_id, PublishedPage.url,
+                   PublishedPage.is_draft)
+            .where(PublishedPage.slug.in_(slugs[start:start + _CHUNK]))
+        ).all()
+        result.update({row.slug: dict(row._mapping) for row in rows})
+    return result
+
+
+def record_published(session: Session, pages: list[dict[str, Any]]) -> None:
+    """Upsert [{slug, page_id, url, is_draft, content_hash}] into published_pages."""
+    latest = list({p["slug"]: p for p in pages}.values())
+    for start in range(0, len(latest), _CHUNK):
+        stmt = pg_insert(PublishedPage).values(latest[start:start + _CHUNK])
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=[PublishedPage.slug],
+            set_={
+                "page_id": stmt.excluded.page_id,
+                "url": stmt.excluded.url,
+                "is_draft": stmt.excluded.is_draft,
+                "content_hash": stmt.excluded.content_hash,
+                "published_at": func.now(),
+            },
+        ))
+
+
+def finish_batch(
+    session: Session,
+    done: list[dict[str, Any]],
+    skipped: list[dict[str, Any]],
+    retry: list[dict[str, Any]],
+    failed: list[dict[str, Any]],
+) -> None:
+    """Write a claimed batch's outcomes.
+
+    done: [{id, slug, content_hash, result}]; skipped: [{id, result}]; retry: [{id, slug, error, delay}];
+    failed: [{id, error}].
+    """
+    record_published(session, [{"slug": d["slug"], "content_hash": d["content_hash"], **d["result"]} for d in done])
+    finished = [(d["id"], PublishTaskStatus.DONE.value, d["result"], None) for d in done]
+    finished += [(s["id"], PublishTaskStatus.SKIPPED.value, s["result"], None) for s in skipped]
+    finished += [(f["id"], PublishTaskStatus.FAILED.value, None, f["error"]) for f in failed]
+    if finished:
+        session.execute(
+            update(PublishTask),
+            [{"id": i, "status": status, "result": result, "last_error": error} for i, status, result, error in finished],
+        )
+    for r in retry:
+        # Back to pending unless the slug was re-enqueued meanwhile: that newer task supersedes this one
+        other = aliased(PublishTask)
+        newer = select(other.id).where(other.slug == r["slug"], other.status == PublishTaskStatus.PENDING.value)
+        requeued = session.execute(
+            update(PublishTask)
+            .where(PublishTask.id == r["id"], ~newer.exists())
+            .values(
+                status=PublishTaskStatus.PENDING.value,
+                last_error=r["error"],
+                next_attempt_at=func.now() + timedelta(seconds=r["delay"]),
+            )
+        ).rowcount
+        if not requeued:
+            session.execute(
+                update(PublishTask)
+                .where(PublishTask.id == r["id"])
+                .values(status=PublishTaskStatus.SKIPPED.value, last_error=f"superseded; last error: {r['error']}")
+            )
+
+
+def queue_stats(session: Session) -> dict[str, Any]:
+    counts = dict(session.execute(select(PublishTask.status, func.count()).group_by(PublishTask.status)).all())
+    oldest = session.execute(
+        select(func.min(PublishTask.created_at)).where(PublishTask.status == PublishTaskStatus.PENDING.value)
+    ).scalar_one()
+    return {
+        "by_status": {s.value: counts.get(s.value, 0) for s in PublishTaskStatus},
+        "oldest_pending_at": oldest.isoformat() if oldest else None,
+        "published_pages": session.execute(select(func.count()).select_from(PublishedPage)).scalar_one(),
+    }
+
+
+def get_task(session: Session, task_id: int) -> dict[str, Any] | None:
+    row = session.execute(
+        select(PublishTask.id, PublishTask.slug, PublishTask.status, PublishTask.attempts, PublishTask.next_attempt_at,
+               PublishTask.last_error, PublishTask.result, PublishTask.created_at, PublishTask.updated_at)
+        .where(PublishTask.id == task_id)
+    ).one_or_none()
+    return dict(row._mapping) if row else None
@@ -0,0 +1,169 @@
+"""Quality check shared by /check, /check_batch and archive re-scoring.
+
+The CPU-bound part (text metrics + MinHash signature) runs in a process pool sized to the host, so
+a batch is not serialized on the GIL; the parent only does the indexed uniqueness lookups in one DB
+session and assembles verdicts in input order.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Iterable, Sequence
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from libs.common.clients.antiplagiat import UniquenessResult, get_antiplagiat_client
+from libs.common.config import get_settings
+from libs.common.logging import get_logger
+from libs.common.minhash_index import signature
+from libs.common.models.db_models import Article
+from libs.common.quality_rules import check_rules
+from libs.common.text import block_hash, split_blocks
+from libs.common.text_metrics import analyze_text
+
+logger = get_logger(__name__)
+
+MIN_LENGTH = 500
+MAX_LENGTH = 50_000
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Process pool for CPU-bound checks (spawned workers: no inherited DB connections or threads)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = get_settings().quality_workers or os.cpu_count() or 1
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+def analyze_cpu(item: tuple[str, str | None]) -> dict[str, Any]:
+    """Worker-side part of a check: metrics and MinHash signature (picklable in and out)."""
+    started = time.perf_counter()
+    text, target_keyword = item
+    computed = signature(text)
+    return {
+        "metrics": analyze_text(text, target_keyword),
+        "signature": computed[0] if computed else None,
+        "cpu_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+
+
+def build_verdict(
+    text: str,
+    metrics: dict[str, Any],
+    uniqueness: UniquenessResult,
+    previous_blocks: list[str] | None = None,
+) -> dict[str, Any]:
+    """Response of /check (also stored as articles.quality_scores).
+
+    Stop-phrase / spam rules (quality_rules) are matched here, in one pass over the text; a match of
+    a blocking rule fails the check. block_hashes identify the text's paragraphs/sections; given the
+    hashes stored by the previous check, changed_blocks lists the blocks new or edited since then.
+    """
+    length_ok = MIN_LENGTH <= len(text) <= MAX_LENGTH
+    hashes = [block_hash(b) for b in split_blocks(text)]
+    rules = check_rules(text)
+    verdict = {
+        "pass": uniqueness.pass_ and length_ok and not metrics["keyword_stuffing"] and not rules["blocked_by_rules"],
+        "uniqueness": uniqueness.score,
+        "uniqueness_matches": [m.model_dump() for m in uniqueness.matches],
+        "keyword_stuffing": metrics["keyword_stuffing"],
+        "length_ok": length_ok,
+        **rules,
+        "metrics": metrics,
+        "details": uniqueness.details or "stub",
+        "block_hashes": hashes,
+    }
+    if previous_blocks is not None:
+        known = set(previous_blocks)
+        verdict["changed_blocks"] = [i for i, h in enumerate(hashes) if h not in known]
+    return verdict
+
+
+def check_batch(
+    items: Sequence[tuple[str, str | None]],
+    exclude_ids: Sequence[Iterable[int]] | None = None,
+    session: Session | None = None,
+    previous_blocks: Sequence[list[str] | None] | None = None,
+) -> list[dict[str, Any]]:
+    """Check (text, target_keyword) pairs; results in input order, each with timing_ms."""
+    if not items:
+        return []
+    started = time.perf_counter()
+    chunksize = max(1, len(items) // ((get_settings().quality_workers or os.cpu_count() or 1) * 4))
+    cpu_results = list(get_pool().map(analyze_cpu, items, chunksize=chunksize))
+    cpu_wall_ms = (time.perf_counter() - started) * 1000
+
+    client = get_antiplagiat_client()
+    exclude_ids = exclude_ids or [()] * len(items)
+    previous_blocks = previous_blocks or [None] * len(items)
+
+    def lookup(db: Session | None) -> list[dict[str, Any]]:
+        results = []
+        for (text, _kw), cpu, exclude, previous in zip(items, cpu_results, exclude_ids, previous_blocks):
+            t0 = time.perf_counter()
+            uniqueness = client.check(text, exclude_ids=exclude, signature=cpu["signature"], session=db)
+            verdict = build_verdict(text, cpu["metrics"], uniqueness, previous)
+            verdict["timing_ms"] = {"cpu": cpu["cpu_ms"], "uniqueness": round((time.perf_counter() - t0) * 1000, 3)}
+            results.append(verdict)
+        return results
+
+    if session is not None or not client.uses_db:
+        results = lookup(session)
+    else:
+        from libs.common.database import session_scope
+        with session_scope() as db:
+            results = lookup(db)
+    logger.info(
+        "quality_batch_checked", items=len(items), cpu_wall_ms=round(cpu_wall_ms, 1),
+        total_ms=round((time.perf_counter() - started) * 1000, 1),
+    )
+    return results
+
+
+def rescore_articles(session: Session, batch_size: int = 200, status: str | None = None) -> dict[str, int]:
+    """Re-run the check for every stored article (e.g. after a threshold change) and update quality_scores."""
+    last_id = scored = failed = 0
+    while True:
+        q = (
+            select(Article.id, Article.final_markdown, Article.draft_markdown, Article.target_keyword)
+            .where(Article.id > last_id)
+            .order_by(Article.id)
+            .limit(batch_size)
+        )
+        if status:
+            q = q.where(Article.status == status)
+        rows = session.execute(q).all()
+        if not rows:
+            break
+        verdicts = check_batch(
+            [(r.final_markdown or r.draft_markdown or "", r.target_keyword) for r in rows],
+            exclude_ids=[(r.id,) for r in rows],
+            session=session,
+        )
+        session.execute(
+            update(Article),
+            [{"id": r.id, "quality_scores": v} for r, v in zip(rows, verdicts)],
+        )
+        session.commit()
+        scored += len(rows)
+        failed += sum(1 for v in verdicts if not v["pass"])
+        last_id = rows[-1].id
+    logger.info("articles_rescored", scored=scored, failed=failed)
+    return {"scored": scored, "failed": failed}
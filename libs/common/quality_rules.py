@@ -0,0 +1,308 @@
+"""Stop-phrase / spam / legal-claim rules compiled into one single-pass matcher.
+
+All active rules from quality_rules become one regex: phrase rules are merged into a character trie
+(shared prefixes are tested once, so hundreds of phrases cost about as much as a few); regex rules
+that start with a literal word have that prefix merged into a second trie, with the rest of the
+pattern as a named group at its leaf, so the engine only enters a rule where its prefix matched.
+Regex rules without a literal prefix are tried as plain alternatives at every position (slower:
+prefer patterns that start with a word). The combined pattern only finds the positions where some
+rule matches; there every rule is re-tested on its own (regex rules behind a literal prefix only
+when the prefix is there), so a match of one rule never hides another that starts at the same
+place or inside it. Each rule reports its own leftmost non-overlapping matches; adding rules never
+adds scan passes over the text. The compiled matcher is cached per process and rebuilt only when
+the table's fingerprint (row count, last updated_at) changes.
+"""
+from __future__ import annotations
+
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from libs.common.logging import get_logger
+from libs.common.models.db_models import QualityRule, QualityRuleKind, QualityRuleSeverity
+
+logger = get_logger(__name__)
+
+MAX_MATCHES = 1000
+_PHRASES_GROUP = "phrases"
+_SPACES = re.compile(r"\s+")
+# (?i) etc. apply to the whole expression and must open it: invalid inside the combined pattern
+_GLOBAL_FLAGS = re.compile(r"(?<!\\)\(\?[aiLmsux]+\)")
+
+
+@dataclass(frozen=True, slots=True)
+class RuleRef:
+    id: int
+    category: str
+    severity: str
+
+
+@dataclass
+class RuleMatcher:
+    pattern: re.Pattern | None
+    phrases: dict[str, list[RuleRef]] = field(default_factory=dict)
+    regexes: dict[str, RuleRef] = field(default_factory=dict)
+    # Re-tested at each found position: all phrases (longest first), each regex rule with its literal prefix
+    phrases_pattern: re.Pattern | None = None
+    singles: dict[str, tuple[str, re.Pattern]] = field(default_factory=dict)
+    version: tuple | None = None
+
+    @property
+    def rules(self) -> int:
+        return sum(map(len, self.phrases.values())) + len(self.regexes)
+
+    def scan(self, text: str) -> list[dict[str, Any]]:
+        """Matches in text order: rule, category, severity, [start, end) offsets in the given text."""
+        if self.pattern is None:
+            return []
+        found: list[dict[str, Any]] = []
+        ends: dict[Any, int] = {}  # rule key -> end of its last reported match
+        pos = 0
+        while len(found) < MAX_MATCHES:
+            m = self.pattern.search(text, pos)
+            if m is None:
+                break
+            start = pos = m.start()
+            hits: list[tuple[Any, list[RuleRef], int]] = []
+            pm = self.phrases_pattern.match(text, start) if self.phrases_pattern else None
+            if pm:
+                hits += self._phrase_hits(pm.group(), start)
+            for name, (prefix, single) in self.singles.items():
+                if prefix and text[start:start + len(prefix)].lower() != prefix:
+                    continue
+                sm = single.match(text, start)
+                if sm and sm.end() > start:
+                    hits.append((name, [self.regexes[name]], sm.end()))
+            for key, refs, end in hits:
+                if ends.get(key, 0) > start:
+                    continue  # this rule's previous match covers the position
+                ends[key] = end
+                for ref in refs:
+                    found.append({
+                        "rule_id": ref.id,
+                        "category": ref.category,
+                        "severity": ref.severity,
+                        "start": start,
+                        "end": end,
+                        "match": text[start:end],
+                    })
+            pos = start + 1
+        return found[:MAX_MATCHES]
+
+    def _phrase_hits(self, matched: str, start: int) -> list[tuple[Any, list[RuleRef], int]]:
+        """Every phrase at start: the trie matched the longest, shorter ones are its whole-word prefixes."""
+        hits = []
+        for i in range(1, len(matched) + 1):
+            if matched[i - 1].isspace() or (i < len(matched) and (matched[i].isalnum() or matched[i] == "_")):
+                continue
+            key = phrase_key(matched[:i])
+            if key in self.phrases:
+                hits.append(((_PHRASES_GROUP, key), self.phrases[key], start + i))
+        return hits
+
+
+def phrase_key(phrase: str) -> str:
+    """Normalized phrase: lowercase, ё -> е, single spaces."""
+    return _SPACES.sub(" ", phrase.strip().lower().replace("ё", "е"))
+
+
+def _phrase_char(ch: str) -> str:
+    if ch == " ":
+        return r"\s+"
+    if ch == "е":
+        return "[её]"
+    return re.escape(ch)
+
+
+def _trie_insert(trie: dict, key: str, leaf: str) -> None:
+    node = trie
+    for ch in key:
+        node = node.setdefault(ch, {})
+    node.setdefault("", []).append(leaf)
+
+
+def _trie_pattern(node: dict, char_pattern: Callable[[str], str]) -> str:
+    """Regex for a trie node: children first (longest match wins), then leaf patterns; "" leaf = may end here."""
+    leaves = node.get("", [])
+    branches = [char_pattern(ch) + _trie_pattern(child, char_pattern) for ch, child in sorted(node.items()) if ch]
+    branches += [leaf for leaf in leaves if leaf]
+    if not branches:
+        return ""
+    optional = "" in leaves
+    if len(branches) == 1 and not optional:
+        return branches[0]
+    body = "(?:" + "|".join(branches) + ")"
+    return body + "?" if optional else body
+
+
+def phrases_pattern(phrases: Iterable[str]) -> str:
+    trie: dict = {}
+    for phrase in phrases:
+        _trie_insert(trie, phrase, "")
+    # Whole words only: no letter/digit right before or after the phrase
+    return rf"(?<!\w)(?:{_trie_pattern(trie, _phrase_char)})(?!\w)"
+
+
+def _has_top_level_alternation(pattern: str) -> bool:
+    depth, i, in_class = 0, 0, False
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if in_class:
+            in_class = ch != "]"
+        elif ch == "[":
+            in_class = True
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "|" and depth == 0:
+            return True
+        i += 1
+    return False
+
+
+def split_literal_prefix(pattern: str) -> tuple[bool, str, str]:
+    """(starts at a word boundary, literal prefix, rest); empty prefix when the pattern has none."""
+    if _has_top_level_alternation(pattern):
+        return False, "", pattern
+    word_start = pattern.startswith(r"\b")
+    start = end = 2 if word_start else 0
+    while end < len(pattern) and (pattern[end].isalnum() or pattern[end] == " "):
+        end += 1
+    if end < len(pattern) and pattern[end] in "*+?{":  # the last literal is quantified
+        end -= 1
+    if end - start < 2 or not pattern[start].isalnum():
+        return False, "", pattern
+    return word_start, pattern[start:end].lower(), pattern[end:]
+
+
+def validate_rule(kind: str, pattern: str) -> str:
+    """Normalized pattern for storage; ValueError when the rule cannot be compiled into the matcher."""
+    if kind == QualityRuleKind.PHRASE.value:
+        key = phrase_key(pattern)
+        if not key:
+            raise ValueError("Empty phrase")
+        return key
+    if kind != QualityRuleKind.REGEX.value:
+        raise ValueError(f"Unknown rule kind: {kind}")
+    if "(?P" in pattern or re.search(r"\\[1-9]", pattern):
+        raise ValueError("Named groups and backreferences are not allowed in rules")
+    if _GLOBAL_FLAGS.search(pattern):
+        raise ValueError("Inline global flags such as (?i) are not allowed; use scoped flags: (?s:...)")
+    try:
+        compiled = re.compile(pattern, re.IGNORECASE)
+    except re.error as e:
+        raise ValueError(f"Invalid regex: {e}") from e
+    if compiled.fullmatch(""):
+        raise ValueError("Pattern matches the empty string")
+    return pattern
+
+
+def compile_rules(rules: Iterable[Any], version: tuple | None = None) -> RuleMatcher:
+    """Matcher for rows with id, kind, pattern, category, severity (invalid rows are skipped)."""
+    matcher = RuleMatcher(pattern=None, version=version)
+    alternatives = []
+    prefix_tries: dict[bool, dict] = {True: {}, False: {}}
+    for rule in rules:
+        try:
+            pattern = validate_rule(rule.kind, rule.pattern)
+        except ValueError as e:
+            logger.warning("quality_rule_skipped", rule_id=rule.id, error=str(e))
+            continue
+        ref = RuleRef(rule.id, rule.category, rule.severity)
+        if rule.kind == QualityRuleKind.PHRASE.value:
+            matcher.phrases.setdefault(pattern, []).append(ref)
+            continue
+        name = f"r{rule.id}"
+        word_start, prefix, rest = split_literal_prefix(pattern)
+        # The rule as it will appear in the combined pattern must compile on its own:
+        # one bad row would otherwise break the whole matcher
+        alternative = f"{re.escape(prefix)}(?P<{name}>{rest})" if prefix else f"(?P<{name}>{pattern})"
+        try:
+            re.compile(alternative, re.IGNORECASE)
+        except re.error as e:
+            logger.warning("quality_rule_skipped", rule_id=rule.id, error=str(e))
+            continue
+        matcher.regexes[name] = ref
+        matcher.singles[name] = (prefix, re.compile(pattern, re.IGNORECASE))
+        if prefix:
+            # The group covers only the rest; the match span still starts at the prefix
+            _trie_insert(prefix_tries[word_start], prefix, f"(?P<{name}>{rest})")
+        else:
+            alternatives.append(f"(?P<{name}>{pattern})")
+    for word_start in (False, True):
+        if prefix_tries[word_start]:
+            trie = _trie_pattern(prefix_tries[word_start], re.escape)
+            alternatives.insert(0, rf"(?<!\w){trie}" if word_start else f"(?:{trie})")
+    if matcher.phrases:
+        matcher.phrases_pattern = re.compile(phrases_pattern(matcher.phrases), re.IGNORECASE)
+        alternatives.insert(0, f"(?P<{_PHRASES_GROUP}>{matcher.phrases_pattern.pattern})")
+    if alternatives:
+        matcher.pattern = re.compile("|".join(alternatives), re.IGNORECASE)
+    return matcher
+
+
+def rules_version(session: Session) -> tuple:
+    """Changes on any insert, update or delete of quality_rules."""
+    count, last = session.execute(select(func.count(), func.max(QualityRule.updated_at))).one()
+    return (count, last)
+
+
+def load_matcher(session: Session) -> RuleMatcher:
+    version = rules_version(session)
+    rows = session.execute(
+        select(QualityRule.id, QualityRule.kind, QualityRule.pattern, QualityRule.category, QualityRule.severity)
+        .where(QualityRule.is_active.is_(True))
+        .order_by(QualityRule.id)
+    ).all()
+    return compile_rules(rows, version=version)
+
+
+_matcher: RuleMatcher | None = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def get_matcher() -> RuleMatcher:
+    """Process-wide matcher; the table fingerprint is re-read at most every quality_rules_refresh_seconds."""
+    global _matcher, _checked_at
+    from libs.common.config import get_settings
+
+    with _lock:
+        now = time.monotonic()
+        if _matcher is not None and now - _checked_at < get_settings().quality_rules_refresh_seconds:
+            return _matcher
+        try:
+            from libs.common.database import session_scope
+
+            with session_scope() as session:
+                if _matcher is None or rules_version(session) != _matcher.version:
+                    started = time.perf_counter()
+                    _matcher = load_matcher(session)
+                    logger.info(
+                        "quality_rules_compiled", rules=_matcher.rules,
+                        ms=round((time.perf_counter() - started) * 1000, 1),
+                    )
+        except Exception as e:  # DB unavailable: keep the last compiled rules (or none)
+            logger.warning("quality_rules_refresh_failed", error=str(e))
+            if _matcher is None:
+                _matcher = RuleMatcher(pattern=None)
+        _checked_at = now
+        return _matcher
+
+
+def check_rules(text: str) -> dict[str, Any]:
+    """Rule matches in text and whether any blocking rule fired."""
+    matches = get_matcher().scan(text)
+    return {
+        "rule_matches": matches,
+        "blocked_by_rules": any(m["severity"] == QualityRuleSeverity.BLOCK.value for m in matches),
+    }
@@ -0,0 +1,86 @@
+"""Client-side rate limiting for external APIs: token bucket (QPS + burst), daily call quota, backoff.
+
+One bucket (asyncio) is shared by all concurrent calls of a process, so N workers together never
+exceed the provider's QPS. A provider throttle response pauses the whole bucket (not just the
+caller), since every in-flight worker would hit the same limit.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+
+class TokenBucket:
+    """`rate` tokens per second, up to `burst` saved; acquire() waits for a token in FIFO order."""
+
+    def __init__(self, rate: float, burst: int | None = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = float(burst or max(1, int(rate)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> None:
+        async with self._lock:  # waiters queue on the lock, so tokens are handed out in arrival order
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """No tokens for `seconds` (e.g. the provider's Retry-After); saved tokens are dropped."""
+        now = time.monotonic()
+        self.paused_until = max(self.paused_until, now + seconds)
+        self.tokens = 0.0
+        self.updated = max(self.updated, self.paused_until)
+
+
+class DailyQuota:
+    """Calls per UTC day; limit 0 = unlimited. In-process: give each process its share of the provider quota."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.day = self._today()
+        self.used = 0
+        self._lock = threading.Lock()  # also consumed from sync endpoints (thread pool)
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(timezone.utc).date().isoformat()
+
+    def try_consume(self) -> bool:
+        today = self._today()
+        with self._lock:
+            if today != self.day:
+                self.day, self.used = today, 0
+            if self.limit and self.used >= self.limit:
+                return False
+            self.used += 1
+            return True
+
+    @property
+    def remaining(self) -> int | None:
+        if not self.limit:
+            return None
+        return max(0, self.limit - self.used) if self.day == self._today() else self.limit
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """Exponential backoff with full jitter for retry `attempt` (1-based)."""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
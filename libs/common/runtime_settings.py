@@ -45,3 +45,15 @@ def get_articles_per_day() -> int:
             pass
     from libs.common.config import get_settings
     return get_settings().articles_per_day
+
+
+def get_job_retention_days() -> int:
+    """Age (days) after which finished jobs are archived. DB overrides env."""
+    v = get_setting_from_db("job_retention_days")
+    if v is not None:
+        try:
+            return int(v)
+        except ValueError:
+            pass
+    from libs.common.config import get_settings
+    return get_settings().job_retention_days
@@ -4,15 +4,39 @@ from libs.common.schemas.articles import (
     ArticleResponse,
     ArticleApproveRequest,
     ArticleListResponse,
+    ArticleRepublishRequest,
+    ArticleRepublishResponse,
+    ArticleSearchResponse,
+    ArticleUpdate,
 )
 from libs.common.schemas.clusters import (
+    ClusterAutoRequest,
     ClusterCreate,
+    ClusterImportReport,
     ClusterResponse,
     ClusterUpdate,
     KeywordCreate,
     KeywordResponse,
 )
 from libs.common.schemas.jobs import JobCreate, JobResponse, JobRunDailyRequest
+from libs.common.schemas.performance import (
+    PerformanceIngestReport,
+    PerformancePoint,
+    PerformanceSeriesResponse,
+)
+from libs.common.schemas.quality_rules import (
+    QualityRuleBulkReport,
+    QualityRuleCreate,
+    QualityRuleResponse,
+    QualityRuleUpdate,
+)
+from libs.common.schemas.serp import (
+    SerpChangeResponse,
+    SerpSnapshotCreate,
+    SerpSnapshotRecorded,
+    SerpSnapshotResponse,
+    SerpVolatilityResponse,
+)
 from libs.common.schemas.settings import SettingItem, SettingUpdate
 
 __all__ = [
@@ -20,7 +44,13 @@ __all__ = [
     "ArticleResponse",
     "ArticleApproveRequest",
     "ArticleListResponse",
+    "ArticleRepublishRequest",
+    "ArticleRepublishResponse",
+    "ArticleSearchResponse",
+    "ArticleUpdate",
+    "ClusterAutoRequest",
     "ClusterCreate",
+    "ClusterImportReport",
     "ClusterResponse",
     "ClusterUpdate",
     "KeywordCreate",
@@ -28,6 +58,18 @@ __all__ = [
     "JobCreate",
     "JobResponse",
     "JobRunDailyRequest",
+    "PerformanceIngestReport",
+    "PerformancePoint",
+    "PerformanceSeriesResponse",
+    "QualityRuleBulkReport",
+    "QualityRuleCreate",
+    "QualityRuleResponse",
+    "QualityRuleUpdate",
+    "SerpChangeResponse",
+    "SerpSnapshotCreate",
+    "SerpSnapshotRecorded",
+    "SerpSnapshotResponse",
+    "SerpVolatilityResponse",
     "SettingItem",
     "SettingUpdate",
 ]
@@ -21,6 +21,16 @@ class ArticleCreate(ArticleBase):
     target_keyword: Optional[str] = None
 
 
+class ArticleUpdate(BaseModel):
+    title: Optional[str] = None
+    target_keyword: Optional[str] = None
+    meta_title: Optional[str] = None
+    meta_description: Optional[str] = None
+    draft_markdown: Optional[str] = None
+    final_markdown: Optional[str] = None
+    recheck: bool = Field(default=True, description="Re-run the quality gate when the text changed")
+
+
 class ArticleResponse(ArticleBase):
     id: int
     cluster_id: Optional[int] = None
@@ -45,5 +55,32 @@ class ArticleListResponse(BaseModel):
     total: int
 
 
+class ArticleSearchHit(BaseModel):
+    id: int
+    title: Optional[str] = None
+    slug: Optional[str] = None
+    status: str
+    target_keyword: Optional[str] = None
+    tilda_url: Optional[str] = None
+    updated_at: datetime
+    rank: float
+    snippet: str = Field(default="", description="HTML: escaped body fragments with matches wrapped in <mark>")
+
+
+class ArticleSearchResponse(BaseModel):
+    items: list[ArticleSearchHit]
+    next_cursor: Optional[str] = None
+
+
 class ArticleApproveRequest(BaseModel):
     publish: bool = Field(default=True, description="If true, move to published; else just approve")
+
+
+class ArticleRepublishRequest(BaseModel):
+    cluster_id: Optional[int] = None
+    force: bool = Field(default=False, description="Send even pages unchanged since their last publish")
+
+
+class ArticleRepublishResponse(BaseModel):
+    articles: int
+    queued: int
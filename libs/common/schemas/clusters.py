@@ -48,3 +48,27 @@ class ClusterResponse(ClusterBase):
     updated_at: datetime
     keywords: list[KeywordResponse] = Field(default_factory=list)
     model_config = {"from_attributes": True}
+
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+
+class ClusterImportReport(BaseModel):
+    clusters_inserted: int = 0
+    clusters_updated: int = 0
+    keywords_inserted: int = 0
+    keywords_updated: int = 0
+    rejected: int = 0
+    errors: list[ImportRowError] = Field(default_factory=list, description="First rejected rows (capped)")
+
+
+class ClusterAutoRequest(BaseModel):
+    """Raw keywords to cluster by SERP overlap (runs as a job; the report is in job.result)."""
+    keywords: list[KeywordCreate] = Field(..., min_length=1, max_length=200_000)
+    region: str = Field(default="moscow", description="moscow | rf")
+    top_n: Optional[int] = Field(default=None, ge=1, le=100, description="Default: cluster_top_n setting")
+    min_overlap: Optional[int] = Field(default=None, ge=1, description="Default: cluster_min_overlap setting")
+    fetch_missing: bool = Field(default=True, description="Fetch SERPs not stored yet via serp-intel /analyze_batch")
+    apply: bool = Field(default=False, description="Write keywords and new (inactive) clusters; else proposals only")
@@ -28,6 +28,7 @@ class JobResponse(BaseModel):
     rq_job_id: Optional[str] = None
     created_at: datetime
     updated_at: datetime
+    archived_at: Optional[datetime] = None  # set when served from jobs_archive
 
     model_config = {"from_attributes": True}
 
@@ -35,3 +36,40 @@ class JobResponse(BaseModel):
 class JobListResponse(BaseModel):
     items: list[JobResponse]
     total: int
+
+
+class JobArchiveResult(BaseModel):
+    archived: int
+    batches: int
+    cutoff: datetime
+
+
+class JobStatsItem(BaseModel):
+    job_type: str
+    status: str
+    live: int
+    archived: int
+    avg_duration_seconds: Optional[float] = None
+    last_finished_at: Optional[datetime] = None
+
+
+class JobStatsResponse(BaseModel):
+    items: list[JobStatsItem]
+    live_total: int
+    archived_total: int
+
+
+class DraftPrefetchResponse(BaseModel):
+    rq_job_id: Optional[str] = None
+    queued: bool
+
+
+class BufferedDraftResponse(BaseModel):
+    id: int
+    cluster_id: int
+    target_keyword: str
+    region: str
+    created_at: datetime
+    expires_at: datetime
+
+    model_config = {"from_attributes": True}
@@ -0,0 +1,36 @@
+"""Search performance (GSC / Yandex) API schemas."""
+from __future__ import annotations
+
+from datetime import date
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class PerformanceIngestReport(BaseModel):
+    source: str
+    rows_read: int = 0
+    rows_rejected: int = 0
+    rows_unmatched: int = Field(default=0, description="Valid rows whose URL matches no article")
+    upserted_inserted: int = 0
+    upserted_updated: int = 0
+    errors: list[str] = Field(default_factory=list, description="First rejected rows (capped)")
+    unmatched_urls: list[str] = Field(default_factory=list, description="Sample of unmatched URLs")
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    seconds: float = 0.0
+
+
+class PerformancePoint(BaseModel):
+    scope_id: int
+    period_start: date
+    impressions: int
+    clicks: int
+    ctr: float
+    position_avg: Optional[float] = None
+
+
+class PerformanceSeriesResponse(BaseModel):
+    scope: str
+    granularity: str
+    items: list[PerformancePoint]
@@ -0,0 +1,58 @@
+"""Quality rule API schemas."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+RuleKind = Literal["phrase", "regex"]
+RuleSeverity = Literal["block", "warn"]
+
+
+class QualityRuleCreate(BaseModel):
+    kind: RuleKind = "phrase"
+    pattern: str = Field(..., min_length=1, description="Phrase (case/ё-insensitive, whole words) or regex")
+    category: str = Field(default="spam", max_length=64, description="E.g. spam | banned | legal")
+    severity: RuleSeverity = "block"
+    is_active: bool = True
+    description: Optional[str] = None
+
+
+class QualityRuleUpdate(BaseModel):
+    pattern: Optional[str] = None
+    category: Optional[str] = None
+    severity: Optional[RuleSeverity] = None
+    is_active: Optional[bool] = None
+    description: Optional[str] = None
+
+
+class QualityRuleResponse(BaseModel):
+    id: int
+    kind: str
+    pattern: str
+    category: str
+    severity: str
+    is_active: bool
+    description: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class QualityRuleBulkReport(BaseModel):
+    created: int
+    skipped: int = Field(description="Already present (same kind and pattern)")
+    errors: list[dict[str, Any]] = Field(default_factory=list)
+
+
+class QualityRuleTestRequest(BaseModel):
+    text: str
+
+
+class QualityRuleTestResponse(BaseModel):
+    rule_matches: list[dict[str, Any]]
+    blocked_by_rules: bool
+    rules: int
+    ms: float
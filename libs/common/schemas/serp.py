@@ -0,0 +1,58 @@
+"""SERP snapshot history API schemas."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Optional
+
+from pydantic import BaseModel, Field
+
+
+class SerpItem(BaseModel):
+    url: str
+    title: Optional[str] = None
+    position: Optional[int] = None
+    structure_hint: Optional[str] = None
+
+
+class SerpSnapshotCreate(BaseModel):
+    query: str = Field(..., min_length=1, max_length=512)
+    region: str = Field(default="moscow", max_length=64)
+    items: list[SerpItem] = Field(default_factory=list)
+    intent_summary: str = ""
+    suggested_structure: dict[str, Any] = Field(default_factory=dict)
+    fetched_at: Optional[datetime] = None
+
+
+class SerpSnapshotRecorded(BaseModel):
+    snapshot_id: int
+    changed: bool = Field(description="False: same state as the last fetch, only last_seen_at/fetches updated")
+    changes: int
+
+
+class SerpSnapshotResponse(BaseModel):
+    snapshot_id: int
+    fetched_at: datetime
+    last_seen_at: datetime
+    fetches: int
+    changes: int
+    keyframe: bool
+    items: list[SerpItem]
+    intent_summary: str
+    suggested_structure: dict[str, Any]
+
+
+class SerpChangeResponse(BaseModel):
+    snapshot_id: int
+    query: str
+    region: str
+    fetched_at: datetime
+    changes: int
+    delta: dict[str, Any] = Field(description="added, removed, moved {url: position}, changed {url: fields}, hints")
+
+
+class SerpVolatilityResponse(BaseModel):
+    query: str
+    region: str
+    changes: int = Field(description="Sum of changes since the date")
+    snapshots: int = Field(description="Changed fetches since the date")
+    last_change_at: datetime
@@ -0,0 +1,344 @@
+"""Synthetic large-scale dataset for load testing: clusters, keywords, articles, performance, link tasks.
+
+Everything is generated from random.Random(seed) relative to a fixed anchor date, so the same
+arguments always produce the same rows. Data goes in through COPY in batches. Synthetic rows are
+recognizable by the "syn-" slug/name prefix and can be removed with --reset.
+
+    python -m libs.common.seed_synthetic --articles 200000 --performance-rows 3000000 --seed 42
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import random
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from libs.common.database import session_scope
+from libs.common.logging import get_logger
+from libs.common.models.db_models import ArticleStatus
+
+logger = get_logger(__name__)
+
+PREFIX = "syn-"
+COPY_BATCH_ROWS = 50_000
+SOURCES = ("gsc", "yandex")
+
+_PROFESSIONS = [
+    "бухгалтер", "главный бухгалтер", "рекрутер", "HR менеджер", "HR бизнес-партнёр", "юрист",
+    "корпоративный юрист", "маркетолог", "SMM специалист", "менеджер по продажам", "офис менеджер",
+    "ассистент руководителя", "финансовый директор", "аналитик", "логист", "закупщик", "кадровик",
+    "специалист по охране труда", "экономист", "секретарь",
+]
+_CITIES = [
+    "Москва", "Санкт-Петербург", "Новосибирск", "Екатеринбург", "Казань", "Нижний Новгород",
+    "Самара", "Ростов-на-Дону", "Краснодар", "Воронеж", "Пермь", "Уфа", "удалённо",
+]
+_ANGLES = [
+    "как найти и нанять", "сколько стоит подбор", "чек-лист собеседования", "ошибки при найме",
+    "требования и обязанности", "зарплата и рынок", "как удержать", "тестовое задание",
+    "адаптация в первые 90 дней", "аутсорс или штат",
+]
+_SECTIONS = [
+    "Кого искать", "Где искать кандидатов", "Как проводить собеседование", "Сроки и стоимость",
+    "Типичные ошибки", "Как оценить результат", "Что говорит рынок", "Итоги",
+]
+_WORDS = (
+    "компания кандидат вакансия опыт собеседование подбор найм задача команда руководитель "
+    "рынок зарплата навыки требования резюме проверка рекомендации сроки бюджет результат "
+    "процесс специалист отдел бизнес клиент договор отчётность оценка адаптация мотивация"
+).split()
+_VERBS = "ищет проверяет оценивает нанимает обсуждает планирует снижает ускоряет требует получает".split()
+_ADJECTIVES = "опытный надёжный сильный быстрый понятный прозрачный точный средний крупный малый".split()
+
+
+@dataclass
+class SyntheticVolumes:
+    clusters: int = 2_000
+    keywords_per_cluster: int = 10
+    articles: int = 200_000
+    performance_rows: int = 2_000_000
+    history_days: int = 365
+    link_sites: int = 50
+    link_tasks: int = 50_000
+    paragraphs: int = 6
+
+    def scaled(self, factor: float) -> SyntheticVolumes:
+        return SyntheticVolumes(
+            clusters=max(1, int(self.clusters * factor)),
+            keywords_per_cluster=self.keywords_per_cluster,
+            articles=max(1, int(self.articles * factor)),
+            performance_rows=int(self.performance_rows * factor),
+            history_days=self.history_days,
+            link_sites=max(1, int(self.link_sites * factor)),
+            link_tasks=int(self.link_tasks * factor),
+            paragraphs=self.paragraphs,
+        )
+
+
+def _copy(cursor, table: str, columns: tuple[str, ...], rows: Iterable[tuple], batch_rows: int = COPY_BATCH_ROWS) -> int:  # type: ignore[no-untyped-def]
+    """COPY rows (None -> NULL, dict -> JSON) in CSV batches; returns the row count."""
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    pending = total = 0
+    for row in rows:
+        writer.writerow(
+            "\\N" if v is None else json.dumps(v, ensure_ascii=False) if isinstance(v, dict) else v
+            for v in row
+        )
+        pending += 1
+        if pending >= batch_rows:
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+            total += pending
+            buffer, pending = io.StringIO(), 0
+            writer = csv.writer(buffer)
+    if pending:
+        buffer.seek(0)
+        cursor.copy_expert(sql, buffer)
+        total += pending
+    return total
+
+
+def _next_id(cursor, table: str) -> int:  # type: ignore[no-untyped-def]
+    cursor.execute(f"SELECT coalesce(max(id), 0) + 1 FROM {table}")
+    return cursor.fetchone()[0]
+
+
+def _sync_sequence(cursor, table: str) -> None:  # type: ignore[no-untyped-def]
+    cursor.execute(
+        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), coalesce(max(id), 0) + 1, false) FROM {table}"
+    )
+
+
+def _sentence(rng: random.Random, topic: str) -> str:
+    words = [rng.choice(_ADJECTIVES), rng.choice(_WORDS), rng.choice(_VERBS), topic, rng.choice(_WORDS)]
+    words += rng.sample(_WORDS, rng.randint(2, 6))
+    text = " ".join(words)
+    return text[0].upper() + text[1:] + "."
+
+
+def _markdown(rng: random.Random, title: str, topic: str, paragraphs: int) -> str:
+    parts = [f"# {title}", " ".join(_sentence(rng, topic) for _ in range(3))]
+    for section in rng.sample(_SECTIONS, min(len(_SECTIONS), max(1, paragraphs // 2))):
+        parts.append(f"## {section}")
+        parts.append(" ".join(_sentence(rng, topic) for _ in range(rng.randint(3, 6))))
+        if rng.random() < 0.4:
+            parts.append("\n".join(f"- {_sentence(rng, topic)}" for _ in range(rng.randint(3, 5))))
+    parts.append("## Частые вопросы")
+    parts.append(f"**Сколько ищут: {topic}?** {_sentence(rng, topic)}")
+    return "\n\n".join(parts)
+
+
+def _clusters(rng: random.Random, first_id: int, n: int) -> Iterator[tuple]:
+    for i in range(n):
+        profession, city = rng.choice(_PROFESSIONS), rng.choice(_CITIES)
+        region = "moscow" if city == "Москва" else "rf"
+        yield (
+            first_id + i, f"{PREFIX}{profession} {city} {i}", region, f"{PREFIX}cluster-{i}",
+            rng.random() < 0.9, rng.randint(0, 10),
+        )
+
+
+def _keywords(rng: random.Random, cluster_ids: range, per_cluster: int) -> Iterator[tuple]:
+    for cluster_id in cluster_ids:
+        profession, city = rng.choice(_PROFESSIONS), rng.choice(_CITIES)
+        seen: set[str] = set()
+        for j in range(per_cluster):
+            keyword = f"{rng.choice(_ANGLES)} {profession} {city.lower()}"
+            if keyword in seen:
+                keyword = f"{keyword} {j}"
+            seen.add(keyword)
+            yield (cluster_id, keyword, int(rng.paretovariate(1.2) * 50))
+
+
+_STATUS_WEIGHTS = [
+    (ArticleStatus.PUBLISHED.value, 0.7),
+    (ArticleStatus.DRAFT.value, 0.15),
+    (ArticleStatus.PENDING_APPROVAL.value, 0.1),
+    (ArticleStatus.REJECTED.value, 0.05),
+]
+
+
+def _articles(
+    rng: random.Random, first_id: int, n: int, cluster_ids: range, anchor: date, volumes: SyntheticVolumes,
+    published: dict[int, date],
+) -> Iterator[tuple]:
+    statuses, weights = zip(*_STATUS_WEIGHTS)
+    for i in range(n):
+        article_id = first_id + i
+        profession, city, angle = rng.choice(_PROFESSIONS), rng.choice(_CITIES), rng.choice(_ANGLES)
+        title = f"{profession[0].upper()}{profession[1:]} ({city}): {angle}"
+        slug = f"{PREFIX}article-{i}"
+        status = rng.choices(statuses, weights)[0]
+        created = anchor - timedelta(days=rng.randint(0, volumes.history_days - 1))
+        created_at = datetime(created.year, created.month, created.day, rng.randint(6, 22), tzinfo=timezone.utc)
+        url = f"https://synthetic.example/{slug}" if status == ArticleStatus.PUBLISHED.value else None
+        if url:
+            published[article_id] = created
+        yield (
+            article_id, rng.choice(cluster_ids), title, slug, status, f"{angle} {profession} {city.lower()}",
+            _markdown(rng, title, profession, volumes.paragraphs), title[:256], f"{title}. {angle.capitalize()}."[:512],
+            f"syn{article_id}" if url else None, url,
+            {"pass": True, "uniqueness": round(rng.uniform(0.7, 1.0), 3)}, created_at, created_at,
+        )
+
+
+def _performance(rng: random.Random, published: dict[int, date], anchor: date, total: int) -> Iterator[tuple]:
+    """Daily rows per source from publication to anchor, spread over published articles until `total`."""
+    if not published or total <= 0:
+        return
+    ids = sorted(published)
+    per_article = max(1, total // (len(ids) * len(SOURCES)))
+    emitted = 0
+    for article_id in ids:
+        start = max(published[article_id], anchor - timedelta(days=per_article - 1))
+        base = rng.paretovariate(1.5) * 20
+        day = start
+        while day <= anchor:
+            ts = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+            for source in SOURCES:
+                impressions = int(base * rng.uniform(0.5, 1.5))
+                clicks = int(impressions * rng.uniform(0.0, 0.08))
+                yield (article_id, ts, source, impressions, clicks, round(rng.uniform(1, 60), 2))
+                emitted += 1
+                if emitted >= total:
+                    return
+            day += timedelta(days=1)
+
+
+def _purge(cursor) -> None:  # type: ignore[no-untyped-def]
+    synthetic = f"SELECT id FROM articles WHERE slug LIKE '{PREFIX}%'"
+    cursor.execute(f"DELETE FROM link_tasks WHERE article_id IN ({synthetic})")
+    cursor.execute(f"DELETE FROM link_sites WHERE name LIKE '{PREFIX}%'")
+    cursor.execute(f"DELETE FROM performance WHERE article_id IN ({synthetic})")
+    cursor.execute(f"DELETE FROM performance_rollups WHERE scope = 'article' AND scope_id IN ({synthetic})")
+    cursor.execute(
+        f"DELETE FROM performance_rollups WHERE scope = 'cluster' "
+        f"AND scope_id IN (SELECT id FROM clusters WHERE slug LIKE '{PREFIX}%')"
+    )
+    cursor.execute(f"DELETE FROM articles WHERE slug LIKE '{PREFIX}%'")
+    cursor.execute(f"DELETE FROM clusters WHERE slug LIKE '{PREFIX}%'")  # keywords cascade
+
+
+def run_synthetic_seed(
+    volumes: SyntheticVolumes | None = None,
+    seed: int = 42,
+    anchor: date = date(2026, 1, 1),
+    reset: bool = False,
+) -> dict[str, Any]:
+    """Generate the dataset in one transaction; refuses to run twice unless reset=True."""
+    from libs.common.performance_partitions import ensure_partitions
+    from libs.common.performance_rollups import refresh_rollups
+
+    volumes = volumes or SyntheticVolumes()
+    rng = random.Random(seed)
+    counts: dict[str, Any] = {"seed": seed, "anchor": anchor.isoformat()}
+    started = time.perf_counter()
+    with session_scope() as session:
+        cursor = session.connection().connection.cursor()
+        try:
+            cursor.execute(f"SELECT count(*) FROM clusters WHERE slug LIKE '{PREFIX}%'")
+            if cursor.fetchone()[0]:
+                if not reset:
+                    raise RuntimeError("synthetic data already present; pass reset=True (--reset) to regenerate")
+                _purge(cursor)
+
+            first_cluster = _next_id(cursor, "clusters")
+            counts["clusters"] = _copy(
+                cursor, "clusters", ("id", "name", "region", "slug", "is_active", "priority"),
+                _clusters(rng, first_cluster, volumes.clusters),
+            )
+            cluster_ids = range(first_cluster, first_cluster + volumes.clusters)
+            counts["keywords"] = _copy(
+                cursor, "keywords", ("cluster_id", "keyword", "volume"),
+                _keywords(rng, cluster_ids, volumes.keywords_per_cluster),
+            )
+
+            published: dict[int, date] = {}
+            first_article = _next_id(cursor, "articles")
+            counts["articles"] = _copy(
+                cursor, "articles",
+                ("id", "cluster_id", "title", "slug", "status", "target_keyword", "final_markdown", "meta_title",
+                 "meta_description", "tilda_page_id", "tilda_url", "quality_scores", "created_at", "updated_at"),
+                _articles(rng, first_article, volumes.articles, cluster_ids, anchor, volumes, published),
+                batch_rows=5_000,
+            )
+            for table in ("clusters", "articles"):
+                _sync_sequence(cursor, table)
+
+            if published:
+                ensure_partitions(session, min(published.values()), anchor)
+            counts["performance"] = _copy(
+                cursor, "performance", ("article_id", "date", "source", "impressions", "clicks", "position_avg"),
+                _performance(rng, published, anchor, volumes.performance_rows),
+            )
+
+            first_site = _next_id(cursor, "link_sites")
+            counts["link_sites"] = _copy(
+                cursor, "link_sites", ("id", "name", "url", "is_active"),
+                ((first_site + i, f"{PREFIX}site-{i}", f"https://site{i}.synthetic.example", True)
+                 for i in range(volumes.link_sites)),
+            )
+            _sync_sequence(cursor, "link_sites")
+            targets = sorted(published)
+            counts["link_tasks"] = _copy(
+                cursor, "link_tasks", ("site_id", "article_id", "target_url", "status"),
+                (
+                    (first_site + rng.randrange(volumes.link_sites), article_id,
+                     f"https://synthetic.example/{PREFIX}article-{article_id - first_article}",
+                     rng.choice(("pending", "pending", "in_progress", "done", "failed")))
+                    for article_id in (rng.choice(targets) for _ in range(volumes.link_tasks if targets else 0))
+                ),
+            )
+            for table in ("clusters", "keywords", "articles", "performance", "link_tasks"):
+                cursor.execute(f"ANALYZE {table}")
+        finally:
+            cursor.close()
+        if published:
+            refresh_rollups(session, anchor - timedelta(days=volumes.history_days), anchor)
+    counts["seconds"] = round(time.perf_counter() - started, 1)
+    logger.info("synthetic_seed_done", **counts)
+    return counts
+
+
+def main(argv: list[str] | None = None) -> None:
+    defaults = SyntheticVolumes()
+    parser = argparse.ArgumentParser(description="Generate a reproducible synthetic dataset for load testing")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--anchor", type=date.fromisoformat, default=date(2026, 1, 1), help="Last day of history")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply all volumes")
+    parser.add_argument("--clusters", type=int, default=defaults.clusters)
+    parser.add_argument("--keywords-per-cluster", type=int, default=defaults.keywords_per_cluster)
+    parser.add_argument("--articles", type=int, default=defaults.articles)
+    parser.add_argument("--performance-rows", type=int, default=defaults.performance_rows)
+    parser.add_argument("--history-days", type=int, default=defaults.history_days)
+    parser.add_argument("--link-sites", type=int, default=defaults.link_sites)
+    parser.add_argument("--link-tasks", type=int, default=defaults.link_tasks)
+    parser.add_argument("--paragraphs", type=int, default=defaults.paragraphs, help="Body size per article")
+    parser.add_argument("--reset", action="store_true", help="Delete previous synthetic data first")
+    args = parser.parse_args(argv)
+    volumes = SyntheticVolumes(
+        clusters=args.clusters,
+        keywords_per_cluster=args.keywords_per_cluster,
+        articles=args.articles,
+        performance_rows=args.performance_rows,
+        history_days=args.history_days,
+        link_sites=args.link_sites,
+        link_tasks=args.link_tasks,
+        paragraphs=args.paragraphs,
+    ).scaled(args.scale)
+    print(run_synthetic_seed(volumes, seed=args.seed, anchor=args.anchor, reset=args.reset))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Batch SERP analysis within provider limits: concurrent workers behind one token bucket and daily quota.
+
+Identical (query, region) pairs in a batch are fetched once. Workers run the provider's blocking
+analyze() in threads; every call (retries included) takes a bucket token and a quota unit. A
+SerpThrottledError pauses the shared bucket for the provider's Retry-After (or an exponential
+backoff) and is retried; other errors are retried with backoff without pausing. Results are yielded
+as they complete, not in input order; each carries its input index.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Iterable
+
+from libs.common.clients.serp import SerpProviderInterface, SerpThrottledError
+from libs.common.logging import get_logger
+from libs.common.rate_limit import DailyQuota, TokenBucket, backoff_delay
+
+logger = get_logger(__name__)
+
+
+class SerpLimiter:
+    """Process-wide limits for one SERP provider."""
+
+    def __init__(self, qps: float, burst: int | None, daily_quota: int, concurrency: int) -> None:
+        self.bucket = TokenBucket(qps, burst)
+        self.quota = DailyQuota(daily_quota)
+        self.concurrency = concurrency
+
+
+_limiter: SerpLimiter | None = None
+
+
+def get_limiter() -> SerpLimiter:
+    global _limiter
+    if _limiter is None:
+        from libs.common.config import get_settings
+        s = get_settings()
+        _limiter = SerpLimiter(s.serp_qps, s.serp_burst or None, s.serp_daily_quota, s.serp_batch_concurrency)
+    return _limiter
+
+
+async def _analyze_one(
+    client: SerpProviderInterface,
+    limiter: SerpLimiter,
+    query: str,
+    region: str,
+    max_retries: int,
+    backoff_base: float,
+) -> dict[str, Any]:
+    attempts = 0
+    while True:
+        if not limiter.quota.try_consume():
+            return {"status": "quota_exceeded", "attempts": attempts}
+        await limiter.bucket.acquire()
+        attempts += 1
+        try:
+            analysis = await asyncio.to_thread(client.analyze, query, region)
+            return {"status": "ok", "attempts": attempts, "analysis": analysis.model_dump()}
+        except SerpThrottledError as e:
+            if attempts > max_retries:
+                return {"status": "throttled", "attempts": attempts, "error": str(e)}
+            delay = e.retry_after if e.retry_after is not None else backoff_delay(attempts, backoff_base)
+            limiter.bucket.pause(delay)  # the next acquire() of every worker waits
+            logger.warning("serp_throttled", query=query, region=region, attempt=attempts, pause_s=round(delay, 2))
+        except Exception as e:
+            if attempts > max_retries:
+                return {"status": "error", "attempts": attempts, "error": str(e)}
+            await asyncio.sleep(backoff_delay(attempts, backoff_base))
+
+
+async def analyze_batch(
+    client: SerpProviderInterface,
+    pairs: Iterable[tuple[str, str]],
+    limiter: SerpLimiter | None = None,
+    max_retries: int | None = None,
+    backoff_base: float | None = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """Yield {index, query, region, status, attempts, analysis | error} per input pair as each completes."""
+    from libs.common.config import get_settings
+
+    settings = get_settings()
+    limiter = limiter or get_limiter()
+    max_retries = settings.serp_max_retries if max_retries is None else max_retries
+    backoff_base = settings.serp_backoff_base_seconds if backoff_base is None else backoff_base
+
+    indexes: dict[tuple[str, str], list[int]] = {}
+    for i, pair in enumerate(pairs):
+        indexes.setdefault(pair, []).append(i)
+    todo: asyncio.Queue[tuple[str, str]] = asyncio.Queue()
+    for pair in indexes:
+        todo.put_nowait(pair)
+    done: asyncio.Queue[tuple[tuple[str, str], dict[str, Any]]] = asyncio.Queue()
+
+    async def worker() -> None:
+        while True:
+            try:
+                pair = todo.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await done.put((pair, await _analyze_one(client, limiter, *pair, max_retries, backoff_base)))
+
+    started = time.perf_counter()
+    workers = [asyncio.create_task(worker()) for _ in range(min(limiter.concurrency, len(indexes)))]
+    try:
+        for _ in range(len(indexes)):
+            (query, region), outcome = await done.get()
+            for index in indexes[(query, region)]:
+                yield {"index": index, "query": query, "region": region, **outcome}
+    finally:  # also on client disconnect: stop taking new pairs
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        logger.info(
+            "serp_batch_finished", pairs=sum(map(len, indexes.values())), unique=len(indexes),
+            seconds=round(time.perf_counter() - started, 2), quota_remaining=limiter.quota.remaining,
+        )
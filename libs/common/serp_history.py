@@ -0,0 +1,245 @@
+"""SERP snapshot history per (query, region) with delta storage.
+
+A snapshot is the SERP's structure: items (url, title, position, structure_hint), intent summary and
+suggested structure. serp_snapshot_heads keeps the latest state per keyword; a fetch whose state hash
+equals the head's only bumps last_seen_at/fetches of the current row, so storage grows with the
+number of changes, not with fetch frequency. A changed fetch adds a row holding the delta (items
+added/removed/moved/changed, new hints); every keyframe_every-th change row also stores the full state,
+so rebuilding any point in history replays at most that many deltas.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from typing import Any, Iterable
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from libs.common.models.db_models import SerpSnapshot, SerpSnapshotHead
+
+_ITEM_FIELDS = ("title", "position", "structure_hint")
+
+
+def normalize_snapshot(analysis: dict[str, Any]) -> dict[str, Any]:
+    """Stored form of a SerpAnalysis dict: items by position (first occurrence of a url wins), hints."""
+    items: dict[str, dict[str, Any]] = {}
+    for item in sorted(analysis.get("items") or [], key=lambda i: i.get("position") or 0):
+        url = item.get("url")
+        if url and url not in items:
+            items[url] = {"url": url, **{f: item.get(f) for f in _ITEM_FIELDS}}
+    return {
+        "items": list(items.values()),
+        "intent_summary": analysis.get("intent_summary") or "",
+        "suggested_structure": analysis.get("suggested_structure") or {},
+    }
+
+
+def state_hash(state: dict[str, Any]) -> str:
+    return hashlib.blake2b(json.dumps(state, sort_keys=True, ensure_ascii=False).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def diff_snapshots(old: dict[str, Any], new: dict[str, Any]) -> tuple[dict[str, Any], int]:
+    """(delta turning old into new, number of changes). Only non-empty keys are kept."""
+    old_items = {i["url"]: i for i in old["items"]}
+    new_items = {i["url"]: i for i in new["items"]}
+    delta: dict[str, Any] = {
+        "added": [i for url, i in new_items.items() if url not in old_items],
+        "removed": [url for url in old_items if url not in new_items],
+        "moved": {
+            url: i["position"] for url, i in new_items.items()
+            if url in old_items and old_items[url]["position"] != i["position"]
+        },
+        "changed": {
+            url: {f: i[f] for f in ("title", "structure_hint") if old_items[url][f] != i[f]}
+            for url, i in new_items.items()
+            if url in old_items and any(old_items[url][f] != i[f] for f in ("title", "structure_hint"))
+        },
+    }
+    changes = sum(len(v) for v in delta.values())
+    for key in ("intent_summary", "suggested_structure"):
+        if old[key] != new[key]:
+            delta[key] = new[key]
+            changes += 1
+    return {k: v for k, v in delta.items() if v or k in ("intent_summary", "suggested_structure")}, changes
+
+
+def apply_delta(state: dict[str, Any], delta: dict[str, Any]) -> dict[str, Any]:
+    items = {i["url"]: dict(i) for i in state["items"]}
+    for url in delta.get("removed", ()):
+        items.pop(url, None)
+    for url, position in delta.get("moved", {}).items():
+        items[url]["position"] = position
+    for url, fields in delta.get("changed", {}).items():
+        items[url].update(fields)
+    for item in delta.get("added", ()):
+        items[item["url"]] = dict(item)
+    return {
+        "items": sorted(items.values(), key=lambda i: i["position"] or 0),
+        "intent_summary": delta.get("intent_summary", state["intent_summary"]),
+        "suggested_structure": delta.get("suggested_structure", state["suggested_structure"]),
+    }
+
+
+def record_snapshot(
+    session: Session, analysis: dict[str, Any], fetched_at: datetime | None = None, keyframe_every: int | None = None
+) -> dict[str, Any]:
+    """Store one fetch of a SERP; returns snapshot_id, whether it changed, and the number of changes."""
+    if keyframe_every is None:
+        from libs.common.config import get_settings
+        keyframe_every = get_settings().serp_snapshot_keyframe_every
+    query, region = analysis["query"], analysis.get("region") or ""
+    now = fetched_at or datetime.now(timezone.utc)
+    state = normalize_snapshot(analysis)
+    digest = state_hash(state)
+    head = session.execute(
+        select(SerpSnapshotHead)
+        .where(SerpSnapshotHead.query == query, SerpSnapshotHead.region == region)
+        .with_for_update()
+    ).scalars().one_or_none()
+
+    if head is not None and head.state_hash == digest:
+        row = session.get(SerpSnapshot, head.snapshot_id)
+        row.last_seen_at = now
+        row.fetches += 1
+        head.last_fetched_at = now
+        return {"snapshot_id": row.id, "changed": False, "changes": 0}
+
+    if head is None:
+        delta, changes, keyframe = None, 0, True
+    else:
+        delta, changes = diff_snapshots(head.state, state)
+        keyframe = head.deltas_since_keyframe + 1 >= keyframe_every
+    row = SerpSnapshot(
+        query=query,
+        region=region,
+        fetched_at=now,
+        last_seen_at=now,
+        fetches=1,
+        state=state if keyframe else None,
+        delta=delta,
+        changes=changes,
+    )
+    session.add(row)
+    session.flush()
+    if head is None:
+        # A concurrent first fetch may win the insert; its row then stays the head and ours is an orphan keyframe
+        session.execute(
+            pg_insert(SerpSnapshotHead)
+            .values(query=query, region=region, snapshot_id=row.id, state=state, state_hash=digest,
+                    deltas_since_keyframe=0, last_fetched_at=now)
+            .on_conflict_do_nothing()
+        )
+    else:
+        head.snapshot_id = row.id
+        head.state = state
+        head.state_hash = digest
+        head.deltas_since_keyframe = 0 if keyframe else head.deltas_since_keyframe + 1
+        head.last_fetched_at = now
+    return {"snapshot_id": row.id, "changed": True, "changes": changes}
+
+
+def _rows(session: Session, query: str, region: str, start_id: int, until: datetime | None) -> Iterable[SerpSnapshot]:
+    q = (
+        select(SerpSnapshot)
+        .where(SerpSnapshot.query == query, SerpSnapshot.region == region, SerpSnapshot.id >= start_id)
+        .order_by(SerpSnapshot.id)
+    )
+    if until is not None:
+        q = q.where(SerpSnapshot.fetched_at <= until)
+    return session.execute(q.execution_options(yield_per=500)).scalars()
+
+
+def history(
+    session: Session,
+    query: str,
+    region: str,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: int = 100,
+) -> list[dict[str, Any]]:
+    """Full states in [since, until], oldest first; the state current at `since` is included."""
+    if since is not None and since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    keyframes = [SerpSnapshot.query == query, SerpSnapshot.region == region, SerpSnapshot.state.is_not(None)]
+    start_id = None
+    if since is not None:
+        start_id = session.execute(
+            select(func.max(SerpSnapshot.id)).where(*keyframes, SerpSnapshot.fetched_at <= since)
+        ).scalar_one_or_none()
+    if start_id is None:  # no since, or it precedes the first keyframe
+        start_id = session.execute(select(func.min(SerpSnapshot.id)).where(*keyframes)).scalar_one_or_none()
+        if start_id is None:
+            return []
+
+    result: list[dict[str, Any]] = []
+    state: dict[str, Any] | None = None
+    for row in _rows(session, query, region, start_id, until):
+        state = row.state if row.state is not None else apply_delta(state, row.delta or {})
+        entry = {
+            "snapshot_id": row.id,
+            "fetched_at": row.fetched_at,
+            "last_seen_at": row.last_seen_at,
+            "fetches": row.fetches,
+            "changes": row.changes,
+            "keyframe": row.state is not None,
+            **state,
+        }
+        if since is not None and row.fetched_at < since:
+            result = [entry]  # the state in effect at `since`
+            continue
+        result.append(entry)
+        if len(result) >= limit:
+            break
+    return result
+
+
+def changes_since(
+    session: Session,
+    since: datetime,
+    query: str | None = None,
+    region: str | None = None,
+    limit: int = 100,
+) -> list[dict[str, Any]]:
+    """Changed fetches after `since` (all keywords unless query is given), newest first."""
+    q = select(
+        SerpSnapshot.id, SerpSnapshot.query, SerpSnapshot.region, SerpSnapshot.fetched_at,
+        SerpSnapshot.changes, SerpSnapshot.delta,
+    ).where(SerpSnapshot.fetched_at > since, SerpSnapshot.delta.is_not(None))
+    if query is not None:
+        q = q.where(SerpSnapshot.query == query)
+    if region is not None:
+        q = q.where(SerpSnapshot.region == region)
+    rows = session.execute(q.order_by(SerpSnapshot.fetched_at.desc(), SerpSnapshot.id.desc()).limit(limit)).all()
+    return [
+        {"snapshot_id": r.id, "query": r.query, "region": r.region, "fetched_at": r.fetched_at,
+         "changes": r.changes, "delta": r.delta}
+        for r in rows
+    ]
+
+
+def volatility(session: Session, since: datetime, region: str | None = None, limit: int = 100) -> list[dict[str, Any]]:
+    """Keywords ranked by total changes after `since`."""
+    total = func.sum(SerpSnapshot.changes)
+    q = (
+        select(
+            SerpSnapshot.query,
+            SerpSnapshot.region,
+            total.label("changes"),
+            func.count().label("snapshots"),
+            func.max(SerpSnapshot.fetched_at).label("last_change_at"),
+        )
+        .where(SerpSnapshot.fetched_at > since, SerpSnapshot.delta.is_not(None))
+        .group_by(SerpSnapshot.query, SerpSnapshot.region)
+        .order_by(total.desc(), SerpSnapshot.query)
+        .limit(limit)
+    )
+    if region is not None:
+        q = q.where(SerpSnapshot.region == region)
+    return [
+        {"query": r.query, "region": r.region, "changes": int(r.changes), "snapshots": r.snapshots,
+         "last_change_at": r.last_change_at}
+        for r in session.execute(q).all()
+    ]
@@ -0,0 +1,144 @@
+"""Sitemaps for published articles' Tilda URLs: sitemap-N.xml shards of at most 50k URLs and a sitemap index.
+
+An article belongs to shard id // SHARD_SIZE, so shards are stable: a new or changed article touches
+only its own shard. One GROUP BY query gives every shard's signature (URL count, max updated_at,
+sum of ids); only shards whose signature differs from sitemap-state.json (or whose file is missing)
+are rewritten, each streamed from a server-side cursor straight into a temp file that replaces the
+old one (os.replace). Memory stays bounded by the number of shards, not URLs. Shards left without
+URLs are deleted. The index (sitemap.xml) lists every shard with lastmod = its newest updated_at.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+from xml.sax.saxutils import escape
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from libs.common.logging import get_logger
+from libs.common.models.db_models import Article, ArticleStatus
+
+logger = get_logger(__name__)
+
+SHARD_SIZE = 50_000  # sitemaps.org limit of URLs per file
+INDEX = "sitemap.xml"
+STATE = "sitemap-state.json"
+
+_XMLNS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+_SHARD_FILE = re.compile(r"^sitemap-(\d+)\.xml$")
+
+
+def shard_file(shard: int) -> str:
+    return f"sitemap-{shard}.xml"
+
+
+def _in_sitemap() -> tuple:
+    return (
+        Article.status == ArticleStatus.PUBLISHED.value,
+        Article.tilda_url.is_not(None),
+        Article.tilda_url != "",
+    )
+
+
+def shard_signatures(session: Session) -> dict[int, dict[str, Any]]:
+    """shard -> {urls, lastmod (ISO), id_sum}: changes whenever a URL of the shard is added, removed or updated."""
+    shard = (Article.id // SHARD_SIZE).label("shard")
+    rows = session.execute(
+        select(shard, func.count(), func.max(Article.updated_at), func.sum(Article.id))
+        .where(*_in_sitemap())
+        .group_by(shard)
+    ).all()
+    return {
+        s: {"urls": count, "lastmod": lastmod.isoformat() if lastmod else None, "id_sum": int(id_sum)}
+        for s, count, lastmod, id_sum in rows
+    }
+
+
+def _lastmod(value: datetime | None) -> str:
+    return f"<lastmod>{value.isoformat(timespec='seconds')}</lastmod>" if value else ""
+
+
+def write_shard(session: Session, path: Path, shard: int) -> int:
+    """Stream one shard's URLs into path (atomically); the number of URLs written."""
+    q = (
+        select(Article.tilda_url, Article.updated_at)
+        .where(*_in_sitemap(), Article.id >= shard * SHARD_SIZE, Article.id < (shard + 1) * SHARD_SIZE)
+        .order_by(Article.id)
+    )
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    written = 0
+    with tmp.open("w", encoding="utf-8") as f:
+        f.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{_XMLNS}">\n')
+        for url, updated_at in session.execute(q.execution_options(yield_per=2000)):
+            f.write(f"<url><loc>{escape(url.strip())}</loc>{_lastmod(updated_at)}</url>\n")
+            written += 1
+        f.write("</urlset>\n")
+    os.replace(tmp, path)
+    return written
+
+
+def write_index(path: Path, base_url: str, signatures: dict[int, dict[str, Any]]) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        f.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{_XMLNS}">\n')
+        for shard in sorted(signatures):
+            lastmod = signatures[shard]["lastmod"]
+            loc = escape(f"{base_url.rstrip('/')}/{shard_file(shard)}")
+            f.write(f"<sitemap><loc>{loc}</loc>{_lastmod(datetime.fromisoformat(lastmod) if lastmod else None)}</sitemap>\n")
+        f.write("</sitemapindex>\n")
+    os.replace(tmp, path)
+
+
+def _load_state(out_dir: Path) -> dict[int, dict[str, Any]]:
+    try:
+        state = json.loads((out_dir / STATE).read_text(encoding="utf-8"))
+        return {int(k): v for k, v in state.get("shards", {}).items()}
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def generate_sitemaps(session: Session, out_dir: str | Path, base_url: str, full: bool = False) -> dict[str, Any]:
+    """Bring the sitemap files in out_dir up to date; full=True rewrites every shard."""
+    started = time.perf_counter()
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    previous = _load_state(out_dir)
+    signatures = shard_signatures(session)
+
+    written = []
+    for shard, signature in sorted(signatures.items()):
+        path = out_dir / shard_file(shard)
+        if full or previous.get(shard) != signature or not path.is_file():
+            write_shard(session, path, shard)
+            written.append(shard)
+    removed = 0
+    for name in os.listdir(out_dir):
+        m = _SHARD_FILE.match(name)
+        if m and int(m.group(1)) not in signatures:
+            (out_dir / name).unlink(missing_ok=True)
+            removed += 1
+
+    index_changed = full or written or removed or previous.keys() != signatures.keys() or not (out_dir / INDEX).is_file()
+    if index_changed:
+        write_index(out_dir / INDEX, base_url, signatures)
+    state = {"shard_size": SHARD_SIZE, "shards": {str(k): v for k, v in signatures.items()}}
+    tmp = out_dir / f".{STATE}.{os.getpid()}.tmp"
+    tmp.write_text(json.dumps(state, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, out_dir / STATE)
+
+    report = {
+        "urls": sum(s["urls"] for s in signatures.values()),
+        "shards": len(signatures),
+        "written": written,
+        "removed": removed,
+        "index_written": bool(index_changed),
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+    logger.info("sitemaps_generated", out_dir=str(out_dir), **{**report, "written": len(written)})
+    return report
@@ -0,0 +1,193 @@
+"""Static site export: every published article as <out>/<slug>/index.html, plus manifest.json, for a CDN.
+
+Incremental: one streaming query fingerprints all published articles in Postgres (md5 over the
+page's fields, without fetching bodies) together with the ids of the articles they link to. A page's
+hash combines its fingerprint with each link target's URL and exported path, so a page is rebuilt
+when its own content changes and when an article it links to is renamed, moved or unpublished.
+Only pages whose hash differs from manifest.json (or whose file is missing) are fetched and
+rendered; pages of articles no longer published are deleted.
+
+Links to exported articles are rewritten to their static paths; the rest keep their URL. Every file,
+the manifest included, is written to a temp file and moved into place with os.replace, so the CDN
+origin never serves a half-written page.
+"""
+from __future__ import annotations
+
+import hashlib
+import html
+import json
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Iterable
+
+from sqlalchemy import Text, cast, func, select
+from sqlalchemy.orm import Session
+
+from libs.common.logging import get_logger
+from libs.common.markdown_render import RENDER_VERSION, heading_slug, render_page
+from libs.common.models.db_models import Article, ArticleLink, ArticleStatus
+
+logger = get_logger(__name__)
+
+EXPORT_VERSION = "1"  # bump when the page template changes: every page is rebuilt
+MANIFEST = "manifest.json"
+
+_UNSAFE_PATH = re.compile(r"[^A-Za-z0-9._-]+")
+_FETCH_CHUNK = 200
+_SEP = "\x01"
+
+
+def page_path(slug: str | None, article_id: int) -> str:
+    """Directory of the article under the export root (a safe single path segment; Cyrillic transliterated)."""
+    slug = slug or ""
+    path = _UNSAFE_PATH.sub("-", slug if slug.isascii() else heading_slug(slug)).strip(".-")
+    return path[:200] or f"article-{article_id}"
+
+
+def _fingerprints(session: Session) -> Iterable[Any]:
+    """(id, slug, tilda_url, fingerprint, targets) for every published article, streamed by id."""
+    fields = [
+        func.coalesce(Article.title, ""),
+        func.coalesce(Article.final_markdown, Article.draft_markdown, ""),
+        func.coalesce(Article.meta_title, ""),
+        func.coalesce(Article.meta_description, ""),
+        func.coalesce(cast(Article.schema_json, Text), ""),
+        func.coalesce(Article.tilda_url, ""),
+    ]
+    targets = (
+        select(func.array_agg(ArticleLink.target_article_id))
+        .where(ArticleLink.source_article_id == Article.id)
+        .scalar_subquery()
+    )
+    q = (
+        select(
+            Article.id,
+            Article.slug,
+            Article.tilda_url,
+            func.md5(func.concat_ws(_SEP, *fields)).label("fingerprint"),
+            targets.label("targets"),
+        )
+        .where(Article.status == ArticleStatus.PUBLISHED.value)
+        .order_by(Article.id)
+    )
+    return session.execute(q.execution_options(yield_per=5000))
+
+
+def _page_hash(fingerprint: str, targets: list[int], urls: dict[int, str], paths: dict[int, str]) -> str:
+    h = hashlib.md5(f"{EXPORT_VERSION}{_SEP}{RENDER_VERSION}{_SEP}{fingerprint}".encode("utf-8"))
+    for target in sorted(set(targets)):
+        h.update(f"{_SEP}{target}:{urls.get(target, '')}:{paths.get(target, '')}".encode("utf-8"))
+    return h.hexdigest()
+
+
+def rewrite_links(markdown: str, hrefs: dict[str, str]) -> str:
+    """Point markdown links ](url) / ](url "title") at their exported paths."""
+    for url, href in hrefs.items():
+        markdown = markdown.replace(f"]({url})", f"]({href})").replace(f"]({url} ", f"]({href} ")
+    return markdown
+
+
+def render_article_page(article: Any, hrefs: dict[str, str]) -> str:
+    """Standalone HTML document; canonical points at the Tilda page when there is one."""
+    markdown = rewrite_links(article.final_markdown or article.draft_markdown or "", hrefs)
+    title = html.escape(article.meta_title or article.title or "", quote=False)
+    head = [
+        '<meta charset="utf-8">',
+        '<meta name="viewport" content="width=device-width, initial-scale=1">',
+        f"<title>{title}</title>",
+    ]
+    if article.meta_description:
+        head.append(f'<meta name="description" content="{html.escape(article.meta_description)}">')
+    if article.tilda_url:
+        head.append(f'<link rel="canonical" href="{html.escape(article.tilda_url)}">')
+    body = render_page(markdown, article.schema_json, article.title, article.meta_description)
+    return f'<!doctype html><html lang="ru"><head>{"".join(head)}</head><body><article>{body}</article></body></html>\n'
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def load_manifest(out_dir: Path) -> dict[str, Any]:
+    try:
+        manifest = json.loads((out_dir / MANIFEST).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return manifest.get("pages", {}) if isinstance(manifest, dict) else {}
+
+
+def export_static(session: Session, out_dir: str | Path, full: bool = False) -> dict[str, Any]:
+    """Bring out_dir in line with the published articles; full=True rebuilds every page."""
+    started = time.perf_counter()
+    out_dir = Path(out_dir)
+    previous = load_manifest(out_dir)
+
+    # 1) Fingerprints and static paths of all published articles (duplicate slugs get an id suffix)
+    rows = list(_fingerprints(session))
+    paths: dict[int, str] = {}
+    urls: dict[int, str] = {}
+    taken: set[str] = set()
+    for row in rows:
+        path = page_path(row.slug, row.id)
+        if path in taken or path == MANIFEST:
+            path = f"{path}-{row.id}"
+        taken.add(path)
+        paths[row.id] = path
+        urls[row.id] = row.tilda_url or f"/{row.slug}"
+
+    pages: dict[str, dict[str, Any]] = {}
+    stale: list[int] = []
+    for row in rows:
+        page_hash = _page_hash(row.fingerprint, row.targets or [], urls, paths)
+        key = str(row.id)
+        pages[key] = {"path": paths[row.id], "hash": page_hash}
+        old = previous.get(key)
+        if full or not old or old.get("hash") != page_hash or old.get("path") != paths[row.id] \
+                or not (out_dir / paths[row.id] / "index.html").is_file():
+            stale.append(row.id)
+
+    # 2) Render and write the changed pages
+    for start in range(0, len(stale), _FETCH_CHUNK):
+        ids = stale[start:start + _FETCH_CHUNK]
+        articles = session.execute(
+            select(Article.id, Article.title, Article.final_markdown, Article.draft_markdown, Article.meta_title,
+                   Article.meta_description, Article.schema_json, Article.tilda_url)
+            .where(Article.id.in_(ids))
+        ).all()
+        links: dict[int, list[int]] = {}
+        for source, target in session.execute(
+            select(ArticleLink.source_article_id, ArticleLink.target_article_id)
+            .where(ArticleLink.source_article_id.in_(ids))
+        ):
+            links.setdefault(source, []).append(target)
+        for article in articles:
+            hrefs = {urls[t]: f"/{paths[t]}/" for t in links.get(article.id, []) if t in paths}
+            write_atomic(out_dir / paths[article.id] / "index.html", render_article_page(article, hrefs).encode("utf-8"))
+
+    # 3) Pages that are gone or moved
+    live = {page["path"] for page in pages.values()}
+    removed = 0
+    for key, old in previous.items():
+        path = old.get("path")
+        if path and path not in live and path != MANIFEST and "/" not in path and path not in (".", ".."):
+            shutil.rmtree(out_dir / path, ignore_errors=True)
+            removed += 1
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {"version": EXPORT_VERSION, "pages": pages}
+    write_atomic(out_dir / MANIFEST, json.dumps(manifest, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+    report = {
+        "pages": len(pages),
+        "written": len(stale),
+        "unchanged": len(pages) - len(stale),
+        "removed": removed,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+    logger.info("static_export_finished", out_dir=str(out_dir), **report)
+    return report
@@ -0,0 +1,72 @@
+"""Streaming NDJSON/CSV export from a server-side cursor.
+
+Rows are fetched in `yield_per` batches (psycopg2 named cursor) and encoded into chunks of a few
+hundred rows, so memory stays flat for any result size. The session lives inside the generator
+and is closed when the response finishes or the client disconnects.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Iterator, Literal
+
+from sqlalchemy import Select
+
+from libs.common.database import session_scope
+
+ExportFormat = Literal["ndjson", "csv"]
+
+FETCH_ROWS = 1000
+CHUNK_ROWS = 200
+
+MEDIA_TYPES: dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"not JSON serializable: {type(value).__name__}")
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=_json_default)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def stream_export(statement: Select, fmt: ExportFormat, fetch_rows: int = FETCH_ROWS) -> Iterator[bytes]:
+    """Encode the rows of a column select (not ORM entities) as NDJSON lines or CSV with a header."""
+    with session_scope() as session:
+        result = session.execute(statement.execution_options(yield_per=fetch_rows))
+        columns = list(result.keys())
+        buffer = io.StringIO()
+        writer = csv.writer(buffer) if fmt == "csv" else None
+        if writer is not None:
+            writer.writerow(columns)
+        pending = 0
+        for row in result:
+            if writer is not None:
+                writer.writerow([_csv_value(v) for v in row])
+            else:
+                buffer.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=_json_default))
+                buffer.write("\n")
+            pending += 1
+            if pending >= CHUNK_ROWS:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
@@ -0,0 +1,132 @@
+"""Text normalization shared by uniqueness and quality checks: markdown stripping, blocks, tokens, stems."""
+from __future__ import annotations
+
+import hashlib
+import re
+from functools import lru_cache
+
+_MD_LINK = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+_MD_CODE = re.compile(r"`{1,3}[^`]*`{1,3}")
+_MD_HTML = re.compile(r"<[^>]+>")
+_MD_MARKUP = re.compile(r"^\s{0,3}(#{1,6}|[-*+]|\d+[.)]|>)\s+", re.MULTILINE)
+# Applied to normalized (lowercased, ё -> е) text; explicit ranges are much faster than [^\W\d_]
+_WORD = re.compile(r"[а-яa-z]+(?:-[а-яa-z]+)*")
+_BLANK_LINES = re.compile(r"\n[ \t]*\n")
+
+
+def strip_markdown(text: str) -> str:
+    """Plain text: link/image labels kept, code, tags and block markers removed."""
+    if "`" in text:
+        text = _MD_CODE.sub(" ", text)
+    if "](" in text:
+        text = _MD_LINK.sub(r"\1", text)
+    if "<" in text:
+        text = _MD_HTML.sub(" ", text)
+    text = _MD_MARKUP.sub("", text)
+    return text.replace("*", "").replace("_", " ")
+
+
+def normalize_text(text: str) -> str:
+    return strip_markdown(text).lower().replace("ё", "е")
+
+
+def tokenize(normalized: str) -> list[str]:
+    """Word tokens of already normalized text (digits and punctuation dropped)."""
+    return _WORD.findall(normalized)
+
+
+def words(text: str) -> list[str]:
+    """Lowercased word tokens of markdown/plain text."""
+    return tokenize(normalize_text(text))
+
+
+def split_blocks(text: str) -> list[str]:
+    """Paragraphs/sections separated by blank lines; a fenced code block is never split."""
+    if "```" not in text and "~~~" not in text:
+        return [b for b in _BLANK_LINES.split(text) if b.strip()]
+    blocks: list[str] = []
+    current: list[str] = []
+    fence = None
+    for line in text.split("\n"):
+        stripped = line.strip()
+        if fence:
+            current.append(line)
+            if stripped.startswith(fence):
+                fence = None
+        elif stripped.startswith(("```", "~~~")):
+            fence = stripped[:3]
+            current.append(line)
+        elif stripped:
+            current.append(line)
+        elif current:
+            blocks.append("\n".join(current))
+            current = []
+    if current:
+        blocks.append("\n".join(current))
+    return blocks
+
+
+def block_hash(block: str) -> str:
+    """Content hash identifying a block across edits."""
+    return hashlib.blake2b(block.encode("utf-8"), digest_size=12).hexdigest()
+
+
+# --- Russian stemming (Snowball/Porter rules; cached because article vocabularies repeat heavily) ---
+_RV = re.compile(r"^(.*?[аеиоуыэюя])(.*)$")
+_PERFECTIVE_GERUND = re.compile(r"((ив|ивши|ившись|ыв|ывши|ывшись)|((?<=[ая])(в|вши|вшись)))$")
+_REFLEXIVE = re.compile(r"(с[яь])$")
+_ADJECTIVE = re.compile(r"(ее|ие|ые|ое|ими|ыми|ей|ий|ый|ой|ем|им|ым|ом|его|ого|ему|ому|их|ых|ую|юю|ая|яя|ою|ею)$")
+_PARTICIPLE = re.compile(r"((ивш|ывш|ующ)|((?<=[ая])(ем|нн|вш|ющ|щ)))$")
+_VERB = re.compile(
+    r"((ила|ыла|ена|ейте|уйте|ите|или|ыли|ей|уй|ил|ыл|им|ым|ен|ило|ыло|ено|ят|ует|уют|ит|ыт|ены|ить|ыть|ишь|ую|ю)"
+    r"|((?<=[ая])(ла|на|ете|йте|ли|й|л|ем|н|ло|но|ет|ют|ны|ть|ешь|нно)))$"
+)
+_NOUN = re.compile(r"(а|ев|ов|ие|ье|е|иями|ями|ами|еи|ии|и|ией|ей|ой|ий|й|иям|ям|ием|ем|ам|ом|о|у|ах|иях|ях|ы|ь|ию|ью|ю|ия|ья|я)$")
+_DERIVATIONAL = re.compile(r"ость?$")
+_VOWELS = frozenset("аеиоуыэюя")
+_SUPERLATIVE = re.compile(r"(ейше|ейш)$")
+
+
+def _region_start(word: str, start: int) -> int:
+    """Snowball region: after the first non-vowel that follows a vowel, searching from start."""
+    for i in range(start + 1, len(word)):
+        if word[i] not in _VOWELS and word[i - 1] in _VOWELS:
+            return i + 1
+    return len(word)
+
+
+@lru_cache(maxsize=200_000)
+def stem(word: str) -> str:
+    """Russian stem of a lowercased word; non-Cyrillic words are returned unchanged."""
+    m = _RV.match(word)
+    if not m:
+        return word
+    prefix, rv = m.groups()
+    r2 = _region_start(word, _region_start(word, 0)) - len(prefix)  # R2 as an offset into rv
+    temp = _PERFECTIVE_GERUND.sub("", rv, 1)
+    if temp == rv:
+        rv = _REFLEXIVE.sub("", rv, 1)
+        temp = _ADJECTIVE.sub("", rv, 1)
+        if temp != rv:
+            rv = _PARTICIPLE.sub("", temp, 1)
+        else:
+            temp = _VERB.sub("", rv, 1)
+            rv = _NOUN.sub("", rv, 1) if temp == rv else temp
+    else:
+        rv = temp
+    if rv.endswith("и"):
+        rv = rv[:-1]
+    d = _DERIVATIONAL.search(rv)
+    if d and d.start() >= r2:  # derivational ending only inside R2
+        rv = rv[:d.start()]
+    if rv.endswith("ь"):
+        rv = rv[:-1]
+    else:
+        rv = _SUPERLATIVE.sub("", rv, 1)
+        if rv.endswith("нн"):
+            rv = rv[:-1]
+    return prefix + rv
+
+
+def stems(tokens: list[str]) -> list[str]:
+    return list(map(stem, tokens))
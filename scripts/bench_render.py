@@ -0,0 +1,77 @@
+"""Render throughput on large articles: cold renders vs content-hash cache hits.
+
+Run from project root:
+    python scripts/bench_render.py --sections 200 --repeat 20
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import argparse
+import statistics
+import time
+
+from libs.common.markdown_render import content_hash, get_render_cache, render_cached, render_page
+
+SECTION = """## Раздел {i}: подбор персонала под ключ
+
+Кадровое агентство **берёт на себя** поиск, _оценку_ и проверку кандидатов. Подробнее — в [разделе {i}](/uslugi/{i} "Услуги").
+Стоимость зависит от `грейда` вакансии и сроков.
+
+- Анализ рынка зарплат
+- Массовый подбор
+  1. Скрининг резюме
+  2. Интервью по компетенциям
+- Гарантия замены кандидата
+
+> Средний срок закрытия вакансии — 14 дней.
+
+| Этап | Срок | Результат |
+|:-----|:----:|----------:|
+| Бриф | 1 день | Профиль |
+| Поиск | 7 дней | Шорт-лист |
+
+```python
+print("пример {i}")
+```
+"""
+
+
+def make_article(sections: int) -> str:
+    return "# Подбор персонала\n\n" + "\n".join(SECTION.format(i=i) for i in range(sections))
+
+
+def bench(label: str, fn, repeat: int, size: int) -> None:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    median = statistics.median(times)
+    print(f"{label:>8}: median {median * 1000:9.3f} ms  {size / median / 1e6:9.2f} MB/s  {1 / median:10.1f} renders/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", type=int, default=200, help="sections per article (~700 bytes each)")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    markdown = make_article(args.sections)
+    schema = {"@type": "Article", "author": {"@type": "Organization", "name": "Твой лучший HR"}}
+    size = len(markdown.encode("utf-8"))
+    html = render_page(markdown, schema, "Подбор персонала")
+    print(f"article: {size} bytes markdown, {len(html.encode('utf-8'))} bytes html")
+
+    def cached() -> None:
+        render_cached(markdown, schema, "Подбор персонала")
+
+    bench("render", lambda: render_page(markdown, schema, "Подбор персонала"), args.repeat, size)
+    bench("hash", lambda: content_hash(markdown, schema, "Подбор персонала"), args.repeat, size)
+    get_render_cache().clear()
+    cached()
+    bench("cached", cached, args.repeat, size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""Export published articles to static HTML for a CDN (only changed pages are rebuilt).
+
+Run from project root (cron after publishing, then sync the directory to the CDN origin):
+    python scripts/export_static.py --out static_site
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import argparse
+import json
+
+from libs.common.config import get_settings
+from libs.common.database import session_scope
+from libs.common.static_export import export_static
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default=None, help="export directory (default: STATIC_EXPORT_DIR)")
+    parser.add_argument("--full", action="store_true", help="rebuild every page, ignoring the manifest")
+    args = parser.parse_args()
+
+    with session_scope() as session:
+        report = export_static(session, args.out or get_settings().static_export_dir, full=args.full)
+    print(json.dumps(report, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Sitemaps of published articles' Tilda URLs (only changed shards are rewritten).
+
+Run from project root (cron), then serve the directory at SITEMAP_BASE_URL:
+    python scripts/generate_sitemaps.py --base-url https://example.ru
+"""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import argparse
+import json
+
+from libs.common.config import get_settings
+from libs.common.database import session_scope
+from libs.common.sitemap import generate_sitemaps
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default=settings.sitemap_dir, help="sitemap directory (default: SITEMAP_DIR)")
+    parser.add_argument(
+        "--base-url", default=settings.sitemap_base_url, help="URL the directory is served at (default: SITEMAP_BASE_URL)"
+    )
+    parser.add_argument("--full", action="store_true", help="rewrite every shard")
+    args = parser.parse_args()
+    if not args.base_url:
+        parser.error("--base-url or SITEMAP_BASE_URL is required (shard URLs in the sitemap index)")
+
+    with session_scope() as session:
+        report = generate_sitemaps(session, args.out, args.base_url, full=args.full)
+    print(json.dumps(report, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,22 @@
-"""Analytics Tracker: impressions/clicks/positions (placeholder)."""
+"""Analytics Tracker: impressions/clicks/positions from GSC / Yandex exports."""
+import io
 import sys
-from pathlib import Path
+from datetime import date
+from pathlib import Path, PurePath
 sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
-from fastapi import FastAPI
+from fastapi import FastAPI, File, HTTPException, Query, UploadFile
+
+from libs.common.database import session_scope
+from libs.common.models.db_models import RollupGrain, RollupScope
+from libs.common.performance_ingest import ingest_performance, iter_csv_rows, iter_jsonl_rows
+from libs.common.performance_partitions import apply_retention, ensure_future_partitions
+from libs.common.performance_rollups import query_timeseries, refresh_rollups
+from libs.common.schemas.performance import (
+    PerformanceIngestReport,
+    PerformancePoint,
+    PerformanceSeriesResponse,
+)
 
 app = FastAPI(title="Analytics Tracker")
 
@@ -16,3 +29,65 @@ def health() -> dict:
 @app.get("/performance")
 def performance() -> dict:
     return {"items": [], "message": "Placeholder: integrate GSC/Yandex later"}
+
+
+@app.post("/performance/ingest", response_model=PerformanceIngestReport)
+def ingest(
+    file: UploadFile = File(..., description="GSC / Yandex Webmaster export: CSV or JSON lines"),
+    source: str = Query(..., pattern="^(gsc|yandex)$"),
+    format: str | None = Query(None, pattern="^(csv|jsonl)$", description="Default: by file extension"),
+    dimensions: str = Query("date,page", description="Order of 'keys' in GSC API rows (jsonl)"),
+) -> PerformanceIngestReport:
+    """Stream the export into a staging table via COPY and upsert (article, date, source) rows in one merge."""
+    fmt = format or ("csv" if PurePath(file.filename or "").suffix.lower() == ".csv" else "jsonl")
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        rows = iter_csv_rows(stream)
+    else:
+        rows = iter_jsonl_rows(stream, dimensions=tuple(d.strip().lower() for d in dimensions.split(",")))
+    with session_scope() as session:
+        report = ingest_performance(session, rows, source=source)
+        if report.date_from is not None:
+            refresh_rollups(session, report.date_from, report.date_to)
+        return report
+
+
+@app.get("/performance/timeseries", response_model=PerformanceSeriesResponse)
+def timeseries(
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+    granularity: RollupGrain = Query(RollupGrain.WEEK),
+    scope: RollupScope = Query(RollupScope.CLUSTER),
+    id: int | None = Query(None, description="Article or cluster id; all when omitted"),
+    source: str | None = Query(None, pattern="^(gsc|yandex)$", description="Sum of sources when omitted"),
+) -> PerformanceSeriesResponse:
+    """Impressions/clicks/CTR/avg position per period, read from pre-aggregated rollups only."""
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    with session_scope() as session:
+        items = query_timeseries(session, scope, granularity, date_from, date_to, scope_id=id, source=source)
+    return PerformanceSeriesResponse(
+        scope=scope.value,
+        granularity=granularity.value,
+        items=[PerformancePoint(**i) for i in items],
+    )
+
+
+@app.post("/performance/rollups/refresh")
+def rollups_refresh(
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+) -> dict:
+    """Rebuild rollups for a date range (e.g. after manual fixes in raw data)."""
+    with session_scope() as session:
+        refresh_rollups(session, date_from, date_to)
+    return {"refreshed": True, "from": date_from, "to": date_to}
+
+
+@app.post("/performance/maintenance")
+def maintenance() -> dict:
+    """Create upcoming monthly partitions and detach/drop those past PERFORMANCE_RETENTION_MONTHS."""
+    with session_scope() as session:
+        created = ensure_future_partitions(session)
+        retired = apply_retention(session)
+    return {"created": created, "retired": retired}
@@ -8,6 +8,7 @@ from pydantic import BaseModel
 from sqlalchemy import select
 
 from libs.common.database import session_scope
+from libs.common.engine_registry import pool_metrics
 from libs.common.models.db_models import CaseTemplate
 
 app = FastAPI(title="Cases Gen")
@@ -25,6 +26,11 @@ def health() -> dict:
     return {"status": "ok", "service": "cases-gen"}
 
 
+@app.get("/health/db_pool")
+def db_pool() -> dict:
+    return {"service": "cases-gen", "pools": pool_metrics()}
+
+
 @app.get("/templates")
 def list_templates() -> list:
     with session_scope() as session:
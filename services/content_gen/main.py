@@ -1,13 +1,41 @@
-"""Content Gen: draft markdown from brief via LLM (interface + stub)."""
+"""Content Gen: draft markdown from brief via LLM (interface + stub); concurrent requests are micro-batched."""
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator
+
 from fastapi import FastAPI
 from pydantic import BaseModel
-from libs.common.clients.llm import LLMStubClient, GenerationBrief
+from libs.common.clients.llm import LLMClientInterface, LLMStubClient, GenerationBrief
+from libs.common.config import get_settings
+from libs.common.micro_batch import MicroBatcher
+
+llm: LLMClientInterface = LLMStubClient()
+batcher: MicroBatcher[GenerationBrief, str] | None = None
+
+
+async def _generate_batch(briefs: list[GenerationBrief]) -> list[str | Exception]:
+    return await asyncio.to_thread(llm.generate_article_drafts, briefs)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
+    global batcher
+    settings = get_settings()
+    batcher = MicroBatcher(
+        _generate_batch,
+        max_size=settings.content_gen_batch_max_size,
+        max_wait=settings.content_gen_batch_wait_ms / 1000,
+        max_in_flight=settings.content_gen_batch_in_flight,
+    )
+    yield
+    await batcher.close()
+
 
-app = FastAPI(title="Content Gen")
+app = FastAPI(title="Content Gen", lifespan=lifespan)
 
 
 class GenerateRequest(BaseModel):
@@ -20,11 +48,11 @@ class GenerateRequest(BaseModel):
 
 @app.get("/health")
 def health() -> dict:
-    return {"status": "ok", "service": "content-gen"}
+    return {"status": "ok", "service": "content-gen", "batching": batcher.stats() if batcher else None}
 
 
 @app.post("/generate")
-def generate(body: GenerateRequest) -> dict:
+async def generate(body: GenerateRequest) -> dict:
     brief = GenerationBrief(
         topic=body.topic,
         target_keyword=body.target_keyword,
@@ -32,5 +60,5 @@ def generate(body: GenerateRequest) -> dict:
         suggested_structure=body.suggested_structure,
         intent_summary=body.intent_summary,
     )
-    draft = LLMStubClient().generate_article_draft(brief)
+    draft = await batcher.submit(brief)
     return {"draft_markdown": draft}
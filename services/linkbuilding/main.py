@@ -8,6 +8,7 @@ from pydantic import BaseModel
 from sqlalchemy import select
 
 from libs.common.database import session_scope
+from libs.common.engine_registry import pool_metrics
 from libs.common.models.db_models import LinkSite, LinkTask
 
 app = FastAPI(title="Linkbuilding")
@@ -30,6 +31,11 @@ def health() -> dict:
     return {"status": "ok", "service": "linkbuilding"}
 
 
+@app.get("/health/db_pool")
+def db_pool() -> dict:
+    return {"service": "linkbuilding", "pools": pool_metrics()}
+
+
 @app.get("/sites")
 def list_sites() -> list:
     with session_scope() as session:
@@ -11,13 +11,14 @@ from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
 from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 from libs.common.config import get_settings
 from libs.common.logging import get_logger
-from services.orchestrator_api.routers import health, settings, clusters, articles, jobs
+from services.orchestrator_api.routers import health, settings, clusters, articles, jobs, quality_rules, serp
 
 logger = get_logger(__name__)
 
@@ -35,6 +36,8 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
 
 
 app = FastAPI(title="SEO AI Agent — Orchestrator", lifespan=lifespan)
+# Compresses streamed exports chunk by chunk when the client sends Accept-Encoding: gzip
+app.add_middleware(GZipMiddleware, minimum_size=1000)
 
 # Mount static and templates if present
 admin_dir = Path(__file__).parent / "admin"
@@ -48,6 +51,8 @@ app.include_router(settings.router, prefix="/settings", tags=["settings"])
 app.include_router(clusters.router, prefix="/clusters", tags=["clusters"])
 app.include_router(articles.router, prefix="/articles", tags=["articles"])
 app.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+app.include_router(quality_rules.router, prefix="/quality-rules", tags=["quality-rules"])
+app.include_router(serp.router, prefix="/serp", tags=["serp"])
 
 
 @app.get("/", response_class=HTMLResponse)
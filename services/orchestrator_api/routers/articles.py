@@ -1,13 +1,31 @@
-"""Articles: GET list, GET by id, POST approve."""
+"""Articles: GET list, GET search, GET export, GET by id, GET related, PATCH edit (+ quality re-check), POST approve,
+POST republish (published articles into the publisher queue)."""
 from __future__ import annotations
 
+from datetime import date, timedelta
+
+import httpx
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select, func
 from sqlalchemy.orm import joinedload
 
+from libs.common.article_search import search_articles
+from libs.common.config import get_settings
 from libs.common.database import session_scope
+from libs.common.internal_links import index_article_vector, related_articles
 from libs.common.models.db_models import Article, ArticleStatus
-from libs.common.schemas.articles import ArticleApproveRequest, ArticleListResponse, ArticleResponse
+from libs.common.streaming_export import MEDIA_TYPES, ExportFormat, stream_export
+from libs.common.schemas.articles import (
+    ArticleApproveRequest,
+    ArticleListResponse,
+    ArticleRepublishRequest,
+    ArticleRepublishResponse,
+    ArticleResponse,
+    ArticleSearchHit,
+    ArticleSearchResponse,
+    ArticleUpdate,
+)
 
 router = APIRouter()
 
@@ -34,6 +52,98 @@ def list_articles(
         return ArticleListResponse(items=items, total=total)
 
 
+@router.get("/search", response_model=ArticleSearchResponse)
+def search(
+    q: str = Query(..., min_length=1, max_length=256, description='Web-style query: words, "phrase", -exclude, OR'),
+    status: str | None = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+) -> ArticleSearchResponse:
+    with session_scope() as session:
+        try:
+            rows, next_cursor = search_articles(session, q, limit=limit, cursor=cursor, status=status)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return ArticleSearchResponse(items=[ArticleSearchHit(**r) for r in rows], next_cursor=next_cursor)
+
+
+_EXPORT_COLUMNS = (
+    Article.id, Article.cluster_id, Article.job_id, Article.status, Article.title, Article.slug,
+    Article.target_keyword, Article.meta_title, Article.meta_description, Article.tilda_page_id,
+    Article.tilda_url, Article.index_requested_at, Article.quality_scores, Article.created_at, Article.updated_at,
+)
+
+
+@router.get("/export")
+def export_articles(
+    format: ExportFormat = Query("ndjson"),
+    status: str | None = Query(None),
+    cluster_id: int | None = Query(None),
+    created_from: date | None = Query(None, alias="from"),
+    created_to: date | None = Query(None, alias="to", description="Inclusive"),
+    include_body: bool = Query(False, description="Add draft_markdown/final_markdown"),
+) -> StreamingResponse:
+    """Whole corpus (or a filtered part) streamed as NDJSON or CSV; gzip when the client accepts it."""
+    columns = _EXPORT_COLUMNS + ((Article.draft_markdown, Article.final_markdown) if include_body else ())
+    q = select(*columns).order_by(Article.id)
+    if status:
+        q = q.where(Article.status == status)
+    if cluster_id is not None:
+        q = q.where(Article.cluster_id == cluster_id)
+    if created_from:
+        q = q.where(Article.created_at >= created_from)
+    if created_to:
+        q = q.where(Article.created_at < created_to + timedelta(days=1))
+    return StreamingResponse(
+        stream_export(q, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="articles.{format}"'},
+    )
+
+
+_REPUBLISH_CHUNK = 500
+
+
+@router.post("/republish", response_model=ArticleRepublishResponse)
+def republish_articles(body: ArticleRepublishRequest) -> ArticleRepublishResponse:
+    """Queue every published article in publisher-tilda; pages unchanged since their last publish are skipped there."""
+    q = (
+        select(Article.title, Article.slug, Article.final_markdown, Article.draft_markdown, Article.meta_title,
+               Article.meta_description, Article.schema_json)
+        .where(Article.status == ArticleStatus.PUBLISHED.value, Article.slug != "")
+        .order_by(Article.id)
+    )
+    if body.cluster_id is not None:
+        q = q.where(Article.cluster_id == body.cluster_id)
+    url = f"{get_settings().publisher_tilda_url}/queue"
+    articles = queued = 0
+    with session_scope() as session, httpx.Client(timeout=60.0) as client:
+        for rows in session.execute(q.execution_options(yield_per=_REPUBLISH_CHUNK)).partitions():
+            items = [
+                {
+                    "title": row.title,
+                    "slug": row.slug,
+                    "html_or_markdown": row.final_markdown or row.draft_markdown or "",
+                    "meta_title": row.meta_title,
+                    "meta_description": row.meta_description,
+                    "schema_json": row.schema_json,
+                    "as_draft": False,
+                    "force": body.force,
+                }
+                for row in rows
+            ]
+            try:
+                r = client.post(url, json={"items": items})
+                r.raise_for_status()
+            except httpx.HTTPError as e:
+                raise HTTPException(
+                    status_code=502, detail=f"Publisher queue unavailable after {articles} articles: {e}"
+                )
+            articles += len(items)
+            queued += r.json()["queued"]
+    return ArticleRepublishResponse(articles=articles, queued=queued)
+
+
 @router.get("/{article_id}", response_model=ArticleResponse)
 def get_article(article_id: int) -> ArticleResponse:
     with session_scope() as session:
@@ -43,6 +153,80 @@ def get_article(article_id: int) -> ArticleResponse:
         return ArticleResponse.model_validate(row)
 
 
+def _recheck_quality(article_id: int, text: str, target_keyword: str | None, previous_blocks: list | None) -> dict | None:
+    """Quality gate verdict for the article's current text; unchanged paragraphs are served from its block cache."""
+    import httpx
+
+    try:
+        r = httpx.post(
+            f"{get_settings().quality_gate_url}/check",
+            json={
+                "text": text,
+                "target_keyword": target_keyword,
+                "exclude_article_ids": [article_id],
+                "previous_blocks": previous_blocks,
+            },
+            timeout=30.0,
+        )
+        r.raise_for_status()
+        return r.json()
+    except Exception:
+        return None
+
+
+@router.get("/{article_id}/related")
+def get_related(article_id: int, limit: int = Query(5, ge=1, le=50), min_score: float = Query(0.05, ge=0)) -> dict:
+    """Published articles most similar to this one (candidates for internal links)."""
+    with session_scope() as session:
+        row = session.execute(select(Article).where(Article.id == article_id)).scalars().one_or_none()
+        if not row:
+            raise HTTPException(status_code=404, detail="Article not found")
+        items = related_articles(
+            session, row.final_markdown or row.draft_markdown or "", limit=limit, min_score=min_score,
+            exclude_ids=[article_id],
+        )
+    return {"article_id": article_id, "items": items}
+
+
+@router.patch("/{article_id}", response_model=ArticleResponse)
+def update_article(article_id: int, body: ArticleUpdate) -> ArticleResponse:
+    """Edit a draft / pending article; a text change re-runs the quality check and updates quality_scores."""
+    with session_scope() as session:
+        row = session.execute(select(Article).where(Article.id == article_id)).scalars().one_or_none()
+        if not row:
+            raise HTTPException(status_code=404, detail="Article not found")
+        if row.status not in (ArticleStatus.DRAFT.value, ArticleStatus.PENDING_APPROVAL.value):
+            raise HTTPException(status_code=400, detail=f"Cannot edit article in status {row.status}")
+        changes = body.model_dump(exclude_unset=True, exclude={"recheck"})
+        text_changed = any(
+            key in changes and changes[key] != getattr(row, key)
+            for key in ("draft_markdown", "final_markdown", "target_keyword")
+        )
+        for key, value in changes.items():
+            setattr(row, key, value)
+        session.flush()
+        session.refresh(row)
+        response = ArticleResponse.model_validate(row)
+        checked = (row.final_markdown or row.draft_markdown or "", row.target_keyword)
+        previous_blocks = (row.quality_scores or {}).get("block_hashes")
+    if not (text_changed and body.recheck):
+        return response
+
+    # The gate call runs outside the transaction: no row lock or pooled connection held during HTTP
+    scores = _recheck_quality(article_id, checked[0], checked[1], previous_blocks)
+    if scores is None:
+        return response
+    with session_scope() as session:
+        row = session.execute(select(Article).where(Article.id == article_id).with_for_update()).scalars().one_or_none()
+        # Skip if the text was edited again meanwhile: that edit's own recheck owns quality_scores
+        if row is None or (row.final_markdown or row.draft_markdown or "", row.target_keyword) != checked:
+            return response
+        row.quality_scores = scores
+        session.flush()
+        session.refresh(row)
+        return ArticleResponse.model_validate(row)
+
+
 @router.post("/{article_id}/approve", response_model=ArticleResponse)
 def approve_article(article_id: int, body: ArticleApproveRequest) -> ArticleResponse:
     with session_scope() as session:
@@ -52,6 +236,9 @@ def approve_article(article_id: int, body: ArticleApproveRequest) -> ArticleResp
         if row.status not in (ArticleStatus.DRAFT.value, ArticleStatus.PENDING_APPROVAL.value):
             raise HTTPException(status_code=400, detail=f"Cannot approve article in status {row.status}")
         row.status = ArticleStatus.PUBLISHED.value if body.publish else ArticleStatus.APPROVED.value
+        if body.publish:
+            # Later articles can now link here
+            index_article_vector(session, row.id, row.final_markdown or row.draft_markdown)
         session.flush()
         session.refresh(row)
         return ArticleResponse.model_validate(row)
@@ -1,19 +1,27 @@
-"""Clusters CRUD."""
+"""Clusters CRUD, bulk import and SERP-overlap clustering of raw keywords."""
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException, Query
+import io
+from pathlib import PurePath
+
+from fastapi import APIRouter, File, HTTPException, Query, UploadFile
 from sqlalchemy import select
 from sqlalchemy.orm import joinedload
 
+from libs.common.cluster_import import import_clusters, iter_csv, iter_jsonl
+from libs.common.config import get_settings
 from libs.common.database import session_scope
-from libs.common.models.db_models import Cluster, Keyword
+from libs.common.models.db_models import Cluster, Job, JobStatus, JobType, Keyword
 from libs.common.schemas.clusters import (
+    ClusterAutoRequest,
     ClusterCreate,
+    ClusterImportReport,
     ClusterResponse,
     ClusterUpdate,
     KeywordCreate,
     KeywordResponse,
 )
+from libs.common.schemas.jobs import JobResponse
 
 router = APIRouter()
 
@@ -97,6 +105,52 @@ def create_cluster(body: ClusterCreate) -> ClusterResponse:
         )
 
 
+@router.post("/import", response_model=ClusterImportReport)
+def import_clusters_file(
+    file: UploadFile = File(..., description="JSON lines (one cluster per line) or CSV (one keyword per row)"),
+    format: str | None = Query(None, pattern="^(jsonl|csv)$", description="Default: by file extension"),
+) -> ClusterImportReport:
+    """Bulk upsert clusters by slug and keywords by (cluster, keyword); the file is streamed, not loaded."""
+    fmt = format or ("csv" if PurePath(file.filename or "").suffix.lower() == ".csv" else "jsonl")
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    rows = iter_csv(stream) if fmt == "csv" else iter_jsonl(stream)
+    with session_scope() as session:
+        return import_clusters(session, rows)
+
+
+def enqueue_keyword_clustering(job_id: int) -> str | None:
+    """Enqueue the clustering job in RQ; returns rq_job_id or None if queue unavailable."""
+    try:
+        from redis import Redis
+        from rq import Queue
+        from services.scheduler_worker.tasks import run_keyword_clustering
+        redis = Redis.from_url(get_settings().redis_url)
+        q = Queue("default", connection=redis)
+        job = q.enqueue(run_keyword_clustering, job_id, job_timeout="2h")
+        return job.id
+    except Exception:
+        return None
+
+
+@router.post("/auto", response_model=JobResponse, status_code=202)
+def auto_cluster(body: ClusterAutoRequest) -> JobResponse:
+    """Group raw keywords by shared top SERP URLs: into existing clusters of the region or new proposals."""
+    with session_scope() as session:
+        job = Job(
+            job_type=JobType.KEYWORD_CLUSTERING.value,
+            status=JobStatus.PENDING.value,
+            payload=body.model_dump(),
+        )
+        session.add(job)
+        session.flush()
+        rq_job_id = enqueue_keyword_clustering(job.id)
+        if rq_job_id:
+            job.rq_job_id = rq_job_id
+        session.flush()
+        session.refresh(job)
+        return JobResponse.model_validate(job)
+
+
 @router.patch("/{cluster_id}", response_model=ClusterResponse)
 def update_cluster(cluster_id: int, body: ClusterUpdate) -> ClusterResponse:
     with session_scope() as session:
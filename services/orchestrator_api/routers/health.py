@@ -1,9 +1,17 @@
 """Health check."""
 from fastapi import APIRouter
 
+from libs.common.engine_registry import pool_metrics
+
 router = APIRouter()
 
 
 @router.get("/health")
 def health() -> dict:
     return {"status": "ok", "service": "orchestrator-api"}
+
+
+@router.get("/health/db_pool")
+def db_pool() -> dict:
+    """Connection pool usage: in-use, waiting, overflow, checkout wait time."""
+    return {"service": "orchestrator-api", "pools": pool_metrics()}
@@ -1,13 +1,27 @@
-"""Jobs: POST /jobs/run_daily, GET list, GET job status."""
+"""Jobs: POST /jobs/run_daily, GET list, GET export, GET job status, archival and stats, draft prefetch."""
 from __future__ import annotations
 
+from datetime import date, timedelta
+
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select, func
 
 from libs.common.config import get_settings
 from libs.common.database import session_scope
-from libs.common.models.db_models import Job, JobStatus, JobType
-from libs.common.schemas.jobs import JobListResponse, JobResponse, JobRunDailyRequest
+from libs.common.job_archive import archive_jobs, get_archived_job, job_stats
+from libs.common.models.db_models import BufferedDraft, Job, JobStatus, JobType
+from libs.common.streaming_export import MEDIA_TYPES, ExportFormat, stream_export
+from libs.common.schemas.jobs import (
+    BufferedDraftResponse,
+    DraftPrefetchResponse,
+    JobArchiveResult,
+    JobListResponse,
+    JobResponse,
+    JobRunDailyRequest,
+    JobStatsItem,
+    JobStatsResponse,
+)
 
 router = APIRouter()
 
@@ -62,10 +76,84 @@ def run_daily(body: JobRunDailyRequest | None = None) -> JobResponse:
         return JobResponse.model_validate(job)
 
 
+@router.post("/prefetch_drafts", response_model=DraftPrefetchResponse)
+def prefetch_drafts(force: bool = Query(False, description="Run outside the off-peak window")) -> DraftPrefetchResponse:
+    """Fill the draft buffer (call from cron during off-peak hours; outside them the task does nothing)."""
+    try:
+        from redis import Redis
+        from rq import Queue
+        from services.scheduler_worker.tasks import run_draft_prefetch
+        q = Queue("default", connection=Redis.from_url(get_settings().redis_url))
+        job = q.enqueue(run_draft_prefetch, force=force, job_timeout="2h")
+        return DraftPrefetchResponse(rq_job_id=job.id, queued=True)
+    except Exception:
+        return DraftPrefetchResponse(queued=False)
+
+
+@router.get("/draft_buffer", response_model=list[BufferedDraftResponse])
+def draft_buffer() -> list[BufferedDraftResponse]:
+    """Drafts ready for the daily run (expired ones included until the next prefetch purges them)."""
+    with session_scope() as session:
+        rows = session.execute(select(BufferedDraft).order_by(BufferedDraft.created_at)).scalars().all()
+        return [BufferedDraftResponse.model_validate(r) for r in rows]
+
+
+@router.post("/archive", response_model=JobArchiveResult)
+def archive(
+    older_than_days: int | None = Query(None, ge=0, description="Default: job_retention_days setting"),
+    batch_size: int | None = Query(None, ge=1, le=10_000),
+) -> JobArchiveResult:
+    """Move completed/failed jobs older than the retention age into jobs_archive."""
+    with session_scope() as session:
+        return JobArchiveResult(**archive_jobs(session, older_than_days=older_than_days, batch_size=batch_size))
+
+
+@router.get("/stats", response_model=JobStatsResponse)
+def stats() -> JobStatsResponse:
+    with session_scope() as session:
+        items = [JobStatsItem(**i) for i in job_stats(session)]
+    return JobStatsResponse(
+        items=items,
+        live_total=sum(i.live for i in items),
+        archived_total=sum(i.archived for i in items),
+    )
+
+
+@router.get("/export")
+def export_jobs(
+    format: ExportFormat = Query("ndjson"),
+    status: str | None = Query(None),
+    job_type: str | None = Query(None),
+    created_from: date | None = Query(None, alias="from"),
+    created_to: date | None = Query(None, alias="to", description="Inclusive"),
+) -> StreamingResponse:
+    """Live jobs streamed as NDJSON or CSV (archived ones are in jobs_archive)."""
+    q = select(
+        Job.id, Job.job_type, Job.status, Job.payload, Job.result, Job.error_message,
+        Job.started_at, Job.finished_at, Job.rq_job_id, Job.created_at, Job.updated_at,
+    ).order_by(Job.id)
+    if status:
+        q = q.where(Job.status == status)
+    if job_type:
+        q = q.where(Job.job_type == job_type)
+    if created_from:
+        q = q.where(Job.created_at >= created_from)
+    if created_to:
+        q = q.where(Job.created_at < created_to + timedelta(days=1))
+    return StreamingResponse(
+        stream_export(q, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="jobs.{format}"'},
+    )
+
+
 @router.get("/{job_id}", response_model=JobResponse)
 def get_job(job_id: int) -> JobResponse:
     with session_scope() as session:
         row = session.execute(select(Job).where(Job.id == job_id)).scalars().one_or_none()
-        if not row:
+        if row:
+            return JobResponse.model_validate(row)
+        archived = get_archived_job(session, job_id)
+        if not archived:
             raise HTTPException(status_code=404, detail="Job not found")
-        return JobResponse.model_validate(row)
+        return JobResponse.model_validate(archived)
@@ -0,0 +1,119 @@
+"""Quality rules CRUD: stop phrases, spam markers, legal-claim patterns (compiled by libs.common.quality_rules)."""
+from __future__ import annotations
+
+import time
+
+from fastapi import APIRouter, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from libs.common.database import session_scope
+from libs.common.models.db_models import QualityRule, QualityRuleSeverity
+from libs.common.quality_rules import load_matcher, validate_rule
+from libs.common.schemas.quality_rules import (
+    QualityRuleBulkReport,
+    QualityRuleCreate,
+    QualityRuleResponse,
+    QualityRuleTestRequest,
+    QualityRuleTestResponse,
+    QualityRuleUpdate,
+)
+
+router = APIRouter()
+
+
+@router.get("", response_model=list[QualityRuleResponse])
+def list_rules(
+    category: str | None = None,
+    is_active: bool | None = None,
+    limit: int = Query(1000, ge=1, le=10000),
+    offset: int = Query(0, ge=0),
+) -> list[QualityRuleResponse]:
+    with session_scope() as session:
+        q = select(QualityRule).order_by(QualityRule.id).limit(limit).offset(offset)
+        if category:
+            q = q.where(QualityRule.category == category)
+        if is_active is not None:
+            q = q.where(QualityRule.is_active == is_active)
+        return [QualityRuleResponse.model_validate(r) for r in session.execute(q).scalars().all()]
+
+
+@router.post("", response_model=QualityRuleResponse)
+def create_rule(body: QualityRuleCreate) -> QualityRuleResponse:
+    try:
+        pattern = validate_rule(body.kind, body.pattern)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    with session_scope() as session:
+        exists = session.execute(
+            select(QualityRule.id).where(QualityRule.kind == body.kind, QualityRule.pattern == pattern)
+        ).scalar_one_or_none()
+        if exists:
+            raise HTTPException(status_code=409, detail=f"Rule already exists: {exists}")
+        row = QualityRule(**body.model_dump(exclude={"pattern"}), pattern=pattern)
+        session.add(row)
+        session.flush()
+        session.refresh(row)
+        return QualityRuleResponse.model_validate(row)
+
+
+@router.post("/bulk", response_model=QualityRuleBulkReport)
+def create_rules_bulk(body: list[QualityRuleCreate]) -> QualityRuleBulkReport:
+    """Add many rules in one statement; duplicates are skipped, invalid ones reported by list index."""
+    values, errors = [], []
+    for i, rule in enumerate(body):
+        try:
+            values.append({**rule.model_dump(), "pattern": validate_rule(rule.kind, rule.pattern)})
+        except ValueError as e:
+            errors.append({"index": i, "pattern": rule.pattern, "error": str(e)})
+    created = 0
+    if values:
+        with session_scope() as session:
+            created = len(session.execute(
+                pg_insert(QualityRule).values(values).on_conflict_do_nothing().returning(QualityRule.id)
+            ).all())
+    return QualityRuleBulkReport(created=created, skipped=len(values) - created, errors=errors)
+
+
+@router.post("/test", response_model=QualityRuleTestResponse)
+def test_rules(body: QualityRuleTestRequest) -> QualityRuleTestResponse:
+    """Match text against the current active rules (compiled fresh, without the quality gate's cache delay)."""
+    with session_scope() as session:
+        matcher = load_matcher(session)
+    started = time.perf_counter()
+    matches = matcher.scan(body.text)
+    return QualityRuleTestResponse(
+        rule_matches=matches,
+        blocked_by_rules=any(m["severity"] == QualityRuleSeverity.BLOCK.value for m in matches),
+        rules=matcher.rules,
+        ms=round((time.perf_counter() - started) * 1000, 3),
+    )
+
+
+@router.patch("/{rule_id}", response_model=QualityRuleResponse)
+def update_rule(rule_id: int, body: QualityRuleUpdate) -> QualityRuleResponse:
+    with session_scope() as session:
+        row = session.execute(select(QualityRule).where(QualityRule.id == rule_id)).scalars().one_or_none()
+        if not row:
+            raise HTTPException(status_code=404, detail="Rule not found")
+        changes = body.model_dump(exclude_unset=True)
+        if changes.get("pattern") is not None:
+            try:
+                changes["pattern"] = validate_rule(row.kind, changes["pattern"])
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        for key, value in changes.items():
+            if value is not None:
+                setattr(row, key, value)
+        session.flush()
+        session.refresh(row)
+        return QualityRuleResponse.model_validate(row)
+
+
+@router.delete("/{rule_id}", status_code=204)
+def delete_rule(rule_id: int) -> None:
+    with session_scope() as session:
+        row = session.execute(select(QualityRule).where(QualityRule.id == rule_id)).scalars().one_or_none()
+        if not row:
+            raise HTTPException(status_code=404, detail="Rule not found")
+        session.delete(row)
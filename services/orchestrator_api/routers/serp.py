@@ -0,0 +1,66 @@
+"""SERP snapshot history: record fetches, rebuild past states, changes and volatility since a date."""
+from __future__ import annotations
+
+from datetime import datetime
+
+from fastapi import APIRouter, HTTPException, Query
+
+from libs.common.database import session_scope
+from libs.common.schemas.serp import (
+    SerpChangeResponse,
+    SerpSnapshotCreate,
+    SerpSnapshotRecorded,
+    SerpSnapshotResponse,
+    SerpVolatilityResponse,
+)
+from libs.common.serp_history import changes_since, history, record_snapshot, volatility
+
+router = APIRouter()
+
+
+@router.post("/snapshots", response_model=SerpSnapshotRecorded)
+def create_snapshot(body: SerpSnapshotCreate) -> SerpSnapshotRecorded:
+    """Record one SERP fetch (the pipeline records its own); unchanged results add no row."""
+    with session_scope() as session:
+        return SerpSnapshotRecorded(**record_snapshot(session, body.model_dump(), fetched_at=body.fetched_at))
+
+
+@router.get("/history", response_model=list[SerpSnapshotResponse])
+def get_history(
+    query: str,
+    region: str = "moscow",
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+) -> list[SerpSnapshotResponse]:
+    """Full SERP states, oldest first (the state in effect at `since` comes first)."""
+    if since and until and since > until:
+        raise HTTPException(status_code=400, detail="since must not be after until")
+    with session_scope() as session:
+        states = history(session, query, region, since=since, until=until, limit=limit)
+    if not states:
+        raise HTTPException(status_code=404, detail="No snapshots for this query and region")
+    return [SerpSnapshotResponse(**s) for s in states]
+
+
+@router.get("/changes", response_model=list[SerpChangeResponse])
+def get_changes(
+    since: datetime,
+    query: str | None = None,
+    region: str | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+) -> list[SerpChangeResponse]:
+    """Deltas after `since`, newest first; all keywords unless query is given."""
+    with session_scope() as session:
+        return [SerpChangeResponse(**c) for c in changes_since(session, since, query=query, region=region, limit=limit)]
+
+
+@router.get("/volatility", response_model=list[SerpVolatilityResponse])
+def get_volatility(
+    since: datetime,
+    region: str | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+) -> list[SerpVolatilityResponse]:
+    """Keywords whose SERP changed most after `since`."""
+    with session_scope() as session:
+        return [SerpVolatilityResponse(**v) for v in volatility(session, since, region=region, limit=limit)]
@@ -1,38 +1,260 @@
-"""Publisher Tilda: draft/publish via API (interface + stub)."""
+"""Publisher Tilda: render markdown to HTML (cached by content hash), draft/publish via API (interface + stub).
+
+Bulk publishing goes through a durable queue (see libs.common.publish_queue) drained by a background
+worker at the Tilda API rate limit; unchanged pages are skipped both there and in /publish.
+"""
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
-from fastapi import FastAPI
-from pydantic import BaseModel
-from libs.common.clients.tilda import TildaStubClient, TildaPublishRequest
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, Literal
 
-app = FastAPI(title="Publisher Tilda")
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel, Field
+from libs.common.clients.tilda import TildaPublisherInterface, TildaStubClient, TildaPublishRequest, TildaThrottledError
+from libs.common.config import get_settings
+from libs.common.database import session_scope
+from libs.common.logging import get_logger
+from libs.common.markdown_render import get_render_cache, json_ld, render_cached
+from libs.common.publish_queue import (
+    claim_batch,
+    enqueue,
+    finish_batch,
+    get_task,
+    last_published,
+    publish_hash,
+    queue_stats,
+    record_published,
+)
+from libs.common.rate_limit import TokenBucket, backoff_delay
 
+logger = get_logger(__name__)
 
-class PublishRequest(BaseModel):
-    title: str
-    slug: str
+tilda: TildaPublisherInterface = TildaStubClient()
+bucket: TokenBucket | None = None  # every Tilda call of this process, queue worker and /publish alike
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
+    global bucket
+    settings = get_settings()
+    bucket = TokenBucket(settings.tilda_qps, settings.tilda_burst or None)
+    stop = asyncio.Event()
+    worker = asyncio.create_task(_queue_worker(stop))
+    yield
+    stop.set()
+    await worker
+
+
+app = FastAPI(title="Publisher Tilda", lifespan=lifespan)
+
+
+class RenderRequest(BaseModel):
+    title: str | None = None
     html_or_markdown: str
-    meta_title: str | None = None
+    content_format: Literal["markdown", "html"] = Field(
+        default="markdown", description="html is sent as is (only JSON-LD is appended)"
+    )
     meta_description: str | None = None
+    schema_json: dict[str, Any] | None = Field(default=None, description="schema.org object, embedded as JSON-LD")
+
+
+class PublishRequest(RenderRequest):
+    title: str
+    slug: str = Field(..., min_length=1, max_length=512)
+    meta_title: str | None = None
     as_draft: bool = True
+    force: bool = Field(default=False, description="Send to Tilda even if unchanged since the last publish")
 
 
-@app.get("/health")
-def health() -> dict:
-    return {"status": "ok", "service": "publisher-tilda"}
+class QueueRequest(BaseModel):
+    items: list[PublishRequest] = Field(..., min_length=1, max_length=20000)
 
 
-@app.post("/publish")
-def publish(body: PublishRequest) -> dict:
+def _render(body: RenderRequest) -> dict:
+    started = time.perf_counter()
+    if body.content_format == "html":
+        html, content_hash, cached = body.html_or_markdown + json_ld(body.schema_json, body.title, body.meta_description), None, False
+    else:
+        html, content_hash, cached = render_cached(body.html_or_markdown, body.schema_json, body.title, body.meta_description)
+    return {
+        "html": html,
+        "content_hash": content_hash,
+        "cached": cached,
+        "render_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+
+
+def _send(body: PublishRequest) -> dict:
+    """Render and create/update the page in Tilda (blocking)."""
+    rendered = _render(body)
     req = TildaPublishRequest(
         title=body.title,
         slug=body.slug,
-        html_or_markdown=body.html_or_markdown,
+        html_or_markdown=rendered["html"],
         meta_title=body.meta_title,
         meta_description=body.meta_description,
         as_draft=body.as_draft,
     )
-    res = TildaStubClient().publish(req)
-    return {"page_id": res.page_id, "url": res.url, "is_draft": res.is_draft}
+    res = tilda.publish(req)
+    return {
+        "page_id": res.page_id,
+        "url": res.url,
+        "is_draft": res.is_draft,
+        "content_hash": rendered["content_hash"],
+        "render_cached": rendered["cached"],
+    }
+
+
+def _last_published(slugs: list[str]) -> dict[str, dict[str, Any]]:
+    with session_scope() as session:
+        return last_published(session, slugs)
+
+
+def _record_published(page: dict[str, Any]) -> None:
+    with session_scope() as session:
+        record_published(session, [page])
+
+
+# --- Queue worker ---
+async def _publish_task(task: dict[str, Any], published: dict[str, dict[str, Any]], outcome: dict[str, list]) -> None:
+    settings = get_settings()
+    body = PublishRequest.model_validate(task["payload"])
+    h = publish_hash(task["payload"])
+    last = published.get(body.slug)
+    if last and last["content_hash"] == h and not body.force:
+        page = {k: last[k] for k in ("page_id", "url", "is_draft")}
+        outcome["skipped"].append({"id": task["id"], "result": {**page, "unchanged": True}})
+        return
+    await bucket.acquire()
+    try:
+        sent = await asyncio.to_thread(_send, body)
+    except Exception as e:
+        delay = backoff_delay(task["attempts"], settings.publish_backoff_base_seconds)
+        if isinstance(e, TildaThrottledError):
+            delay = e.retry_after if e.retry_after is not None else delay
+            bucket.pause(delay)  # every worker call would hit the same limit
+        logger.warning("tilda_publish_failed", task_id=task["id"], slug=body.slug, attempt=task["attempts"], error=str(e))
+        if task["attempts"] >= settings.publish_max_attempts:
+            outcome["failed"].append({"id": task["id"], "error": str(e)})
+        else:
+            outcome["retry"].append({"id": task["id"], "slug": body.slug, "error": str(e), "delay": delay})
+        return
+    result = {k: sent[k] for k in ("page_id", "url", "is_draft")}
+    published[body.slug] = {"content_hash": h, **result}
+    outcome["done"].append({"id": task["id"], "slug": body.slug, "content_hash": h, "result": result})
+
+
+async def _process_batch() -> int:
+    """Claim, publish and finish one batch; the number of tasks claimed."""
+    settings = get_settings()
+
+    def claim() -> tuple[list[dict[str, Any]], dict[str, dict[str, Any]]]:
+        with session_scope() as session:
+            tasks = claim_batch(session, settings.publish_batch_size, settings.publish_stale_seconds)
+            return tasks, last_published(session, list({t["slug"] for t in tasks}))
+
+    tasks, published = await asyncio.to_thread(claim)
+    if not tasks:
+        return 0
+    by_slug: dict[str, list[dict[str, Any]]] = {}
+    for task in tasks:  # claimed oldest first
+        by_slug.setdefault(task["slug"], []).append(task)
+    outcome: dict[str, list] = {"done": [], "skipped": [], "retry": [], "failed": []}
+
+    async def run(slug_tasks: list[dict[str, Any]]) -> None:
+        for task in slug_tasks:  # one page's tasks in order, so the newest payload lands last
+            await _publish_task(task, published, outcome)
+
+    # Pages in parallel: the bucket, not call latency, sets the pace
+    await asyncio.gather(*(run(slug_tasks) for slug_tasks in by_slug.values()))
+
+    def finish() -> None:
+        with session_scope() as session:
+            finish_batch(session, **outcome)
+
+    await asyncio.to_thread(finish)
+    logger.info("publish_batch_finished", **{k: len(v) for k, v in outcome.items()})
+    return len(tasks)
+
+
+async def _queue_worker(stop: asyncio.Event) -> None:
+    poll = get_settings().publish_poll_seconds
+    while not stop.is_set():
+        try:
+            claimed = await _process_batch()
+        except Exception as e:  # DB unavailable etc.: claimed tasks are reclaimed once stale
+            logger.warning("publish_queue_error", error=str(e))
+            claimed = 0
+        if not claimed:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=poll)
+            except asyncio.TimeoutError:
+                pass
+
+
+@app.get("/health")
+def health() -> dict:
+    return {"status": "ok", "service": "publisher-tilda"}
+
+
+@app.post("/render")
+def render(body: RenderRequest) -> dict:
+    """Preview: the HTML that /publish would send."""
+    return {**_render(body), "cache": get_render_cache().stats()}
+
+
+@app.post("/publish")
+async def publish(body: PublishRequest) -> dict:
+    """Publish one page now (rate-limited with the queue); unchanged pages are not sent again."""
+    payload = body.model_dump()
+    h = publish_hash(payload)
+    last = (await asyncio.to_thread(_last_published, [body.slug])).get(body.slug)
+    if last and last["content_hash"] == h and not body.force:
+        return {
+            "page_id": last["page_id"],
+            "url": last["url"],
+            "is_draft": last["is_draft"],
+            "content_hash": None,
+            "render_cached": False,
+            "skipped": True,
+        }
+    await bucket.acquire()
+    try:
+        res = await asyncio.to_thread(_send, body)
+    except TildaThrottledError as e:
+        bucket.pause(e.retry_after or backoff_delay(1, get_settings().publish_backoff_base_seconds))
+        raise HTTPException(status_code=429, detail="Tilda API rate limit; retry later or use /queue")
+    await asyncio.to_thread(_record_published, {
+        "slug": body.slug, "page_id": res["page_id"], "url": res["url"], "is_draft": res["is_draft"], "content_hash": h,
+    })
+    return {**res, "skipped": False}
+
+
+@app.post("/queue", status_code=202)
+def queue(body: QueueRequest) -> dict:
+    """Queue pages for publishing (a pending task of the same slug gets the new payload)."""
+    with session_scope() as session:
+        ids = enqueue(session, [item.model_dump() for item in body.items])
+    return {"queued": len(set(ids)), "task_ids": ids}
+
+
+@app.get("/queue/stats")
+def queue_stats_endpoint() -> dict:
+    with session_scope() as session:
+        stats = queue_stats(session)
+    settings = get_settings()
+    pending = stats["by_status"]["pending"] + stats["by_status"]["processing"]
+    return {**stats, "tilda_qps": settings.tilda_qps, "eta_seconds": round(pending / settings.tilda_qps)}
+
+
+@app.get("/queue/{task_id}")
+def queue_task(task_id: int) -> dict:
+    with session_scope() as session:
+        task = get_task(session, task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
@@ -1,17 +1,46 @@
-"""Quality Gate: spam/keyword stuffing/length; uniqueness (interface + stub)."""
+"""Quality Gate: keyword stuffing and text metrics, length; uniqueness against our own articles (MinHash LSH)."""
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator
+
 from fastapi import FastAPI
-from pydantic import BaseModel
-from libs.common.clients.antiplagiat import AntiPlagiatStubClient
+from pydantic import BaseModel, Field
+from libs.common.clients.antiplagiat import get_antiplagiat_client
+from libs.common.database import session_scope
+from libs.common.minhash_index import index_article, reindex_articles
+from libs.common.quality_check import build_verdict, check_batch as run_check_batch, rescore_articles, shutdown_pool
+from libs.common.text_metrics import analyze_text
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
+    yield
+    shutdown_pool()
 
-app = FastAPI(title="Quality Gate")
+
+app = FastAPI(title="Quality Gate", lifespan=lifespan)
 
 
 class CheckRequest(BaseModel):
     text: str
+    target_keyword: str | None = None
+    exclude_article_ids: list[int] = Field(default_factory=list, description="E.g. the article being re-checked")
+    previous_blocks: list[str] | None = Field(
+        default=None, description="block_hashes of the previous check; the response then lists changed_blocks"
+    )
+
+
+class CheckBatchRequest(BaseModel):
+    items: list[CheckRequest] = Field(..., min_length=1, max_length=1000)
+
+
+class IndexRequest(BaseModel):
+    article_id: int
+    text: str
 
 
 @app.get("/health")
@@ -21,12 +50,44 @@ def health() -> dict:
 
 @app.post("/check")
 def check(body: CheckRequest) -> dict:
-    result = AntiPlagiatStubClient().check(body.text)
-    length_ok = 500 <= len(body.text) <= 50000
+    result = get_antiplagiat_client().check(body.text, exclude_ids=body.exclude_article_ids)
+    return build_verdict(body.text, analyze_text(body.text, body.target_keyword), result, body.previous_blocks)
+
+
+@app.post("/check_batch")
+def check_batch(body: CheckBatchRequest) -> dict:
+    """Same as /check for many texts: CPU work fans out to a process pool, results keep input order."""
+    started = time.perf_counter()
+    results = run_check_batch(
+        [(item.text, item.target_keyword) for item in body.items],
+        exclude_ids=[item.exclude_article_ids for item in body.items],
+        previous_blocks=[item.previous_blocks for item in body.items],
+    )
     return {
-        "pass": result.pass_ and length_ok,
-        "uniqueness": result.score,
-        "keyword_stuffing": False,
-        "length_ok": length_ok,
-        "details": result.details or "stub",
+        "results": results,
+        "passed": sum(1 for r in results if r["pass"]),
+        "total_ms": round((time.perf_counter() - started) * 1000, 1),
     }
+
+
+@app.post("/rescore")
+def rescore(status: str | None = None, batch_size: int = 200) -> dict:
+    """Re-check stored articles (e.g. after threshold changes) and bulk-update articles.quality_scores."""
+    with session_scope() as session:
+        return rescore_articles(session, batch_size=batch_size, status=status)
+
+
+@app.post("/index")
+def index(body: IndexRequest) -> dict:
+    """Add or replace one article in the uniqueness index."""
+    with session_scope() as session:
+        indexed = index_article(session, body.article_id, body.text)
+    return {"article_id": body.article_id, "indexed": indexed}
+
+
+@app.post("/index/rebuild")
+def index_rebuild(only_missing: bool = True) -> dict:
+    """Backfill the uniqueness index from stored articles (only_missing=false recomputes all)."""
+    with session_scope() as session:
+        indexed = reindex_articles(session, only_missing=only_missing)
+    return {"indexed": indexed}
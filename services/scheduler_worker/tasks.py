@@ -11,16 +11,27 @@ from sqlalchemy import select
 
 from libs.common.config import get_settings
 from libs.common.database import session_scope
+from libs.common.draft_buffer import (
+    cluster_keyword,
+    clusters_to_prefetch,
+    in_window,
+    pipeline_clusters,
+    purge_expired,
+    store_draft,
+    take_draft,
+)
 from libs.common.runtime_settings import get_moscow_share, get_publish_mode
 from libs.common.models.db_models import (
     Article,
     ArticleStatus,
-    Cluster,
     Job,
     JobStatus,
-    Keyword,
 )
 from libs.common.logging import get_logger
+from libs.common.internal_links import index_article_vector, link_article, save_links
+from libs.common.lsi import add_documents
+from libs.common.minhash_index import index_article
+from libs.common.serp_history import record_snapshot
 
 logger = get_logger(__name__)
 
@@ -47,44 +58,37 @@ def run_daily_pipeline(dry_run: bool = False) -> dict:
 
     try:
         with session_scope() as session:
-            moscow = list(session.execute(
-                select(Cluster).where(Cluster.region == "moscow", Cluster.is_active == True).order_by(Cluster.priority.desc())
-            ).scalars().all())
-            rf = list(session.execute(
-                select(Cluster).where(Cluster.region == "rf", Cluster.is_active == True).order_by(Cluster.priority.desc())
-            ).scalars().all())
-            if not moscow and not rf:
+            # Same choice as the draft prefetch: top cluster of a region, Moscow with probability moscow_share
+            top = pipeline_clusters(session)
+            if not top:
                 raise ValueError("No active clusters")
             import random
             moscow_share = get_moscow_share()
-            if moscow and (not rf or random.random() < moscow_share):
-                cluster = moscow[0]
+            if "moscow" in top and ("rf" not in top or random.random() < moscow_share):
+                cluster = top["moscow"]
             else:
-                cluster = rf[0]
+                cluster = top["rf"]
             cluster_id = cluster.id
             cluster_name = cluster.name
             cluster_slug = cluster.slug
             cluster_region = cluster.region
-            keywords = list(session.execute(select(Keyword).where(Keyword.cluster_id == cluster_id)).scalars().all())
-            target_keyword = keywords[0].keyword if keywords else cluster_name
-
-        # 1) SERP (structure only)
-        serp_data = _call_serp_intel(target_keyword, cluster_region)
-        logger.info("event", event="serp.analyzed", job_id=job_id, keyword=target_keyword)
-        # 2) Content draft
-        draft_markdown = _call_content_gen(
-            topic=cluster_name,
-            target_keyword=target_keyword,
-            region=cluster_region,
-            suggested_structure=serp_data.get("suggested_structure", {}),
-            intent_summary=serp_data.get("intent_summary", ""),
-        )
-        logger.info("event", event="content.drafted", job_id=job_id)
+            target_keyword = cluster_keyword(session, cluster)
+
+        # 1-2) Draft prefetched off-peak, else SERP (structure only) + content draft now
+        with session_scope() as session:
+            buffered = take_draft(session, cluster_id)
+        if buffered:
+            target_keyword = buffered["target_keyword"]
+            serp_data = buffered["serp_data"] or {}
+            draft_markdown = buffered["draft_markdown"]
+            logger.info("event", event="content.buffered", job_id=job_id, drafted_at=buffered["created_at"].isoformat())
+        else:
+            serp_data, draft_markdown = _serp_and_draft(cluster_name, target_keyword, cluster_region, job_id)
         # 3) SEO optimizer
-        seo_result = _call_seo_optimizer(draft_markdown, target_keyword)
+        seo_result = _call_seo_optimizer(draft_markdown, target_keyword, serp_data.get("items", []))
         logger.info("event", event="seo.enriched", job_id=job_id)
         # 4) Quality gate
-        quality_result = _call_quality_gate(seo_result.get("final_markdown", draft_markdown))
+        quality_result = _call_quality_gate(seo_result.get("final_markdown", draft_markdown), target_keyword)
         if not quality_result.get("pass", True):
             logger.warning("event", event="quality.failed", job_id=job_id, scores=quality_result)
             with session_scope() as session:
@@ -97,6 +101,9 @@ def run_daily_pipeline(dry_run: bool = False) -> dict:
         logger.info("event", event="quality.passed", job_id=job_id)
 
         final_markdown = seo_result.get("final_markdown", draft_markdown)
+        # Links to related published articles (anchors on mentions, else "Читайте также")
+        with session_scope() as session:
+            final_markdown, internal_links = link_article(session, final_markdown)
         meta_title = seo_result.get("meta_title", "")
         meta_description = seo_result.get("meta_description", "")
         faq_json = seo_result.get("faq_json")
@@ -112,6 +119,7 @@ def run_daily_pipeline(dry_run: bool = False) -> dict:
             meta_title=meta_title,
             meta_description=meta_description,
             as_draft=not do_publish,
+            schema_json=schema_json,
         )
         logger.info("event", event="tilda.published" if do_publish else "tilda.drafted", job_id=job_id)
 
@@ -136,9 +144,23 @@ def run_daily_pipeline(dry_run: bool = False) -> dict:
             )
             session.add(article)
             session.flush()
+            # Later drafts are checked for near-duplicates against this one
+            index_article(session, article.id, final_markdown)
+            # ...and get LSI context (term corpus document frequencies) from it
+            add_documents(session, [(f"article:{article.id}", "article", final_markdown)])
+            save_links(session, article.id, internal_links)
+            if do_publish:
+                index_article_vector(session, article.id, final_markdown)
             job.status = JobStatus.COMPLETED.value
             job.finished_at = datetime.utcnow()
-            job.result = {"article_id": article.id, "published": do_publish}
+            job.result = {
+                "article_id": article.id,
+                "published": do_publish,
+                "lsi_terms": seo_result.get("lsi_terms"),
+                "lsi_coverage": seo_result.get("lsi_coverage"),
+                "internal_links": len(internal_links),
+                "draft_buffered": buffered is not None,
+            }
             session.flush()
             result["article_id"] = article.id
             result["cluster_id"] = cluster_id
@@ -158,6 +180,184 @@ def run_daily_pipeline(dry_run: bool = False) -> dict:
     return {"job_id": job_id, **result}
 
 
+def _serp_and_draft(cluster_name: str, target_keyword: str, region: str, job_id: int | None = None) -> tuple[dict, str]:
+    """SERP analysis (recorded in the snapshot history) and an LLM draft built on it."""
+    serp_data = _call_serp_intel(target_keyword, region)
+    logger.info("event", event="serp.analyzed", job_id=job_id, keyword=target_keyword)
+    if serp_data.get("items"):
+        with session_scope() as session:
+            record_snapshot(session, {"query": target_keyword, "region": region, **serp_data})
+    draft_markdown = _call_content_gen(
+        topic=cluster_name,
+        target_keyword=target_keyword,
+        region=region,
+        suggested_structure=serp_data.get("suggested_structure", {}),
+        intent_summary=serp_data.get("intent_summary", ""),
+    )
+    logger.info("event", event="content.drafted", job_id=job_id)
+    return serp_data, draft_markdown
+
+
+def run_draft_prefetch(force: bool = False) -> dict:
+    """Off-peak: fill the draft buffer for the clusters the daily pipeline picks next."""
+    settings = get_settings()
+    if not force and not in_window(settings.draft_prefetch_hours, settings.draft_prefetch_timezone):
+        logger.info("draft_prefetch_skipped", reason="peak_hours", window=settings.draft_prefetch_hours)
+        return {"skipped": "peak_hours", "generated": 0}
+    with session_scope() as session:
+        purged = purge_expired(session)
+        clusters = clusters_to_prefetch(session, settings.draft_buffer_size, get_moscow_share())
+    generated = 0
+    for cluster in clusters:
+        try:
+            serp_data, draft_markdown = _serp_and_draft(cluster["name"], cluster["keyword"], cluster["region"])
+        except Exception as e:  # one failing cluster does not stop the rest
+            logger.warning("draft_prefetch_failed", cluster_id=cluster["id"], error=str(e))
+            continue
+        with session_scope() as session:
+            store_draft(
+                session, cluster["id"], cluster["keyword"], cluster["region"], serp_data, draft_markdown,
+                settings.draft_buffer_ttl_hours,
+            )
+        generated += 1
+    logger.info("draft_prefetch_done", generated=generated, purged=purged)
+    return {"generated": generated, "purged": purged}
+
+
+def run_performance_maintenance() -> dict:
+    """Create upcoming monthly partitions of performance and retire ones past retention."""
+    from libs.common.performance_partitions import apply_retention, ensure_future_partitions
+
+    with session_scope() as session:
+        created = ensure_future_partitions(session)
+        retired = apply_retention(session)
+    logger.info("performance_maintenance_done", created=created, retired=retired)
+    return {"created": created, "retired": retired}
+
+
+def run_job_archival() -> dict:
+    """Move completed/failed jobs past retention into jobs_archive (batched)."""
+    from libs.common.job_archive import archive_jobs
+
+    with session_scope() as session:
+        result = archive_jobs(session)
+    return {"archived": result["archived"], "batches": result["batches"]}
+
+
+def run_quality_rescore(status: str | None = None) -> dict:
+    """Re-run quality checks over stored articles and refresh articles.quality_scores."""
+    from libs.common.quality_check import rescore_articles, shutdown_pool
+
+    try:
+        with session_scope() as session:
+            return rescore_articles(session, status=status)
+    finally:
+        shutdown_pool()
+
+
+def run_link_index_rebuild() -> dict:
+    """Rebuild the internal-linking vectors of all published articles."""
+    from libs.common.internal_links import reindex_published
+
+    with session_scope() as session:
+        return {"indexed": reindex_published(session)}
+
+
+def run_keyword_clustering(job_id: int) -> dict:
+    """Cluster a job's raw keywords by SERP overlap, fetching SERPs not stored yet; report goes to job.result."""
+    from libs.common.keyword_clustering import (
+        center_keywords,
+        cluster_keywords,
+        keywords_without_serp,
+        normalize_keyword,
+    )
+
+    settings = get_settings()
+    with session_scope() as session:
+        job = session.execute(select(Job).where(Job.id == job_id)).scalars().one()
+        job.status = JobStatus.RUNNING.value
+        job.started_at = datetime.utcnow()
+        payload = dict(job.payload or {})
+    region = payload.get("region") or "moscow"
+    try:
+        if payload.get("fetch_missing", True):
+            with session_scope() as session:
+                # Existing cluster centers too: without their SERPs new keywords cannot join those clusters
+                # (seeded clusters, or pipeline snapshots stored under another keyword)
+                wanted = [normalize_keyword(k["keyword"]) for k in payload.get("keywords", [])]
+                missing = keywords_without_serp(session, wanted + center_keywords(session, region), region)
+            if missing:
+                logger.info("clustering_fetching_serps", job_id=job_id, keywords=len(missing))
+                _fetch_serps(missing, region)
+        with session_scope() as session:
+            report = cluster_keywords(
+                session,
+                payload.get("keywords", []),
+                region,
+                top_n=payload.get("top_n") or settings.cluster_top_n,
+                min_overlap=payload.get("min_overlap") or settings.cluster_min_overlap,
+                max_url_keywords=settings.cluster_max_url_keywords,
+                apply=bool(payload.get("apply")),
+            )
+            job = session.execute(select(Job).where(Job.id == job_id)).scalars().one()
+            job.status = JobStatus.COMPLETED.value
+            job.finished_at = datetime.utcnow()
+            job.result = report
+    except Exception as e:
+        logger.exception("keyword_clustering_failed", job_id=job_id)
+        with session_scope() as session:
+            job = session.execute(select(Job).where(Job.id == job_id)).scalars().one()
+            job.status = JobStatus.FAILED.value
+            job.finished_at = datetime.utcnow()
+            job.error_message = str(e)
+        raise
+    return {
+        "job_id": job_id,
+        "assigned": len(report["assigned"]),
+        "new_clusters": len(report["new_clusters"]),
+        "unresolved": len(report["unresolved"]),
+    }
+
+
+def _fetch_serps(keywords: list[str], region: str, request_size: int = 20000, commit_every: int = 500) -> int:
+    """Fetch SERPs through serp-intel /analyze_batch (NDJSON as they complete) and record them as snapshots."""
+    import json
+
+    import httpx
+
+    recorded = 0
+    url = f"{get_settings().serp_intel_url}/analyze_batch"
+    for start in range(0, len(keywords), request_size):
+        items = [{"query": kw, "region": region} for kw in keywords[start:start + request_size]]
+        pending: list[dict] = []
+        try:
+            with httpx.stream("POST", url, json={"items": items}, timeout=httpx.Timeout(30.0, read=None)) as r:
+                r.raise_for_status()
+                for line in r.iter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    if data.get("status") == "ok":
+                        pending.append(data["analysis"])
+                    if len(pending) >= commit_every:
+                        recorded += _record_snapshots(pending)
+                        pending = []
+        except httpx.HTTPError as e:  # keep what arrived; keywords without a SERP are reported as unresolved
+            logger.warning("serp_batch_fetch_failed", error=str(e), recorded=recorded)
+            recorded += _record_snapshots(pending)
+            break
+        recorded += _record_snapshots(pending)
+    return recorded
+
+
+def _record_snapshots(analyses: list[dict]) -> int:
+    if analyses:
+        with session_scope() as session:
+            for analysis in analyses:
+                record_snapshot(session, analysis)
+    return len(analyses)
+
+
 def _call_serp_intel(keyword: str, region: str) -> dict:
     """Call serp-intel service or use stub."""
     try:
@@ -214,13 +414,13 @@ def _call_content_gen(
         )
 
 
-def _call_seo_optimizer(draft_markdown: str, target_keyword: str) -> dict:
+def _call_seo_optimizer(draft_markdown: str, target_keyword: str, serp_items: list[dict] | None = None) -> dict:
     """Call seo-optimizer service or return draft as-is."""
     try:
         import httpx
         r = httpx.post(
             f"{get_settings().seo_optimizer_url}/optimize",
-            json={"draft_markdown": draft_markdown, "target_keyword": target_keyword},
+            json={"draft_markdown": draft_markdown, "target_keyword": target_keyword, "serp_items": serp_items or []},
             timeout=60.0,
         )
         r.raise_for_status()
@@ -235,13 +435,13 @@ def _call_seo_optimizer(draft_markdown: str, target_keyword: str) -> dict:
         }
 
 
-def _call_quality_gate(text: str) -> dict:
+def _call_quality_gate(text: str, target_keyword: str | None = None) -> dict:
     """Call quality-gate service or stub."""
     try:
         import httpx
         r = httpx.post(
             f"{get_settings().quality_gate_url}/check",
-            json={"text": text},
+            json={"text": text, "target_keyword": target_keyword},
             timeout=30.0,
         )
         r.raise_for_status()
@@ -257,6 +457,7 @@ def _call_publisher_tilda(
     meta_title: str,
     meta_description: str,
     as_draft: bool,
+    schema_json: dict | None = None,
 ) -> dict:
     """Call publisher-tilda or stub."""
     try:
@@ -270,6 +471,7 @@ def _call_publisher_tilda(
                 "meta_title": meta_title,
                 "meta_description": meta_description,
                 "as_draft": as_draft,
+                "schema_json": schema_json,
             },
             timeout=30.0,
         )
@@ -1,17 +1,43 @@
-"""SEO Optimizer: semantics, LSI, meta, FAQ, schema_json (stub)."""
+"""SEO Optimizer: LSI terms (TF-IDF over SERP snippets + our corpus), meta, FAQ, schema_json."""
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
 from fastapi import FastAPI
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from libs.common.config import get_settings
+from libs.common.database import session_scope
+from libs.common.logging import get_logger
+from libs.common.lsi import (
+    TermModel,
+    add_documents,
+    get_term_model,
+    rebuild_article_corpus,
+    serp_document_key,
+    suggest_terms,
+)
+
+logger = get_logger(__name__)
 
 app = FastAPI(title="SEO Optimizer")
 
 
+class SerpItem(BaseModel):
+    title: str = ""
+    snippet: str = ""
+    url: str = ""
+
+
 class OptimizeRequest(BaseModel):
     draft_markdown: str
     target_keyword: str
+    serp_items: list[SerpItem] = Field(default_factory=list, description="serp-intel /analyze items")
+
+
+class CorpusDocumentRequest(BaseModel):
+    article_id: int
+    text: str
 
 
 @app.get("/health")
@@ -19,12 +45,53 @@ def health() -> dict:
     return {"status": "ok", "service": "seo-optimizer"}
 
 
+def _lsi(body: OptimizeRequest) -> dict:
+    settings = get_settings()
+    serp_texts = [f"{i.title}\n{i.snippet}" for i in body.serp_items]
+    try:
+        with session_scope() as session:
+            # SERP snippets join the corpus incrementally (df +1 per new term), then the model pulls the change
+            if body.serp_items:
+                add_documents(
+                    session, [(serp_document_key(i.url, i.title), "serp", t) for i, t in zip(body.serp_items, serp_texts)]
+                )
+            model = get_term_model(session, force=bool(body.serp_items))
+            return suggest_terms(
+                model, body.target_keyword, body.draft_markdown, serp_texts, session=session,
+                limit=settings.lsi_terms_limit, context_articles=settings.lsi_context_articles,
+            )
+    except Exception as e:  # no DB: SERP-only suggestions with flat IDF
+        logger.warning("lsi_corpus_unavailable", error=str(e))
+        return suggest_terms(TermModel(), body.target_keyword, body.draft_markdown, serp_texts, limit=settings.lsi_terms_limit)
+
+
 @app.post("/optimize")
 def optimize(body: OptimizeRequest) -> dict:
+    lsi = _lsi(body)
     return {
         "final_markdown": body.draft_markdown,
         "meta_title": body.target_keyword[:60],
         "meta_description": (body.target_keyword + " — материал для B2B.")[:160],
         "faq_json": None,
         "schema_json": {"@type": "Article"},
+        "lsi_terms": lsi["terms"],
+        "lsi_coverage": lsi["coverage"],
+        "lsi_context_documents": lsi["context_documents"],
     }
+
+
+@app.post("/corpus/documents")
+def corpus_documents(body: CorpusDocumentRequest) -> dict:
+    """Add or replace one article in the term corpus."""
+    with session_scope() as session:
+        added = add_documents(session, [(f"article:{body.article_id}", "article", body.text)])
+    return {"article_id": body.article_id, "added": added}
+
+
+@app.post("/corpus/rebuild")
+def corpus_rebuild() -> dict:
+    """Backfill the term corpus from stored articles (incremental: unchanged articles do not change df)."""
+    with session_scope() as session:
+        articles = rebuild_article_corpus(session)
+        model = get_term_model(session, force=True)
+    return {"articles": articles, "terms": len(model.df), "documents": model.documents}
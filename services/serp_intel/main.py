@@ -1,21 +1,39 @@
-"""SERP Intel: analyze SERP for structure/intent only (stub + interface)."""
+"""SERP Intel: analyze SERP for structure/intent only (stub + interface); batches within provider limits."""
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
-from fastapi import FastAPI, Query
+import json
+import time
+from typing import AsyncIterator
+
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 from libs.common.clients.serp import SerpStubClient, SerpAnalysis
+from libs.common.serp_batch import analyze_batch as run_analyze_batch, get_limiter
 
 app = FastAPI(title="SERP Intel")
 
 
+class SerpQuery(BaseModel):
+    query: str = Field(..., min_length=1, max_length=512)
+    region: str = "moscow"
+
+
+class AnalyzeBatchRequest(BaseModel):
+    items: list[SerpQuery] = Field(..., min_length=1, max_length=20000)
+
+
 @app.get("/health")
 def health() -> dict:
-    return {"status": "ok", "service": "serp-intel"}
+    return {"status": "ok", "service": "serp-intel", "quota_remaining": get_limiter().quota.remaining}
 
 
 @app.get("/analyze")
 def analyze(query: str = Query(...), region: str = Query("moscow")) -> dict:
+    if not get_limiter().quota.try_consume():
+        raise HTTPException(status_code=429, detail="Daily SERP quota exhausted")
     analysis = SerpStubClient().analyze(query, region)
     return {
         "query": analysis.query,
@@ -24,3 +42,24 @@ def analyze(query: str = Query(...), region: str = Query("moscow")) -> dict:
         "intent_summary": analysis.intent_summary,
         "suggested_structure": analysis.suggested_structure,
     }
+
+
+@app.post("/analyze_batch")
+async def analyze_batch(body: AnalyzeBatchRequest) -> StreamingResponse:
+    """NDJSON, one line per item as it completes (any order, with its index), then a summary line."""
+
+    async def lines() -> AsyncIterator[bytes]:
+        started = time.perf_counter()
+        counts: dict[str, int] = {}
+        async for result in run_analyze_batch(SerpStubClient(), [(i.query, i.region) for i in body.items]):
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+            yield (json.dumps(result, ensure_ascii=False) + "\n").encode("utf-8")
+        summary = {
+            "total": len(body.items),
+            **counts,
+            "seconds": round(time.perf_counter() - started, 3),
+            "quota_remaining": get_limiter().quota.remaining,
+        }
+        yield (json.dumps({"summary": summary}) + "\n").encode("utf-8")
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -0,0 +1,10 @@
+from libs.common.article_search import HEADLINE_OPTIONS, snippet_html
+
+
+def test_snippet_escapes_source_markup_and_keeps_highlights() -> None:
+    headline = '<img src=x onerror="alert(1)"> \ue000аудит\ue001 и <mark>кадры</mark>'
+    assert snippet_html(headline) == (
+        "&lt;img src=x onerror=&quot;alert(1)&quot;&gt; <mark>аудит</mark> и &lt;mark&gt;кадры&lt;/mark&gt;"
+    )
+    assert "<mark>" not in HEADLINE_OPTIONS
+    assert snippet_html(None) == ""
@@ -0,0 +1,28 @@
+import time
+
+import pytest
+
+from libs.common.markdown_render import render_markdown
+
+
+@pytest.mark.parametrize("unit", ["**a ", "__a ", "*a ", "_a ", "~~a "])
+def test_unbalanced_emphasis_markers_render_in_linear_time(unit: str) -> None:
+    started = time.perf_counter()
+    html = render_markdown(unit * (60_000 // len(unit)))
+    assert time.perf_counter() - started < 5  # was 10-25 s with unbounded lazy bodies
+    assert html.startswith("<p>")
+
+
+def test_emphasis_still_renders() -> None:
+    assert render_markdown("**жирный** и _курсив_, ~~зачёркнуто~~") == (
+        "<p><strong>жирный</strong> и <em>курсив</em>, <del>зачёркнуто</del></p>"
+    )
+
+
+def test_deep_blockquote_and_list_nesting_is_capped() -> None:
+    quotes = render_markdown("> " * 1000 + "текст")
+    assert quotes.count("<blockquote>") == 32
+    assert "текст" in quotes
+    lists = render_markdown("- " * 1000 + "пункт")
+    assert "пункт" in lists
+    assert render_markdown("> a\n> > b") == "<blockquote><p>a</p><blockquote><p>b</p></blockquote></blockquote>"
@@ -0,0 +1,41 @@
+import asyncio
+
+from libs.common.clients.llm import GenerationBrief, LLMStubClient
+from libs.common.micro_batch import MicroBatcher
+
+
+class FlakyLLM(LLMStubClient):
+    def generate_article_draft(self, brief: GenerationBrief) -> str:
+        if brief.topic == "bad":
+            raise ValueError("rejected by provider")
+        return brief.topic
+
+
+def brief(topic: str) -> GenerationBrief:
+    return GenerationBrief(topic=topic, target_keyword=topic, region="moscow", suggested_structure={}, intent_summary="")
+
+
+def test_failed_brief_fails_only_its_own_caller() -> None:
+    llm = FlakyLLM()
+
+    async def main() -> list:
+        batcher = MicroBatcher(lambda briefs: asyncio.to_thread(llm.generate_article_drafts, briefs), max_size=4)
+        results = await asyncio.gather(*(batcher.submit(brief(t)) for t in ["a", "b", "bad", "c"]), return_exceptions=True)
+        assert batcher.stats()["batches"] == 1
+        return results
+
+    a, b, bad, c = asyncio.run(main())
+    assert (a, b, c) == ("a", "b", "c")
+    assert isinstance(bad, ValueError)
+    assert isinstance(llm.generate_article_drafts([brief("bad")])[0], ValueError)
+
+
+def test_handler_exception_fails_the_whole_batch() -> None:
+    async def handler(items: list[str]) -> list[str]:
+        raise RuntimeError("provider down")
+
+    async def main() -> list:
+        batcher = MicroBatcher(handler, max_size=2)
+        return await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in asyncio.run(main()))
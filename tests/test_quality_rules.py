@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+import pytest
+
+from libs.common import quality_rules
+from libs.common.quality_rules import compile_rules, validate_rule
+
+
+def rule(id: int, kind: str, pattern: str, severity: str = "block") -> SimpleNamespace:
+    return SimpleNamespace(id=id, kind=kind, pattern=pattern, category="spam", severity=severity)
+
+
+def test_inline_global_flags_rejected() -> None:
+    with pytest.raises(ValueError):
+        validate_rule("regex", "(?i)скидк[аи]")
+    assert validate_rule("regex", "(?s:скидк.)") == "(?s:скидк.)"
+
+
+def test_rule_valid_alone_but_not_in_combined_pattern_is_skipped(monkeypatch: pytest.MonkeyPatch) -> None:
+    # A stored row that passed older validation: compiles alone, not inside the combined pattern
+    monkeypatch.setattr(quality_rules, "validate_rule", lambda kind, pattern: pattern)
+    rows = [rule(1, "phrase", "гарантия 100%"), rule(2, "regex", "(?i)скидк[аи]"), rule(3, "regex", r"\bбесплатн\w+")]
+    matcher = compile_rules(rows)
+    assert matcher.pattern is not None
+    assert matcher.rules == 2
+    found = {m["rule_id"] for m in matcher.scan("Гарантия 100% и бесплатный выезд, скидка")}
+    assert found == {1, 3}
+
+
+def test_rules_starting_at_the_same_position_are_all_reported() -> None:
+    rows = [
+        rule(1, "phrase", "бесплатно", "warn"),
+        rule(2, "phrase", "гарантия", "warn"),
+        rule(3, "regex", r"бесплатно(\s+без\s+регистрации)"),
+        rule(4, "regex", r"гарант\w+"),
+        rule(5, "phrase", "гарантия качества", "warn"),
+        rule(6, "regex", r"регистрац\w+", "warn"),
+    ]
+    matches = compile_rules(rows).scan("Бесплатно без регистрации, гарантия качества")
+    spans = {(m["rule_id"], m["match"]) for m in matches}
+    assert spans == {
+        (1, "Бесплатно"),
+        (3, "Бесплатно без регистрации"),
+        (6, "регистрации"),
+        (2, "гарантия"),
+        (5, "гарантия качества"),
+        (4, "гарантия"),
+    }
+    assert any(m["severity"] == "block" for m in matches)
+
+
+def test_each_rule_reports_non_overlapping_matches() -> None:
+    matches = compile_rules([rule(1, "regex", r"\w+ия")]).scan("гарантия и регистрация")
+    assert [m["match"] for m in matches] == ["гарантия", "регистрация"]